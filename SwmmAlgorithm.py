@@ -26,10 +26,12 @@ __copyright__ = '(C) 2013, Oslandia'
 __revision__ = '$Format:%H$'
 
 import os
+import io
 import re
+import shutil
+import tempfile
+import time
 import datetime
-import codecs
-import subprocess
 from qgis.core import *
 from PyQt4.QtCore import *
 from PyQt4.QtGui import *
@@ -43,28 +45,34 @@ from processing.core.parameters import ParameterTable
 from processing.core.parameters import ParameterString
 from processing.core.parameters import ParameterNumber
 from processing.core.parameters import ParameterFile
+from processing.core.parameters import ParameterSelection
+from processing.core.parameters import ParameterBoolean
 from processing.core.parameters import Parameter
 from processing.core.outputs import OutputVector
 from processing.core.outputs import OutputTable
 from processing.core.ProcessingConfig import ProcessingConfig
 from processing.tools import dataobjects
 
-def convert_date(d):
-    month = {'JAN':'01',
-             'FEB':'02',
-             'MAR':'03',
-             'APR':'04',
-             'MAY':'05',
-             'JUN':'06',
-             'JUL':'07',
-             'AUG':'08',
-             'SEP':'09',
-             'OCT':'10',
-             'NOV':'11',
-             'DEC':'12'}
-    m = re.search('^(\S+)-(\d\d)-(\d\d\d\d)$',d) # for date and time saved as timestamps
-    if not m : raise RuntimeError
-    return m.group(3)+'-'+month[m.group(1)]+'-'+m.group(2)
+from SwmmOutput import SwmmOutput, SwmmOutputError, outputRecords
+from SwmmReport import readReport, NODE, LINK
+from SwmmSummary import SwmmSummary, NODE_STATISTICS, LINK_STATISTICS, \
+        TIME_STATISTICS
+from SwmmLayer import layerSignature
+from SwmmGeometry import GeometryIndex, GeometryJoin
+import SwmmPostgis
+from SwmmCache import SwmmCache, fileDigest, fileIdentity, linkOrCopy
+from SwmmRunner import runProcess, tailLines, SwmmCanceled
+from SwmmEngine import SwmmLibrary, SwmmEngineError, reportStep
+from SwmmProfile import SwmmProfile, TimedIterator
+from SwmmInp import openInp, tableHeader, tableLines, keyValLines, NUMBER, \
+        TEXT, BUFFER_SIZE, INP_FORMAT, SECTIONS, KEYVAL_SECTIONS, FORMATTERS, \
+        formatText, patchInp, externalFiles
+from SwmmHotStart import SwmmHotStartError, spinUpOptions, spinUpDigest, \
+        saveLine, useLine
+from SwmmSeries import SeriesWriter, seriesFilename, fileLine, seriesPaths
+
+# number of features handed at once to the output writers
+BATCH_SIZE = 1000
 
 class SwmmAlgorithm(GeoAlgorithm):
 
@@ -114,9 +122,31 @@ class SwmmAlgorithm(GeoAlgorithm):
     NODE_OUTPUT = 'NODE_OUTPUT'
     LINK_OUTPUT = 'LINK_OUTPUT'
     NODE_TABLE_OUTPUT = 'NODE_TABLE_OUTPUT'
+    LINK_TABLE_OUTPUT = 'LINK_TABLE_OUTPUT'
+    OUTPUT_MODE = 'OUTPUT_MODE'
+    ELEMENTS = 'ELEMENTS'
+    START_TIME = 'START_TIME'
+    END_TIME = 'END_TIME'
+    TIMESERIES_FILES = 'TIMESERIES_FILES'
+    HOTSTART_TIME = 'HOTSTART_TIME'
+
+    OUTPUT_MODES = ['One feature per element and time step',
+                    'One feature per element, time series in the output tables',
+                    'One feature per element with summary statistics, no time series']
+
+    # sections in the order they are written in the .inp file
+    INP_SECTIONS = SECTIONS
+
+    # sections with one row per simulation title
+    KEYVAL_SECTIONS = KEYVAL_SECTIONS
+
+    # field types formatted as numbers in .inp tables
+    NUMBER_TYPES = [QVariant.Int, QVariant.UInt, QVariant.LongLong,
+            QVariant.ULongLong, QVariant.Double]
     
     def __init__(self):
         GeoAlgorithm.__init__(self)
+        self.profile = SwmmProfile()
 
     def getIcon(self):
         return QIcon(os.path.dirname(__file__) + '/swmm.png')
@@ -174,15 +204,27 @@ class SwmmAlgorithm(GeoAlgorithm):
         self.addParameter(ParameterTable(self.LOADINGS, 'Initial pollutant loads on subcatchments', True))
         self.addParameter(ParameterTable(self.CURVES, 'x-y tabular data referenced in other sections', True))
         self.addParameter(ParameterTable(self.TIMESERIES, 'Time series data referenced in other sections', True))
+        self.addParameter(ParameterBoolean(self.TIMESERIES_FILES, 'Write each time series to its own file (cached), the .inp only refers to them', False))
+        self.addParameter(ParameterString(self.HOTSTART_TIME, 'Start from a hot start file saved at (YYYY-MM-DD HH:MM:SS, spin-up run only if the network changed, no hot start if empty)', '', optional=True))
 
 
+        self.addParameter(ParameterSelection(self.OUTPUT_MODE, 'Output layers', self.OUTPUT_MODES, 0))
+        self.addResultFilterParameters()
+
         self.addOutput(OutputVector(self.NODE_OUTPUT, 'Node output layer'))
         self.addOutput(OutputTable(self.NODE_TABLE_OUTPUT, 'Node output table'))
         self.addOutput(OutputVector(self.LINK_OUTPUT, 'Link output layer'))
+        self.addOutput(OutputTable(self.LINK_TABLE_OUTPUT, 'Link output table'))
         pass
 
+    def addResultFilterParameters(self):
+        self.addParameter(ParameterString(self.ELEMENTS, 'Node and link identifiers to output (comma separated, all if empty)', '', optional=True))
+        self.addParameter(ParameterString(self.START_TIME, 'Output results from (YYYY-MM-DD HH:MM:SS, start of simulation if empty)', '', optional=True))
+        self.addParameter(ParameterString(self.END_TIME, 'Output results until (YYYY-MM-DD HH:MM:SS, end of simulation if empty)', '', optional=True))
+
     def checkBeforeOpeningParametersDialog(self):
-        if not ProcessingConfig.getSetting('Swmm_CLI'):
+        if not ProcessingConfig.getSetting('Swmm_CLI') \
+                and not ProcessingConfig.getSetting('Swmm_LIB'):
             return 'Swmm command line tool is not configured.\n\
                 Please configure it before running Swmm algorithms.'
         layers = dataobjects.getVectorLayers()
@@ -193,231 +235,800 @@ class SwmmAlgorithm(GeoAlgorithm):
 
         return None
         
+    def tableColumns(self, layer):
+        "indices, names and kinds of the columns of a tabular section"
+        pkidx = layer.dataProvider().pkAttributeIndexes()
+        fields = list(layer.dataProvider().fields())
+        columns = [i for i in range(len(fields)) if not i in pkidx]
+        kinds = [NUMBER if fields[i].type() in self.NUMBER_TYPES else TEXT
+                for i in columns]
+        return columns, [fields[i].name() for i in columns], kinds
+
+    def tableRows(self, table_name, layer):
+        "names and kinds of the columns of a tabular section, and its rows"
+        columns, names, kinds = self.tableColumns(layer)
+        rows = ([attributes[i] for i in columns]
+                for attributes in (feature.attributes()
+                    for feature in self.profile.timed('fetch', table_name,
+                        layer.getFeatures())))
+        return names, kinds, rows
+
     def swmmTable(self, table_name):
         uri = self.getParameterValue(table_name)
-        if not uri: return u''
+        if not uri: return
         layer = dataobjects.getObjectFromUri(uri)
-        pkidx = layer.dataProvider().pkAttributeIndexes()
-        fields = ""
-        for i,field in enumerate(layer.dataProvider().fields()): 
-            if not i in pkidx: fields+=field.name()+"\t"
-
-        tbl =u'['+table_name+']\n'\
-            ';'+fields+'\n'
-        for feature in layer.getFeatures():
-            for i,v in enumerate(feature):
-                if not i in pkidx: 
-                    if str(v) != 'NULL':
-                        m = re.search('^(\d\d\d\d)-(\d\d)-(\d\d) (\d\d:\d\d):\d\d',str(v)) # for date and time saved as timestamps
-
-                        if m:
-                            tbl += '/'.join(m.group(2,3,1))+'\t'+m.group(4)+'\t'
-                        else:
-                            tbl += str(v)+'\t'
-                    else: tbl += '\t'
-            tbl += '\n'
-        tbl += '\n'
-        return tbl;
+        for line in tableLines(table_name,
+                *self.tableRows(table_name, layer)):
+            yield line
+
+    def writeTable(self, table_name, f):
+        """Writes a tabular section to f, an .inp file of openInp
+
+        Rows of postgres layers without pending edits are formatted by the
+        server and copied to the file (see SwmmPostgis.copySection). Rows
+        of other layers, or of a failed copy, go through swmmTable.
+        """
+        uri = self.getParameterValue(table_name)
+        if not uri: return
+        layer = dataobjects.getObjectFromUri(uri)
+        if table_name == self.TIMESERIES and self.seriesFiles():
+            self.writeSeries(layer, f)
+            return
+        if SwmmPostgis.isPostgis(layer) and not layer.isModified():
+            start = time.time()
+            columns, names, kinds = self.tableColumns(layer)
+            f.flush()
+            position = f.buffer.tell()
+            f.writelines(tableHeader(table_name, names))
+            f.flush()
+            rows = SwmmPostgis.copySection(layer, names, kinds, f.buffer)
+            if rows is not None:
+                f.write(u'\n')
+                self.profile.add('copy', table_name, time.time() - start,
+                        max(rows, 0))
+                return
+            f.buffer.seek(position)
+            f.buffer.truncate()
+            ProcessingLog.addToLog(ProcessingLog.LOG_INFO, 'Could not copy '
+                    +table_name+' from postgres, reading its features')
+        f.writelines(self.swmmTable(table_name))
 
     def swmmKeyVal(self, table_name, simul_title):
         uri = self.getParameterValue(table_name)
-        if not uri: return u''
+        if not uri: return
         layer = dataobjects.getObjectFromUri(uri)
-        fields = []
-        for i,field in enumerate(layer.dataProvider().fields()): 
-            fields.append(field.name())
-
-        tbl =u'['+table_name+']\n'
-        found = False
-        for feature in layer.getFeatures():
-            if str(feature[0]) == simul_title:
-                for i,v in enumerate(feature):
-                    if i and str(v) != 'NULL': tbl += fields[i].upper()+'\t'+str(v)+'\n'
-                    elif i : tbl += '\t'
-                found = True
-                tbl += '\n'
-        tbl += '\n'
-        if not found:
+        keys = [field.name() for field in layer.dataProvider().fields()]
+        rows = [feature.attributes() for feature in self.profile.timed(
+                    'fetch', table_name, layer.getFeatures())
+                if unicode(feature[0]) == simul_title]
+        if not rows:
             raise GeoAlgorithmExecutionException(
                     "No simulation named '"+simul_title+"' in "+table_name)
-        return tbl;
+        for line in keyValLines(table_name, keys, rows):
+            yield line
+
+    def seriesFiles(self):
+        "True if time series go to external files"
+        return bool(self.getParameterValue(self.TIMESERIES_FILES))
+
+    def writeSeries(self, layer, f):
+        """Writes the TIMESERIES section to f with one file per series
+
+        Each series is written to a file in SWMM external data format (the
+        columns of the section after the name) and the section only holds
+        'name FILE "path"' lines, rows already reading from a file are
+        kept as is. With the cache enabled, series files are cache entries
+        keyed by their content, a file is only stored when its rows
+        changed and is shared by every run using the same series.
+        Otherwise, files go to a timeseries folder next to the .inp.
+        """
+        start = time.time()
+        columns, names, kinds = self.tableColumns(layer)
+        formatters = [FORMATTERS[kind] for kind in kinds]
+        cache = self.swmmCache()
+        folder = os.path.join(os.path.dirname(os.path.abspath(f.name)),
+                'timeseries')
+        if not cache and not os.path.isdir(folder):
+            os.makedirs(folder)
+        tmp = tempfile.mkdtemp(prefix='.tmp_',
+                dir=cache.folder if cache else folder)
+        try:
+            writer = SeriesWriter(tmp)
+            inline = []
+            for feature in self.profile.timed('fetch', self.TIMESERIES,
+                    layer.getFeatures()):
+                attributes = feature.attributes()
+                row = [attributes[i] for i in columns]
+                if len(row) > 1 and formatText(row[1]).upper() == u'FILE':
+                    inline.append(row)
+                    continue
+                writer.add(formatText(row[0]), u''.join([fmt(v)+u'\t'
+                    for fmt, v in zip(formatters[1:], row[1:])])+u'\n')
+            series = writer.close()
+
+            f.writelines(tableHeader(self.TIMESERIES, names))
+            for row in inline:
+                f.write(u''.join([fmt(v)+u'\t'
+                    for fmt, v in zip(formatters, row)])+u'\n')
+            stored = 0
+            for i, (name, path, digest) in enumerate(series):
+                if cache:
+                    key = cache.key('series', INP_FORMAT, digest)
+                    entry = cache.get(key)
+                    if not entry:
+                        entry = cache.put(key, {'series.dat': path})
+                        stored += 1
+                    target = os.path.join(entry, 'series.dat')
+                else:
+                    target = os.path.join(folder, seriesFilename(i, name))
+                    if os.path.exists(target): os.remove(target)
+                    os.rename(path, target)
+                    stored += 1
+                f.write(fileLine(name, target))
+            f.write(u'\n')
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.profile.add('series', 'written', time.time() - start, stored)
+        self.profile.add('series', 'reused', rows=len(series) - stored)
+
+    def seriesAvailable(self, filename, cache):
+        """True if the series files of a rendered TIMESERIES section are
+        still in the cache, they are marked as recently used
+
+        Files of the rows that were already reading from a file are not
+        cache entries and are not checked.
+        """
+        folder = os.path.normpath(os.path.abspath(cache.folder))
+        for path in seriesPaths(filename):
+            entry = os.path.dirname(path)
+            if os.path.normpath(os.path.dirname(entry)) != folder:
+                continue
+            if not cache.get(os.path.basename(entry)):
+                return False
+        return True
+
+    def writeInp(self, filename, simul_title, rendered={}):
+        """Writes the .inp file of a simulation
+
+        Sections are streamed to the file one line at a time, except for
+        the ones found in rendered (a map of section name to the file
+        written by renderSection) which are copied.
+        """
+        f = openInp(filename)
+        try:
+            f.write(u'[TITLE]\n')
+            f.write(unicode(simul_title)+u'\n\n')
+            for table_name in self.INP_SECTIONS:
+                start = time.time()
+                position = f.tell()
+                if table_name in rendered:
+                    section = io.open(rendered[table_name], 'r',
+                            encoding='utf-8', newline='')
+                    shutil.copyfileobj(section, f, BUFFER_SIZE)
+                    section.close()
+                elif table_name in self.KEYVAL_SECTIONS:
+                    f.writelines(self.swmmKeyVal(table_name, simul_title))
+                else:
+                    self.writeTable(table_name, f)
+                if f.tell() != position:
+                    self.profile.add('export', table_name,
+                            time.time() - start, bytes=f.tell() - position)
+        finally:
+            f.close()
+
+    def renderSection(self, table_name, filename):
+        "writes a section that does not depend on the simulation title"
+        start = time.time()
+        f = openInp(filename)
+        try:
+            self.writeTable(table_name, f)
+        finally:
+            f.close()
+        self.profile.add('render', table_name, time.time() - start,
+                bytes=os.path.getsize(filename))
+
+    def renderSections(self, folder=None):
+        """Renders the sections that do not depend on the simulation title
+
+        Returns a map of section name to rendered file, to be given to
+        writeInp. With the cache enabled, a section is only rendered when
+        the signature of its layer changed since it was cached. Without
+        cache, sections are rendered in folder, or left to writeInp if
+        folder is None.
+        """
+        cache = self.swmmCache()
+        if not cache and not folder:
+            return {}
+        rendered = {}
+        for table_name in self.INP_SECTIONS:
+            uri = self.getParameterValue(table_name)
+            if table_name in self.KEYVAL_SECTIONS or not uri:
+                continue
+            if not cache:
+                rendered[table_name] = os.path.join(folder, table_name+'.inp')
+                self.renderSection(table_name, rendered[table_name])
+                continue
+            layer = dataobjects.getObjectFromUri(uri)
+            key = cache.key('section', INP_FORMAT, table_name,
+                    layerSignature(layer), *(['files']
+                        if table_name == self.TIMESERIES
+                        and self.seriesFiles() else []))
+            entry = cache.get(key)
+            if entry and table_name == self.TIMESERIES \
+                    and not self.seriesAvailable(
+                            os.path.join(entry, 'section.inp'), cache):
+                entry = None # a series file was evicted
+            if not entry:
+                tmp = tempfile.NamedTemporaryFile(suffix='.inp', delete=False,
+                        dir=cache.folder, prefix='.tmp_')
+                tmp.close()
+                try:
+                    self.renderSection(table_name, tmp.name)
+                    entry = cache.put(key, {'section.inp': tmp.name})
+                finally:
+                    os.remove(tmp.name)
+            else:
+                self.profile.add('cached', table_name, bytes=os.path.getsize(
+                    os.path.join(entry, 'section.inp')))
+            rendered[table_name] = os.path.join(entry, 'section.inp')
+        return rendered
 
     def processAlgorithm(self, progress):
-        swmm_cli = os.path.abspath(ProcessingConfig.getSetting('Swmm_CLI'))
-        if not swmm_cli:
+        """Runs runAlgorithm and logs where the time was spent
+
+        The measures of the run (see SwmmProfile) are summarized in the
+        log and saved as swmm_profile.json in the output folder. With the
+        Swmm_PROFILE setting, the run is also profiled with cProfile, the
+        statistics are saved as swmm.prof.
+        """
+        folder = ProcessingConfig.getSetting(ProcessingConfig.OUTPUT_FOLDER)
+        self.profile = SwmmProfile(
+                bool(ProcessingConfig.getSetting('Swmm_PROFILE')))
+        try:
+            self.profile.run(self.runAlgorithm, progress)
+        finally:
+            ProcessingLog.addToLog(ProcessingLog.LOG_INFO,
+                    self.profile.summary())
+            stats = self.profile.pythonStats()
+            if stats:
+                ProcessingLog.addToLog(ProcessingLog.LOG_INFO, stats)
+            try:
+                self.profile.save(os.path.join(folder, 'swmm_profile.json'),
+                        os.path.join(folder, 'swmm.prof'))
+            except IOError, e:
+                ProcessingLog.addToLog(ProcessingLog.LOG_ERROR,
+                        'Could not save the profile: '+unicode(e))
+
+    def swmmSettings(self):
+        """(command line tool, shared library) of the settings
+
+        Either can be None, but not both. The path of the command line
+        tool is made absolute.
+        """
+        swmm_cli = ProcessingConfig.getSetting('Swmm_CLI')
+        swmm_lib = ProcessingConfig.getSetting('Swmm_LIB')
+        if not swmm_cli and not swmm_lib:
             raise GeoAlgorithmExecutionException(
-                    'Swmm command line toom is not configured.\n\
+                    'Swmm command line tool is not configured.\n\
                      Please configure it before running Swmm algorithms.')
+        return (os.path.abspath(swmm_cli) if swmm_cli else None,
+                swmm_lib or None)
+
+    def runAlgorithm(self, progress):
+        swmm_cli, swmm_lib = self.swmmSettings()
 
         folder = ProcessingConfig.getSetting(ProcessingConfig.OUTPUT_FOLDER)
         filename = os.path.join(folder, 'swmm.inp')
-        f = codecs.open(filename,'w',encoding='utf-8')
-        f.write('[TITLE]\n')
-        f.write(self.getParameterValue(self.TITLE)+'\n\n')
-
-        f.write(self.swmmKeyVal(self.OPTIONS, self.getParameterValue(self.TITLE)))
-        f.write(self.swmmKeyVal(self.REPORT,self.getParameterValue(self.TITLE)))
-        f.write(self.swmmTable(self.FILES))
-        f.write(self.swmmTable(self.RAINGAGES))
-        f.write(self.swmmTable(self.HYDROGRAPHS))
-        f.write(self.swmmKeyVal(self.EVAPORATION, self.getParameterValue(self.TITLE)))
-        f.write(self.swmmTable(self.TEMPERATURE))
-        f.write(self.swmmTable(self.SUBCATCHMENTS))
-        f.write(self.swmmTable(self.SUBAREAS))
-        f.write(self.swmmTable(self.INFILTRATION))
-        f.write(self.swmmTable(self.LID_CONTROLS))
-        f.write(self.swmmTable(self.LID_USAGE))
-        f.write(self.swmmTable(self.AQUIFERS))
-        f.write(self.swmmTable(self.GROUNDWATER))
-        f.write(self.swmmTable(self.SNOWPACKS))
-        f.write(self.swmmTable(self.JUNCTIONS))
-        f.write(self.swmmTable(self.OUTFALLS))
-        f.write(self.swmmTable(self.DIVIDERS))
-        f.write(self.swmmTable(self.STORAGE))
-        f.write(self.swmmTable(self.CONDUITS))
-        f.write(self.swmmTable(self.PUMPS))
-        f.write(self.swmmTable(self.ORIFICES))
-        f.write(self.swmmTable(self.WEIRS))
-        f.write(self.swmmTable(self.OUTLETS))
-        f.write(self.swmmTable(self.XSECTIONS))
-        f.write(self.swmmTable(self.TRANSECTS))
-        f.write(self.swmmTable(self.LOSSES))
-        f.write(self.swmmTable(self.CONTROLS))
-        f.write(self.swmmTable(self.POLLUTANTS))
-        f.write(self.swmmTable(self.LANDUSES))
-        f.write(self.swmmTable(self.COVERAGES))
-        f.write(self.swmmTable(self.BUILDUP))
-        f.write(self.swmmTable(self.WASHOFF))
-        f.write(self.swmmTable(self.TREATMENT))
-        f.write(self.swmmTable(self.INFLOWS))
-        f.write(self.swmmTable(self.DWF))
-        f.write(self.swmmTable(self.PATTERNS))
-        f.write(self.swmmTable(self.RDII))
-        f.write(self.swmmTable(self.LOADINGS))
-        f.write(self.swmmTable(self.CURVES))
-        f.write(self.swmmTable(self.TIMESERIES))
-
-        f.close()
+        progress.setText('exporting sections')
+        self.writeInp(filename, self.getParameterValue(self.TITLE),
+                self.renderSections())
+        hotstart = self.timeParameter(self.HOTSTART_TIME)
+        if hotstart:
+            self.useHotStart(filename, hotstart, swmm_cli, swmm_lib,
+                    progress)
 
+        rptfilename = os.path.join(folder, 'swmm.rpt')
         outfilename = os.path.join(folder, 'swmm.out')
+        if swmm_lib:
+            self.simulateInProcess(swmm_lib, filename, rptfilename,
+                    outfilename, progress)
+            return
+
         progress.setText('running simulation')
-        log=""
-        proc = subprocess.Popen(
-            # this doesn't work on linux, but IMHO should
-            # [swmm_cli, filename, outfilename]
-            # this works on linux
-            swmm_cli+' '+filename+' '+outfilename,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stdin=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=False,
-            ).stdout
-        for line in iter(proc.readline, ''):
-            log+=line
+        try:
+            log = self.simulate(swmm_cli, filename, rptfilename, outfilename,
+                    progress.setPercentage, self.cancelCheck(progress))
+        except SwmmCanceled, e:
+            raise GeoAlgorithmExecutionException(unicode(e))
         ProcessingLog.addToLog(ProcessingLog.LOG_INFO, log)
+        self.checkSwmmLog(log, rptfilename)
+
+        progress.setText('postprocessing output')
+        writer = SwmmResultWriter(self,
+                mode=self.getParameterValue(self.OUTPUT_MODE))
+        writer.write(self.resultRecords(rptfilename, outfilename, progress,
+            *self.resultFilter()), step=self.reportStep(filename))
+
+    def useHotStart(self, filename, hotstart, swmm_cli, swmm_lib, progress):
+        """Changes an .inp file to start from the state at hotstart
+
+        The state is saved by a spin-up run (swmm_spinup.inp next to
+        filename) ending at hotstart. Hot start files are keyed by what
+        the spin-up reads, time series and rain data after hotstart
+        excepted (see SwmmHotStart.spinUpDigest), and the identity of
+        swmm. The spin-up is skipped when one is found in the cache, or
+        without cache in the hotstart folder of the output folder.
+        """
+        start = time.time()
+        folder = os.path.dirname(filename)
+        try:
+            spinup_options, options = spinUpOptions(filename,
+                datetime.datetime.strptime(hotstart, '%Y-%m-%d %H:%M:%S'))
+        except SwmmHotStartError, e:
+            raise GeoAlgorithmExecutionException(unicode(e))
+        spinup = os.path.join(folder, 'swmm_spinup.inp')
+        hsfilename = os.path.join(folder, 'swmm_spinup.hsf')
+        patchInp(filename, spinup, spinup_options, [saveLine(hsfilename)])
+        key = SwmmCache.key('hotstart', spinUpDigest(spinup),
+                fileIdentity(swmm_lib or swmm_cli))
+        cache = self.swmmCache()
+        if cache:
+            entry = cache.get(key)
+            saved = os.path.join(entry or cache.path(key), 'swmm.hsf')
+        else:
+            saved = os.path.join(ProcessingConfig.getSetting(
+                ProcessingConfig.OUTPUT_FOLDER), 'hotstart', key+'.hsf')
+
+        if os.path.exists(saved):
+            self.profile.add('hotstart', 'cached', time.time() - start,
+                    bytes=os.path.getsize(saved))
+        else:
+            progress.setText('running spin-up simulation')
+            if os.path.exists(hsfilename): os.remove(hsfilename)
+            self.spinUp(spinup, swmm_cli, swmm_lib, progress)
+            if not os.path.exists(hsfilename):
+                raise GeoAlgorithmExecutionException(
+                        'The spin-up simulation saved no hot start file')
+            if cache:
+                saved = os.path.join(cache.put(key,
+                    {'swmm.hsf': hsfilename}), 'swmm.hsf')
+                os.remove(hsfilename)
+            else:
+                if not os.path.isdir(os.path.dirname(saved)):
+                    os.makedirs(os.path.dirname(saved))
+                os.rename(hsfilename, saved)
+            self.profile.add('hotstart', 'spin-up', time.time() - start,
+                    bytes=os.path.getsize(saved))
+
+        tmp = tempfile.NamedTemporaryFile(suffix='.inp', delete=False,
+                dir=folder, prefix='.tmp_')
+        tmp.close()
+        patchInp(filename, tmp.name, options, [useLine(saved)])
+        os.remove(filename)
+        os.rename(tmp.name, filename)
+
+    def spinUp(self, filename, swmm_cli, swmm_lib, progress):
+        "runs a spin-up simulation, only its hot start file is kept"
+        rptfilename = os.path.splitext(filename)[0]+'.rpt'
+        outfilename = os.path.splitext(filename)[0]+'.out'
+        try:
+            if swmm_lib:
+                # no result is read, but the report tables of the spin-up
+                # are read back by swmm from its binary output
+                try:
+                    for record in SwmmLibrary(swmm_lib).run(filename,
+                            rptfilename, outfilename, set(),
+                            percent=progress.setPercentage,
+                            canceled=self.cancelCheck(progress)):
+                        pass
+                finally:
+                    if os.path.exists(outfilename):
+                        os.remove(outfilename)
+                return
+            log = self.runSwmm(swmm_cli, filename, rptfilename, outfilename,
+                    os.path.splitext(filename)[0]+'.log',
+                    progress.setPercentage, self.cancelCheck(progress))
+        except SwmmCanceled, e:
+            raise GeoAlgorithmExecutionException(unicode(e))
+        except SwmmEngineError, e:
+            raise GeoAlgorithmExecutionException(
+                    'Spin-up simulation failed, see '+rptfilename+': '
+                    +unicode(e))
+        if os.path.exists(outfilename):
+            os.remove(outfilename)
+        self.checkSwmmLog(log, rptfilename)
 
+    def swmmCache(self):
+        "cache of simulation results and sections, None if it is disabled"
+        folder = ProcessingConfig.getSetting('Swmm_CACHE_FOLDER')
+        size = float(ProcessingConfig.getSetting('Swmm_CACHE_SIZE') or 0)
+        if not folder or size <= 0:
+            return None
+        return SwmmCache(folder, int(size*1024*1024))
+
+    def simulateInProcess(self, swmm_lib, filename, rptfilename,
+            outfilename, progress, writer=None, scenario=None):
+        """Runs the simulation with the swmm library
+
+        Results go from the engine to the output writers at each
+        reporting step, no output file is read back. They are written
+        with writer, tagged by scenario, if given.
+        """
+        if writer is None:
+            progress.setText('running simulation')
+            writer = SwmmResultWriter(self,
+                    mode=self.getParameterValue(self.OUTPUT_MODE))
+        # removed first, it may be a hard link to a cache entry
+        for previous in (rptfilename, outfilename):
+            if os.path.exists(previous): os.remove(previous)
+        try:
+            writer.write(SwmmLibrary(swmm_lib).run(filename, rptfilename,
+                outfilename, *self.resultFilter(),
+                percent=progress.setPercentage,
+                canceled=self.cancelCheck(progress)),
+                scenario, source=('simulation', 'engine'),
+                step=self.reportStep(filename))
+        except SwmmCanceled, e:
+            raise GeoAlgorithmExecutionException(unicode(e))
+        except SwmmEngineError, e:
+            if os.path.exists(rptfilename):
+                o = open(rptfilename, 'r')
+                ProcessingLog.addToLog(ProcessingLog.LOG_ERROR, o.read())
+                o.close()
+            raise GeoAlgorithmExecutionException(unicode(e))
+
+    def cancelCheck(self, progress):
+        "function telling if the user canceled the run, None if unsupported"
+        return getattr(progress, 'isCanceled', None) \
+                or getattr(progress, 'wasCanceled', None)
+
+    def simulate(self, swmm_cli, filename, rptfilename, outfilename,
+            percent=None, canceled=None):
+        """Runs the simulation unless its results are in the cache
+
+        Results are keyed by the content of the .inp and of the files it
+        refers to (see SwmmInp.externalFiles), and the identity of the
+        swmm executable, the report, binary output and console output of
+        a cached run are reused. Returns the end of the console output of
+        swmm, which is saved in full next to the report (.log). percent
+        and canceled are given to runSwmm.
+        """
+        start = time.time()
+        logfilename = os.path.splitext(rptfilename)[0]+'.log'
+        cache = self.swmmCache()
+        if cache:
+            key = cache.key('result', fileDigest(filename),
+                    fileIdentity(swmm_cli), *[path+':'+(fileDigest(path)
+                        if os.path.isfile(path) else 'missing')
+                        for path in externalFiles(filename)])
+            entry = cache.get(key)
+            if entry:
+                try:
+                    linkOrCopy(os.path.join(entry, 'swmm.rpt'), rptfilename)
+                    linkOrCopy(os.path.join(entry, 'swmm.out'), outfilename)
+                    linkOrCopy(os.path.join(entry, 'swmm.log'), logfilename)
+                    self.profile.add('simulation', 'cached',
+                            time.time() - start, bytes=self.resultSize(
+                                rptfilename, outfilename))
+                    return tailLines(logfilename)
+                except (IOError, OSError):
+                    pass # evicted meanwhile, the simulation is run
+
+        # outputs may be hard links to cache entries, swmm must not
+        # overwrite them in place
+        for previous in (rptfilename, outfilename, logfilename):
+            if os.path.exists(previous): os.remove(previous)
+        log = self.runSwmm(swmm_cli, filename, rptfilename, outfilename,
+                logfilename, percent, canceled)
+        self.profile.add('simulation', 'swmm', time.time() - start,
+                bytes=self.resultSize(rptfilename, outfilename))
+        if cache and not re.search('There are errors', log) \
+                and os.path.exists(outfilename):
+            cache.put(key, {'swmm.rpt': rptfilename,
+                            'swmm.out': outfilename,
+                            'swmm.log': logfilename})
+        return log
+
+    def resultSize(self, rptfilename, outfilename):
+        "bytes of the result files"
+        return sum(os.path.getsize(f) for f in (rptfilename, outfilename)
+                if os.path.exists(f))
+
+    def runSwmm(self, swmm_cli, filename, rptfilename, outfilename,
+            logfilename, percent=None, canceled=None):
+        """Runs the simulation, see SwmmRunner.runProcess
+
+        The console output of swmm goes to logfilename, the percentage it
+        prints is given to percent while swmm runs and the run is stopped
+        (SwmmCanceled) as soon as canceled returns True.
+        """
+        try:
+            return runProcess([swmm_cli, filename, rptfilename, outfilename],
+                    logfilename, percent, canceled)
+        except OSError, e:
+            # missing or not executable command line tool
+            raise GeoAlgorithmExecutionException('Could not run swmm ('
+                    +swmm_cli+'): '+unicode(e))
+
+    def checkSwmmLog(self, log, rptfilename):
         if re.search('There are errors', log):
-            o = open(outfilename,'r')
+            o = open(rptfilename,'r')
             ProcessingLog.addToLog(ProcessingLog.LOG_ERROR, o.read())
             o.close()
             raise RuntimeError('There were errors, look into logs for details')
 
-        progress.setText('postprocessing output')
+    def resultFilter(self):
+        """(elements, start, end) from the result filter parameters
 
-        # put features in a map indexed by the identifier (first column)
-        layer = dataobjects.getObjectFromUri(self.getParameterValue(self.JUNCTIONS))
-        node_fields = QgsFields()
-        node_fields.append(QgsField('Node', QVariant.String))
-        node_fields.append(QgsField('Time', QVariant.String))
-        node_fields.append(QgsField('Inflow', QVariant.Double))
-        node_fields.append(QgsField('Flooding', QVariant.Double))
-        node_fields.append(QgsField('Depth', QVariant.Double))
-        node_fields.append(QgsField('Head', QVariant.Double))
-        node_feat = {}
-        for feat in layer.getFeatures(): 
-            if feat.geometry() and feat.geometry().exportToWkt(): 
-                node_feat[feat.attributes()[0]] = feat
-
-        node_writer = self.getOutputFromName(
-                self.NODE_OUTPUT).getVectorWriter(node_fields.toList(),
-                                                   QGis.WKBPoint,
-                                                   layer.crs())
-        node_table_writer = self.getOutputFromName(
-                self.NODE_TABLE_OUTPUT).getTableWriter(node_fields.toList())
-
-        layer = dataobjects.getObjectFromUri(self.getParameterValue(self.CONDUITS))
-        link_fields = QgsFields()
-        link_fields.append(QgsField('Link', QVariant.String))
-        link_fields.append(QgsField('Time', QVariant.String))
-        link_fields.append(QgsField('Flow', QVariant.Double))
-        link_fields.append(QgsField('Velocity', QVariant.Double))
-        link_fields.append(QgsField('Depth', QVariant.Double))
-        link_fields.append(QgsField('PercentFull', QVariant.Double))
-        link_feat = {}
-        for feat in layer.getFeatures():
-            if feat.geometry() and feat.geometry().exportToWkt(): 
-                link_feat[feat.attributes()[0]] = feat
-
-        link_writer = self.getOutputFromName(
-                self.LINK_OUTPUT).getVectorWriter(link_fields.toList(),
-                                                   QGis.WKBLineString,
-                                                   layer.crs())
-
-        # here we create output layers
-        # it's a python implementation of a join
-        # on the identifyer field between the results an the JUNCTIONS or PIPES
-        # geometries
-        total_size = os.path.getsize(outfilename)
-        total_read = 0
-        o = codecs.open(outfilename,'r',encoding='utf-8')
-        # get nodes results
-        link_id = '' 
-        node_id = '' 
-        line = o.readline()
-        while line:
-            line = line.rstrip()
-            if (node_id or link_id) and not line: 
-                link_id = ''
-                node_id = ''
-            if re.search('^  <<< Node ', line): 
-                node_id = line[11:-4]
-                for i in range(5): line = o.readline()
-                line = line.rstrip()
-            if re.search('^  <<< Link ', line): 
-                link_id = line[11:-4]
-                for i in range(5): line = o.readline()
-                line = line.rstrip()
-            if node_id:
-                feature = QgsFeature(node_fields)
-                tbl = line.split()
-                if len(tbl) >= 6:
-                    feature['Node']     = node_id
-                    feature['Time']     = convert_date(tbl[0])+' '+tbl[1]
-                    feature['Inflow']   = tbl[2]
-                    feature['Flooding'] = tbl[3]
-                    feature['Depth']    = tbl[4]
-                    feature['Head']     = tbl[5]
-                    feat = node_feat.get(node_id, None)
-                    if feat : feature.setGeometry(feat.geometry())
-                    node_writer.addFeature(feature)
-                    node_table_writer.addRecord([node_id]+tbl)
-            if link_id:
-                feature = QgsFeature(link_fields)
-                tbl = line.split()
-                if len(tbl) >= 6:
-                    feature['Link']     = link_id
-                    feature['Time']     = convert_date(tbl[0])+' '+tbl[1]
-                    feature['Flow']     = tbl[2]
-                    feature['Velocity'] = tbl[3]
-                    feature['Depth']    = tbl[4]
-                    feature['PercentFull'] = tbl[5]
-                    feat = link_feat.get(link_id, None)
-                    if feat : feature.setGeometry(feat.geometry())
-                    link_writer.addFeature(feature)
-            line = o.readline()
-            total_read += len(line)
-            progress.setPercentage(int(100*total_read/total_size))
-
-        o.close()
-        
+        elements is a set of ids or None for all elements, start and end
+        are 'YYYY-MM-DD HH:MM:SS' strings or None.
+        """
+        elements = self.getParameterValue(self.ELEMENTS)
+        elements = set(e.strip() for e in elements.split(',') if e.strip()) \
+                if elements and elements.strip() else None
+        return elements, self.timeParameter(self.START_TIME), \
+                self.timeParameter(self.END_TIME)
+
+    def timeParameter(self, name):
+        "'YYYY-MM-DD HH:MM:SS' string of a time parameter, None if empty"
+        value = (self.getParameterValue(name) or '').strip()
+        if not value:
+            return None
+        try:
+            return datetime.datetime.strptime(value,
+                '%Y-%m-%d %H:%M:%S' if value.count(':') == 2
+                else '%Y-%m-%d %H:%M').strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            raise GeoAlgorithmExecutionException(
+                    "Invalid time '"+value+"', expected YYYY-MM-DD HH:MM:SS")
+
+    def resultRecords(self, rptfilename, outfilename, progress,
+            elements=None, start=None, end=None):
+        # results come from the binary output file, the time series tables
+        # of the text report are only used if swmm did not write it
+        try:
+            return self.outputRecords(SwmmOutput(outfilename), progress,
+                    elements, start, end)
+        except (IOError, SwmmOutputError):
+            return readReport(rptfilename, progress.setPercentage,
+                    elements, start, end)
+
+    def reportStep(self, filename):
+        "reporting step of an .inp file in seconds, None if it is invalid"
+        try:
+            return reportStep(filename)
+        except SwmmEngineError:
+            return None
+
+    def outputRecords(self, output, progress, elements=None, start=None,
+            end=None):
+        "records of a binary output file, see SwmmOutput.outputRecords"
+        return outputRecords(output, progress.setPercentage, elements, start,
+                end)
+
+
+class BatchWriter(object):
+    """Hands features (or table records) to a writer in chunks
+
+    Uses addFeatures (addRecords) when the writer, or the data provider
+    behind a processing vector writer, has it, and falls back to one call
+    per item otherwise. flush must be called once everything was added.
+    """
+
+    def __init__(self, writer, records=False, size=BATCH_SIZE):
+        self.size = size
+        self.batch = []
+        self.count = 0 # items added
+        self.add_one = writer.addRecord if records else writer.addFeature
+        self.add_many = getattr(writer,
+                'addRecords' if records else 'addFeatures', None)
+        if not records and self.add_many is None \
+                and getattr(writer, 'isNotFileBased', False):
+            # memory, postgis and spatialite outputs write to a provider
+            self.add_many = writer.writer.addFeatures
+
+    def add(self, item):
+        self.batch.append(item)
+        self.count += 1
+        if len(self.batch) >= self.size:
+            self.flush()
+
+    def flush(self):
+        if self.add_many:
+            self.add_many(self.batch)
+        else:
+            for item in self.batch:
+                self.add_one(item)
+        self.batch = []
+
+class SwmmResultWriter(object):
+    """Writes result records to the node and link outputs of an algorithm
+
+    It's a python implementation of a join on the identifier field (first
+    column) between the results and the geometries of the node (JUNCTIONS,
+    OUTFALLS, DIVIDERS, STORAGE) and link (CONDUITS, PUMPS, ORIFICES,
+    WEIRS, OUTLETS) layers, see SwmmGeometry.GeometryIndex. Links that
+    are not lines get the line between their inlet and outlet nodes. With
+    scenario set, a leading Scenario field tags every result.
+
+    In TIME_STEP_FEATURES mode, the output layers get one feature per
+    element and time step. In ELEMENT_FEATURES mode they get one feature
+    per element, with only the element identifier, and the time series
+    only go to the output tables, to be joined on that identifier. In
+    SUMMARY_FEATURES mode they get one feature per element with the
+    statistics of SwmmSummary, the time series are not written.
+    """
+
+    TIME_STEP_FEATURES = 0
+    ELEMENT_FEATURES = 1
+    SUMMARY_FEATURES = 2
+
+    NODE_LAYERS = ['JUNCTIONS', 'OUTFALLS', 'DIVIDERS', 'STORAGE']
+    LINK_LAYERS = ['CONDUITS', 'PUMPS', 'ORIFICES', 'WEIRS', 'OUTLETS']
+
+    def __init__(self, alg, scenario=False, mode=TIME_STEP_FEATURES):
+        self.scenario = scenario
+        self.mode = mode
+        self.profile = alg.profile
+        head = [QgsField('Scenario', QVariant.String)] if scenario else []
+
+        # geometries are only fetched for the elements found in the results
+        cache = alg.swmmCache()
+        node_layers = self.layers(alg, self.NODE_LAYERS)
+        link_layers = self.layers(alg, self.LINK_LAYERS)
+        self.node_index = GeometryIndex(node_layers, cache)
+        self.link_index = GeometryIndex(link_layers, cache, self.node_index)
+        crs = (node_layers+link_layers)[0].crs() \
+                if node_layers or link_layers \
+                else QgsCoordinateReferenceSystem()
+
+        self.node_fields = self.nodeFields(head)
+        self.node_geometry_fields = self.node_fields
+        if mode != self.TIME_STEP_FEATURES:
+            self.node_geometry_fields = self.elementFields(head, 'Node',
+                    NODE_STATISTICS if mode == self.SUMMARY_FEATURES else [])
+        self.node_writer = GeometryJoin(self.node_index,
+                BatchWriter(alg.getOutputFromName(
+                    alg.NODE_OUTPUT).getVectorWriter(
+                        self.node_geometry_fields.toList(),
+                        QGis.WKBPoint, crs)))
+        self.node_table_writer = BatchWriter(alg.getOutputFromName(
+                alg.NODE_TABLE_OUTPUT).getTableWriter(
+                        self.node_fields.toList()), records=True)
+
+        self.link_fields = self.linkFields(head)
+        self.link_geometry_fields = self.link_fields
+        if mode != self.TIME_STEP_FEATURES:
+            self.link_geometry_fields = self.elementFields(head, 'Link',
+                    LINK_STATISTICS if mode == self.SUMMARY_FEATURES else [])
+        self.link_writer = GeometryJoin(self.link_index,
+                BatchWriter(alg.getOutputFromName(
+                    alg.LINK_OUTPUT).getVectorWriter(
+                        self.link_geometry_fields.toList(),
+                        QGis.WKBLineString, crs)))
+        self.link_table_writer = BatchWriter(alg.getOutputFromName(
+                alg.LINK_TABLE_OUTPUT).getTableWriter(
+                        self.link_fields.toList()), records=True)
+
+        # elements already written to the layers in ELEMENT_FEATURES mode
+        self.written = set()
+
+    @staticmethod
+    def layers(alg, names):
+        "layers of the parameters of names that were given"
+        layers = []
+        for name in names:
+            value = alg.getParameterValue(name)
+            if value:
+                layers.append(dataobjects.getObjectFromUri(value))
+        return layers
+
+    @staticmethod
+    def nodeFields(head=[]):
+        "fields of the node time series"
+        fields = QgsFields()
+        for field in head + [
+                QgsField('Node', QVariant.String),
+                QgsField('Time', QVariant.String),
+                QgsField('Inflow', QVariant.Double),
+                QgsField('Flooding', QVariant.Double),
+                QgsField('Depth', QVariant.Double),
+                QgsField('Head', QVariant.Double)]:
+            fields.append(field)
+        return fields
+
+    @staticmethod
+    def linkFields(head=[]):
+        "fields of the link time series"
+        fields = QgsFields()
+        for field in head + [
+                QgsField('Link', QVariant.String),
+                QgsField('Time', QVariant.String),
+                QgsField('Flow', QVariant.Double),
+                QgsField('Velocity', QVariant.Double),
+                QgsField('Depth', QVariant.Double),
+                QgsField('PercentFull', QVariant.Double)]:
+            fields.append(field)
+        return fields
+
+    @staticmethod
+    def elementFields(head, name, statistics):
+        "fields of the layers with one feature per element"
+        fields = QgsFields()
+        if statistics:
+            for field in head:
+                fields.append(field)
+        fields.append(QgsField(name, QVariant.String))
+        for statistic in statistics:
+            fields.append(QgsField(statistic, QVariant.String
+                if statistic in TIME_STATISTICS else QVariant.Double))
+        return fields
+
+    def write(self, records, scenario=None, source=('results', 'read'),
+            step=None):
+        """Writes records, the time spent getting them is recorded in the
+        profile of the algorithm under source (phase, section), the time
+        spent fetching geometries under ('geometries', 'nodes' or 'links')
+        and the rest under ('results', 'write'). step is the reporting
+        step of the simulation in seconds, for summary statistics of
+        records holding a single time (see SwmmSummary)"""
+        start = time.time()
+        records = TimedIterator(records)
+        writers = (self.node_writer, self.node_table_writer,
+                self.link_writer, self.link_table_writer)
+        written = sum(writer.count for writer in writers)
+        indexes = [('nodes', self.node_index), ('links', self.link_index)]
+        fetched = [(index.seconds, index.rows) for name, index in indexes]
+        if self.mode == self.SUMMARY_FEATURES:
+            self.writeSummary(records, [scenario] if self.scenario else [],
+                    step)
+        else:
+            self.writeTimeSeries(records, [scenario] if self.scenario else [])
+        self.profile.add(source[0], source[1], records.seconds, records.rows)
+        seconds = 0.
+        for (name, index), (before, rows) in zip(indexes, fetched):
+            self.profile.add('geometries', name, index.seconds - before,
+                    index.rows - rows)
+            seconds += index.seconds - before
+        self.profile.add('results', 'write',
+                time.time() - start - records.seconds - seconds,
+                sum(writer.count for writer in writers) - written)
+
+    def writeTimeSeries(self, records, head):
+        time_steps = self.mode == self.TIME_STEP_FEATURES
+        for kind, element_id, time, values in records:
+            attributes = head + [element_id, time] + list(values)
+            if kind == NODE:
+                if time_steps or not (NODE, element_id) in self.written:
+                    feature = QgsFeature(self.node_geometry_fields)
+                    feature.setAttributes(attributes if time_steps
+                            else [element_id])
+                    self.node_writer.add(feature, element_id)
+                    if not time_steps: self.written.add((NODE, element_id))
+                self.node_table_writer.add(attributes)
+            else:
+                if time_steps or not (LINK, element_id) in self.written:
+                    feature = QgsFeature(self.link_geometry_fields)
+                    feature.setAttributes(attributes if time_steps
+                            else [element_id])
+                    self.link_writer.add(feature, element_id)
+                    if not time_steps: self.written.add((LINK, element_id))
+                self.link_table_writer.add(attributes)
+        for writer in (self.node_writer, self.node_table_writer,
+                self.link_writer, self.link_table_writer):
+            writer.flush()
+
+    def writeSummary(self, records, head, step=None):
+        summary = SwmmSummary(step)
+        for record in records:
+            summary.add(*record)
+        for node_id, values in summary.nodes():
+            feature = QgsFeature(self.node_geometry_fields)
+            feature.setAttributes(head + [node_id] + values)
+            self.node_writer.add(feature, node_id)
+        for link_id, values in summary.links():
+            feature = QgsFeature(self.link_geometry_fields)
+            feature.setAttributes(head + [link_id] + values)
+            self.link_writer.add(feature, link_id)
+        self.node_writer.flush()
+        self.link_writer.flush()
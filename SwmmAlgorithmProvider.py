@@ -30,7 +30,12 @@ from PyQt4.QtGui import *
 from processing.core.AlgorithmProvider import AlgorithmProvider
 from processing.core.ProcessingConfig import ProcessingConfig, Setting
 from processing.core.ProcessingLog import ProcessingLog
+from processing.tools.system import userFolder
 from SwmmAlgorithm import SwmmAlgorithm
+from SwmmEnsembleAlgorithm import SwmmEnsembleAlgorithm
+from SwmmExtractAlgorithm import SwmmExtractAlgorithm
+from SwmmImportAlgorithm import SwmmImportAlgorithm
+from SwmmSweepAlgorithm import SwmmSweepAlgorithm
 
 class SwmmAlgorithmProvider(AlgorithmProvider):
 
@@ -53,16 +58,40 @@ class SwmmAlgorithmProvider(AlgorithmProvider):
                                     'Swmm_CLI',
                                     'Swmm command line tool',
                                      ''))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+                                    'Swmm_LIB',
+                                    'Swmm shared library (in process simulation if set)',
+                                    ''))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+                                    'Swmm_CACHE_FOLDER',
+                                    'Simulation cache folder',
+                                    os.path.join(userFolder(), 'swmm_cache')))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+                                    'Swmm_CACHE_SIZE',
+                                    'Simulation cache size in MB (0 to disable)',
+                                    1024))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+                                    'Swmm_PROFILE',
+                                    'Profile runs with cProfile (swmm.prof in the output folder)',
+                                    False))
 
     def unload(self):
         print "unloading swmm"
         AlgorithmProvider.unload(self)
         ProcessingConfig.removeSetting('Swmm_CLI')
+        ProcessingConfig.removeSetting('Swmm_LIB')
+        ProcessingConfig.removeSetting('Swmm_CACHE_FOLDER')
+        ProcessingConfig.removeSetting('Swmm_CACHE_SIZE')
+        ProcessingConfig.removeSetting('Swmm_PROFILE')
 
     def _loadAlgorithms(self):
         print "loading algo"
         try:
             self.algs.append(SwmmAlgorithm())
+            self.algs.append(SwmmEnsembleAlgorithm())
+            self.algs.append(SwmmExtractAlgorithm())
+            self.algs.append(SwmmImportAlgorithm())
+            self.algs.append(SwmmSweepAlgorithm())
         except Exception, e:
             ProcessingLog.addToLog(ProcessingLog.LOG_ERROR, 
                 'Could not create Swmm algorithm')
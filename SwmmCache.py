@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmCache.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+
+# serializes eviction between the threads of a process
+_lock = threading.Lock()
+
+# number of users of the entries in use in this process, by directory,
+# they are not evicted
+_pinned = {}
+
+def fileDigest(filename, chunk_size=1 << 20):
+    "sha1 of the content of a file"
+    h = hashlib.sha1()
+    f = open(filename, 'rb')
+    try:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    finally:
+        f.close()
+    return h.hexdigest()
+
+def fileIdentity(filename):
+    "cheap identity of a file: path, size and modification time"
+    st = os.stat(filename)
+    return '%s:%d:%d'%(os.path.abspath(filename), st.st_size, int(st.st_mtime))
+
+def linkOrCopy(src, dst):
+    "hard link src to dst if possible, copy it otherwise"
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except (AttributeError, OSError):
+        shutil.copyfile(src, dst)
+
+class SwmmCache(object):
+    """Content addressed store of files
+
+    Each entry is a directory named after its key holding a set of files.
+    Entries are looked up by key, the least recently used ones are removed
+    when the total size of the cache exceeds max_size (in bytes).
+    """
+
+    def __init__(self, folder, max_size):
+        self.folder = folder
+        self.max_size = max_size
+        if not os.path.isdir(folder):
+            try:
+                os.makedirs(folder)
+            except OSError:
+                if not os.path.isdir(folder): raise
+
+    @staticmethod
+    def key(*parts):
+        h = hashlib.sha1()
+        for part in parts:
+            if not isinstance(part, bytes):
+                part = unicode(part).encode('utf-8')
+            h.update(part)
+            h.update(b'\0')
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.folder, key)
+
+    def get(self, key):
+        "directory of the entry, None if there is no such entry"
+        path = self.path(key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            os.utime(path, None) # marks the entry as recently used
+        except OSError:
+            return None
+        return path
+
+    def pin(self, key):
+        """Directory of the entry, like get, kept until unpin is called
+
+        For files used in place (e.g. an open database), the entry is not
+        evicted by this process meanwhile. Other processes only evict the
+        least recently used entries, and it was just marked as used.
+        """
+        with _lock:
+            path = self.get(key)
+            if path is not None:
+                _pinned[path] = _pinned.get(path, 0) + 1
+            return path
+
+    def unpin(self, key):
+        "the entry of key, pinned before, may be evicted again"
+        path = self.path(key)
+        with _lock:
+            if _pinned.get(path, 0) > 1:
+                _pinned[path] -= 1
+            else:
+                _pinned.pop(path, None)
+
+    def put(self, key, files):
+        """Stores files (a map of entry file name to source path)
+
+        The entry is written in a temporary directory and renamed, a
+        concurrent put of the same key is harmless. Returns the
+        directory of the entry.
+        """
+        tmp = tempfile.mkdtemp(prefix='.tmp_', dir=self.folder)
+        try:
+            for name, src in files.items():
+                linkOrCopy(src, os.path.join(tmp, name))
+            os.rename(tmp, self.path(key))
+        except (IOError, OSError):
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(self.path(key)): raise
+        self.evict(keep=key)
+        return self.path(key)
+
+    def evict(self, keep=None):
+        "removes least recently used entries until the cache fits max_size"
+        with _lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.folder):
+                path = os.path.join(self.folder, name)
+                if name.startswith('.tmp_') or not os.path.isdir(path):
+                    continue
+                try:
+                    size = sum(os.path.getsize(os.path.join(path, f))
+                            for f in os.listdir(path))
+                    entries.append((os.path.getmtime(path), size, name))
+                except OSError:
+                    continue # removed by someone else
+                total += size
+            entries.sort()
+            for mtime, size, name in entries:
+                if total <= self.max_size:
+                    break
+                if name == keep or os.path.join(self.folder, name) \
+                        in _pinned:
+                    continue
+                shutil.rmtree(os.path.join(self.folder, name),
+                        ignore_errors=True)
+                total -= size
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmCli.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+# Command line export, simulation and result extraction, without qgis
+#
+#   python SwmmCli.py export SOURCE swmm.inp [--title TITLE]
+#   python SwmmCli.py run swmm.inp [--swmm swmm5 | --lib libswmm5.so]
+#   python SwmmCli.py results swmm.out FOLDER [--elements ...] [--summary]
+#   python SwmmCli.py simulate SOURCE FOLDER [options of the above]
+#   python SwmmCli.py import swmm.inp DESTINATION [--srid SRID] [--replace]
+#
+# SOURCE is a postgres connection string, a GeoPackage or a folder of
+# shapefiles (see SwmmSource.openSource), DESTINATION a postgres
+# connection string or a GeoPackage (see SwmmImport.openTarget). Modules are imported by the
+# commands that need them, starting up only costs the python interpreter
+# and argparse, reading a text report does not import numpy.
+
+import os
+import re
+import sys
+import argparse
+import tempfile
+import datetime
+
+DEFAULT_TITLE = 'Swmm Simulation'
+
+class SwmmCliError(Exception):
+    pass
+
+def text(arg):
+    "command line argument as unicode"
+    return arg.decode(sys.getfilesystemencoding() or 'utf-8')
+
+def export(source, filename, title=DEFAULT_TITLE, schema='public'):
+    """Writes the .inp file of the simulation named title
+
+    Tables of the key/value sections (OPTIONS, REPORT, EVAPORATION) are
+    filtered on their first column, the simulation title.
+    """
+    from SwmmInp import openInp, tableLines, keyValLines, SECTIONS, \
+            KEYVAL_SECTIONS
+    from SwmmSource import openSource
+    src = openSource(source, schema)
+    try:
+        f = openInp(filename)
+        try:
+            f.write(u'[TITLE]\n')
+            f.write(title+u'\n\n')
+            for name in SECTIONS:
+                table = src.table(name)
+                if table is None:
+                    continue
+                columns, kinds, rows = table
+                if name in KEYVAL_SECTIONS:
+                    rows = [row for row in rows if unicode(row[0]) == title]
+                    if not rows:
+                        raise SwmmCliError("No simulation named '"+title
+                                +"' in "+name)
+                    f.writelines(keyValLines(name, columns, rows))
+                else:
+                    f.writelines(tableLines(name, columns, kinds, rows))
+        finally:
+            f.close()
+    finally:
+        src.close()
+
+def srsDefinition(srid):
+    "WKT of an EPSG code, None if the gdal python bindings are missing"
+    try:
+        from osgeo import osr
+    except ImportError:
+        return None
+    srs = osr.SpatialReference()
+    if srs.ImportFromEPSG(srid) != 0:
+        raise SwmmCliError('Unknown srid %d'%srid)
+    return srs.ExportToWkt()
+
+def importInp(filename, destination, title=DEFAULT_TITLE, schema='public',
+        srid=None, replace=False, quiet=False):
+    """Imports the sections of an .inp file into tables (see
+    SwmmImport.importInp), prints the number of rows of each table"""
+    from SwmmImport import openTarget, importInp
+    target = openTarget(destination, schema, srid,
+            srsDefinition(srid) if srid else None, replace)
+    try:
+        counts, skipped = importInp(filename, target, title, progress(quiet))
+    finally:
+        target.close()
+        if not quiet: sys.stderr.write('\n')
+    if not quiet:
+        for table, count in sorted(counts.items()):
+            sys.stderr.write('%-15s %9d\n'%(table, count))
+        if skipped:
+            sys.stderr.write('not imported: '+', '.join(skipped)+'\n')
+
+def progress(quiet):
+    "prints the percentage of the simulation done to stderr unless quiet"
+    def percent(p):
+        sys.stderr.write('\r%3d%%'%p)
+        sys.stderr.flush()
+    return None if quiet else percent
+
+def run(filename, rptfilename, outfilename, swmm=None, quiet=False):
+    """Runs the simulation with the swmm command line tool
+
+    The console output of swmm goes to a .log file next to the report.
+    """
+    from SwmmRunner import runProcess
+    for previous in (rptfilename, outfilename):
+        if os.path.exists(previous): os.remove(previous)
+    try:
+        log = runProcess([swmm or os.environ.get('SWMM_CLI', 'swmm5'),
+            filename, rptfilename, outfilename],
+            os.path.splitext(rptfilename)[0]+'.log', progress(quiet))
+    except OSError, e:
+        raise SwmmCliError('Could not run swmm: '+unicode(e))
+    finally:
+        if not quiet: sys.stderr.write('\n')
+    if re.search('There are errors', log) or not os.path.exists(outfilename):
+        raise SwmmCliError('There were errors, look into '+rptfilename)
+
+def runInProcess(lib, filename, rptfilename, elements=None, start=None,
+        end=None, quiet=False):
+    """Runs the simulation with the swmm shared library and iterates over
+    its results (see SwmmEngine.SwmmLibrary.run)
+
+    Only the report is written. swmm still writes a binary output, it
+    reads the time series tables of the report back from it, to a
+    temporary file next to the report which is removed afterwards.
+    """
+    from SwmmEngine import SwmmLibrary, SwmmEngineError
+    if os.path.exists(rptfilename): os.remove(rptfilename)
+    fd, outfilename = tempfile.mkstemp(suffix='.out', prefix='.tmp_',
+            dir=os.path.dirname(os.path.abspath(rptfilename)))
+    os.close(fd)
+    try:
+        for record in SwmmLibrary(lib).run(filename, rptfilename,
+                outfilename, elements, start, end, progress(quiet)):
+            yield record
+    except (SwmmEngineError, OSError), e:
+        raise SwmmCliError(unicode(e)+', look into '+rptfilename)
+    finally:
+        if os.path.exists(outfilename): os.remove(outfilename)
+        if not quiet: sys.stderr.write('\n')
+
+def parseTime(value):
+    "'YYYY-MM-DD HH:MM[:SS]' to 'YYYY-MM-DD HH:MM:SS', None if empty"
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(value,
+            '%Y-%m-%d %H:%M:%S' if value.count(':') == 2
+            else '%Y-%m-%d %H:%M').strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+                "invalid time '"+value+"', expected YYYY-MM-DD HH:MM:SS")
+
+def parseElements(value):
+    elements = set(text(e).strip() for e in value.split(',') if e.strip())
+    return elements or None
+
+def readResults(filename, elements=None, start=None, end=None):
+    """Result records (see SwmmReport.readReport) of a binary output file
+    (.out) or of a text report"""
+    if filename.lower().endswith('.out'):
+        from SwmmOutput import SwmmOutput, outputRecords
+        return outputRecords(SwmmOutput(filename), None, elements, start,
+                end)
+    from SwmmReport import readReport
+    return readReport(filename, None, elements, start, end)
+
+def resultStep(filename):
+    """reporting step in seconds of a binary output file, a text report
+    or an .inp file, None if it is not found"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.out':
+        from SwmmOutput import SwmmOutput
+        return SwmmOutput(filename).report_step
+    if extension == '.inp':
+        from SwmmEngine import reportStep, SwmmEngineError
+        try:
+            return reportStep(filename)
+        except SwmmEngineError:
+            return None
+    from SwmmReport import reportStep
+    return reportStep(filename)
+
+def results(records, folder, summary=False, step=None):
+    """Writes result records to nodes.csv and links.csv in folder, as
+    time series or, with summary, as the statistics of SwmmSummary (step
+    is the reporting step of the simulation, see SwmmSummary)"""
+    import csv
+    from SwmmReport import NODE
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    files = [open(os.path.join(folder, name), 'wb')
+            for name in ('nodes.csv', 'links.csv')]
+    try:
+        nodes, links = [csv.writer(f) for f in files]
+        if summary:
+            from SwmmSummary import SwmmSummary, NODE_STATISTICS, \
+                    LINK_STATISTICS
+            statistics = SwmmSummary(step)
+            for record in records:
+                statistics.add(*record)
+            nodes.writerow(['Node'] + NODE_STATISTICS)
+            for node_id, values in statistics.nodes():
+                nodes.writerow([node_id.encode('utf-8')] + values)
+            links.writerow(['Link'] + LINK_STATISTICS)
+            for link_id, values in statistics.links():
+                links.writerow([link_id.encode('utf-8')] + values)
+        else:
+            nodes.writerow(['Node', 'Time', 'Inflow', 'Flooding', 'Depth',
+                'Head'])
+            links.writerow(['Link', 'Time', 'Flow', 'Velocity', 'Depth',
+                'PercentFull'])
+            for kind, element_id, time, values in records:
+                (nodes if kind == NODE else links).writerow(
+                        [element_id.encode('utf-8'), time] + values)
+    finally:
+        for f in files:
+            f.close()
+
+def addRunArguments(parser):
+    parser.add_argument('--swmm', default=None,
+            help='swmm command line tool (SWMM_CLI or swmm5 if not given)')
+    parser.add_argument('--lib', default=None,
+            help='swmm shared library, runs the simulation in process '
+            '(no binary output is written)')
+    parser.add_argument('--quiet', action='store_true',
+            help='do not print the progress of the simulation')
+
+def addResultArguments(parser):
+    parser.add_argument('--elements', type=parseElements, default=None,
+            help='comma separated node and link identifiers (all if not given)')
+    parser.add_argument('--start', type=parseTime, default=None,
+            help='results from YYYY-MM-DD HH:MM:SS')
+    parser.add_argument('--end', type=parseTime, default=None,
+            help='results until YYYY-MM-DD HH:MM:SS')
+    parser.add_argument('--summary', action='store_true',
+            help='statistics per element instead of time series')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description='swmm export, import, simulation and results '
+            'without qgis')
+    commands = parser.add_subparsers(dest='command')
+
+    p = commands.add_parser('export', help='write the .inp file')
+    p.add_argument('source', help='postgres connection string (PG:...), '
+            'GeoPackage or folder of shapefiles')
+    p.add_argument('inp', help='.inp file to write')
+    p.add_argument('--title', type=text, default=DEFAULT_TITLE,
+            help='simulation title of the analysis options')
+    p.add_argument('--schema', default='public', help='postgres schema')
+
+    p = commands.add_parser('run', help='run a simulation')
+    p.add_argument('inp', help='.inp file')
+    p.add_argument('--rpt', default=None,
+            help='report file (next to the .inp if not given)')
+    p.add_argument('--out', default=None,
+            help='binary output file (next to the .inp if not given)')
+    addRunArguments(p)
+
+    p = commands.add_parser('results',
+            help='write results as nodes.csv and links.csv')
+    p.add_argument('results', help='binary output (.out) or text report')
+    p.add_argument('folder', help='folder of the csv files')
+    addResultArguments(p)
+
+    p = commands.add_parser('simulate',
+            help='export, run and write results in a folder')
+    p.add_argument('source', help='see export')
+    p.add_argument('folder', help='folder of the simulation files')
+    p.add_argument('--title', type=text, default=DEFAULT_TITLE,
+            help='simulation title of the analysis options')
+    p.add_argument('--schema', default='public', help='postgres schema')
+    addRunArguments(p)
+    addResultArguments(p)
+
+    p = commands.add_parser('import',
+            help='import an .inp file into section tables')
+    p.add_argument('inp', help='.inp file')
+    p.add_argument('destination', help='postgres connection string '
+            '(PG:...) or GeoPackage, created if it does not exist')
+    p.add_argument('--title', type=text, default=DEFAULT_TITLE,
+            help='simulation title of the analysis options')
+    p.add_argument('--schema', default='public', help='postgres schema')
+    p.add_argument('--srid', type=int, default=None,
+            help='EPSG code of the coordinates (unknown if not given)')
+    p.add_argument('--replace', action='store_true',
+            help='replace the tables that already exist')
+    p.add_argument('--quiet', action='store_true',
+            help='do not print the progress and the tables written')
+
+    args = parser.parse_args(argv)
+
+    from SwmmSource import SwmmSourceError
+    from SwmmImport import SwmmImportError
+    try:
+        if args.command == 'export':
+            export(args.source, args.inp, args.title, args.schema)
+        elif args.command == 'run':
+            base = os.path.splitext(args.inp)[0]
+            if args.lib:
+                for record in runInProcess(args.lib, args.inp,
+                        args.rpt or base+'.rpt', set(), quiet=args.quiet):
+                    pass
+            else:
+                run(args.inp, args.rpt or base+'.rpt',
+                        args.out or base+'.out', args.swmm, args.quiet)
+        elif args.command == 'import':
+            importInp(args.inp, args.destination, args.title, args.schema,
+                    args.srid, args.replace, args.quiet)
+        elif args.command == 'results':
+            results(readResults(args.results, args.elements, args.start,
+                args.end), args.folder, args.summary,
+                resultStep(args.results) if args.summary else None)
+        else:
+            if not os.path.isdir(args.folder):
+                os.makedirs(args.folder)
+            inp = os.path.join(args.folder, 'swmm.inp')
+            rpt = os.path.join(args.folder, 'swmm.rpt')
+            out = os.path.join(args.folder, 'swmm.out')
+            export(args.source, inp, args.title, args.schema)
+            if args.lib:
+                records = runInProcess(args.lib, inp, rpt, args.elements,
+                        args.start, args.end, args.quiet)
+            else:
+                run(inp, rpt, out, args.swmm, args.quiet)
+                records = readResults(out, args.elements, args.start,
+                        args.end)
+            results(records, args.folder, args.summary, resultStep(inp))
+    except (SwmmCliError, SwmmSourceError, SwmmImportError,
+            EnvironmentError), e:
+        sys.stderr.write('error: '+unicode(e).encode('utf-8')+'\n')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmEngine.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import ctypes
+import datetime
+import threading
+
+import numpy
+
+from SwmmReport import NODE, LINK
+from SwmmInp import readSections
+from SwmmRunner import SwmmCanceled
+
+# object types, node and link results and time properties of the toolkit
+# api (toolkit_enums.h)
+SM_NODE = 2
+SM_LINK = 3
+SM_TOTALINFLOW = 0
+SM_NODEFLOOD = 4
+SM_NODEDEPTH = 5
+SM_NODEHEAD = 6
+SM_LINKFLOW = 0
+SM_LINKDEPTH = 1
+SM_LINKVOL = 2
+SM_SETTING = 5
+SM_STARTDATE = 0
+SM_ENDDATE = 1
+SM_REPORTDATE = 2
+
+# swmm identifiers are at most MAXID characters long
+MAXID = 63
+
+# swmm keeps its state in globals, one simulation at a time per process
+_lock = threading.Lock()
+
+class SwmmEngineError(Exception):
+    pass
+
+def timeStep(value):
+    """seconds of a time step option, HH:MM[:SS] or decimal hours
+
+    Parsed as swmm does, the step is rounded to the second.
+    """
+    try:
+        if u':' in value:
+            parts = [int(v) for v in value.split(u':')]
+            if not 2 <= len(parts) <= 3:
+                raise ValueError(value)
+            seconds = 3600*parts[0] + 60*parts[1] + sum(parts[2:])
+        else:
+            seconds = int(float(value)*3600 + 0.5)
+    except ValueError:
+        raise SwmmEngineError('Invalid time step: '+value)
+    if seconds <= 0:
+        raise SwmmEngineError('Invalid time step: '+value)
+    return seconds
+
+def reportStep(filename):
+    "seconds of the reporting step of an .inp file (REPORT_STEP option)"
+    options = dict((row[0].upper(), row[1]) for row in
+            readSections(filename, ['OPTIONS']).get('OPTIONS', [])
+            if len(row) > 1)
+    return timeStep(options.get('REPORT_STEP', '0:15:00'))
+
+class SwmmLibrary(object):
+    """In process simulation with the swmm5 shared library
+
+    Uses the toolkit api (swmm_open, swmm_start, swmm_step, swmm_end) of
+    the OWA swmm library. Results are read from the engine at each
+    reporting step instead of being read back from the output files.
+    """
+
+    def __init__(self, path):
+        loader = ctypes.WinDLL if os.name == 'nt' else ctypes.CDLL
+        try:
+            self.lib = loader(path)
+            for name in ('swmm_open', 'swmm_start', 'swmm_step', 'swmm_end',
+                    'swmm_report', 'swmm_close', 'swmm_getError',
+                    'swmm_countObjects', 'swmm_getObjectId',
+                    'swmm_getNodeResult', 'swmm_getLinkResult',
+                    'swmm_getSimulationDateTime'):
+                getattr(self.lib, name)
+        except (OSError, AttributeError), e:
+            raise SwmmEngineError('Cannot use swmm library '+path+': '
+                    +unicode(e))
+        self.lib.swmm_getNodeResult.argtypes = [ctypes.c_int, ctypes.c_int,
+                ctypes.POINTER(ctypes.c_double)]
+        self.lib.swmm_getLinkResult.argtypes = [ctypes.c_int, ctypes.c_int,
+                ctypes.POINTER(ctypes.c_double)]
+        # recent toolkits return ids allocated by the library, to be
+        # freed with swmm_freeMemory, older ones copy them in a buffer
+        self.allocated_ids = hasattr(self.lib, 'swmm_freeMemory')
+
+    def check(self, error):
+        if error:
+            message = ctypes.create_string_buffer(1024)
+            self.lib.swmm_getError(message, len(message))
+            raise SwmmEngineError('swmm error %d: %s'%(error,
+                message.value.strip() or 'see the report for details'))
+
+    def objectIds(self, kind):
+        count = ctypes.c_int()
+        self.check(self.lib.swmm_countObjects(kind, ctypes.byref(count)))
+        ids = []
+        for i in range(count.value):
+            if self.allocated_ids:
+                p = ctypes.c_char_p()
+                self.check(self.lib.swmm_getObjectId(kind, i,
+                    ctypes.byref(p)))
+                ids.append(p.value.decode('utf-8'))
+                self.lib.swmm_freeMemory(p)
+            else:
+                buf = ctypes.create_string_buffer(MAXID+1)
+                self.check(self.lib.swmm_getObjectId(kind, i, buf))
+                ids.append(buf.value.decode('utf-8'))
+        return ids
+
+    def dateTime(self, kind):
+        values = [ctypes.c_int() for i in range(6)]
+        self.check(self.lib.swmm_getSimulationDateTime(kind,
+            *[ctypes.byref(v) for v in values]))
+        return datetime.datetime(*[v.value for v in values])
+
+    def run(self, filename, rptfilename, outfilename, elements=None,
+            start=None, end=None, percent=None, canceled=None):
+        """Runs the simulation of an .inp file and iterates over results
+
+        Yields the records of SwmmReport.readReport, time step by time
+        step, for the elements and time window given (see readReport).
+        The window only filters the results, the simulation runs to its
+        end. The report is still written by swmm (options, errors and
+        summary tables), as is the binary output, which is not read.
+        percent and canceled are as in SwmmRunner.runProcess.
+
+        Values are those at the end of the first routing step reaching a
+        reporting time, they are not interpolated at the reporting time
+        as in swmm output files. Velocity is the flow divided by the mean
+        wetted area of the conduit (volume over length) and percent full
+        is the depth over the full depth of the cross section (None for
+        irregular sections), the toolkit gives neither. Links that are not
+        conduits have no velocity (0) and, as in output files, their
+        percent full is their setting (e.g. 100 for a pump on, 50 for a
+        half open orifice).
+        """
+        # conduit length and full depth, and the reporting step, are
+        # not given by the toolkit, they are read from the .inp
+        sections = readSections(filename, ['OPTIONS', 'CONDUITS',
+            'XSECTIONS'])
+        options = dict((row[0].upper(), row[1])
+                for row in sections.get('OPTIONS', []) if len(row) > 1)
+        report_step = 1000*timeStep(options.get('REPORT_STEP', '0:15:00'))
+        lengths = {}
+        for row in sections.get('CONDUITS', []):
+            try:
+                lengths[row[0]] = float(row[3])
+            except (IndexError, ValueError):
+                pass
+        full_depths = {}
+        for row in sections.get('XSECTIONS', []):
+            try:
+                full_depths[row[0]] = float(row[2])
+            except (IndexError, ValueError):
+                pass # irregular sections refer to a transect
+
+        with _lock:
+            self.check(self.lib.swmm_open(filename.encode('utf-8'),
+                rptfilename.encode('utf-8'), outfilename.encode('utf-8')))
+            try:
+                self.check(self.lib.swmm_start(0))
+                try:
+                    for record in self._steps(elements, start, end,
+                            report_step, lengths, full_depths, percent,
+                            canceled):
+                        yield record
+                finally:
+                    self.lib.swmm_end()
+                self.lib.swmm_report()
+            finally:
+                self.lib.swmm_close()
+
+    def _steps(self, elements, start, end, report_step, lengths,
+            full_depths, percent, canceled):
+        node_ids = self.objectIds(SM_NODE)
+        link_ids = self.objectIds(SM_LINK)
+        nodes = [i for i, node_id in enumerate(node_ids)
+                if elements is None or node_id in elements]
+        links = [i for i, link_id in enumerate(link_ids)
+                if elements is None or link_id in elements]
+        link_lengths = [lengths.get(link_ids[i]) for i in links]
+        link_depths = [full_depths.get(link_ids[i]) for i in links]
+
+        start_date = self.dateTime(SM_STARTDATE)
+        duration = (self.dateTime(SM_ENDDATE) - start_date).total_seconds()
+        report_start = (self.dateTime(SM_REPORTDATE)
+                - start_date).total_seconds()*1000
+
+        # results of the current step, node inflow, flooding, depth and
+        # head, link flow, depth, volume and setting
+        node_values = numpy.zeros((len(nodes), 4))
+        link_values = numpy.zeros((len(links), 4))
+        value = ctypes.c_double()
+        get_node = self.lib.swmm_getNodeResult
+        get_link = self.lib.swmm_getLinkResult
+
+        elapsed = ctypes.c_double()
+        report_time = report_step
+        current = -1
+        # past end, the simulation still runs to its end so that the
+        # report is complete, results are no longer read
+        past_end = False
+        while True:
+            self.check(self.lib.swmm_step(ctypes.byref(elapsed)))
+            if canceled and canceled():
+                raise SwmmCanceled('Simulation canceled')
+            # elapsed time is 0 after the last step, which ends the run
+            finished = elapsed.value <= 0
+            now = 1000*duration if finished \
+                    else round(elapsed.value*86400000) # ms, as in swmm
+            if percent:
+                # a simulation may end when it starts
+                done = min(100, int(now/10/duration)) if duration > 0 \
+                        else (100 if finished else 0)
+                if done != current:
+                    current = done
+                    percent(current)
+            if now < report_time or past_end:
+                if finished: break
+                continue
+
+            for row, i in enumerate(nodes):
+                for column, result in enumerate((SM_TOTALINFLOW,
+                        SM_NODEFLOOD, SM_NODEDEPTH, SM_NODEHEAD)):
+                    get_node(i, result, ctypes.byref(value))
+                    node_values[row, column] = value.value
+            for row, i in enumerate(links):
+                for column, result in enumerate((SM_LINKFLOW, SM_LINKDEPTH,
+                        SM_LINKVOL, SM_SETTING)):
+                    get_link(i, result, ctypes.byref(value))
+                    link_values[row, column] = value.value
+            node_rows = node_values.tolist()
+            link_rows = []
+            for (flow, depth, volume, setting), length, full_depth in zip(
+                    link_values.tolist(), link_lengths, link_depths):
+                if length is None:
+                    # not a conduit, swmm output files hold the setting of
+                    # pumps and regulators in place of the capacity
+                    link_rows.append([flow, 0., depth, 100*setting])
+                else:
+                    area = volume/length
+                    link_rows.append([flow, flow/area if area > 0 else 0.,
+                        depth, 100*depth/full_depth if full_depth else None])
+
+            while now >= report_time:
+                if report_time >= report_start:
+                    time = (start_date + datetime.timedelta(
+                        seconds=round(report_time/1000.))).strftime(
+                                '%Y-%m-%d %H:%M:%S')
+                    if end and time > end:
+                        past_end = True
+                        break
+                    if not (start and time < start):
+                        for i, values in zip(nodes, node_rows):
+                            yield NODE, node_ids[i], time, values
+                        for i, values in zip(links, link_rows):
+                            yield LINK, link_ids[i], time, values
+                report_time += report_step
+            if finished:
+                break
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmEnsembleAlgorithm.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import re
+import tempfile
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+from processing.core.GeoAlgorithmExecutionException import \
+        GeoAlgorithmExecutionException
+from processing.core.ProcessingLog import ProcessingLog
+from processing.core.parameters import ParameterString
+from processing.core.parameters import ParameterNumber
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.tools import dataobjects
+
+from SwmmAlgorithm import SwmmAlgorithm, SwmmResultWriter
+
+class SwmmEnsembleAlgorithm(SwmmAlgorithm):
+    """Runs one simulation per SIMULATION_TITLE of the OPTIONS table
+
+    Sections that do not depend on the title are exported once, each run
+    gets its own work directory and the swmm processes are run on a pool
+    of worker threads. Without command line tool, runs go one after the
+    other through the swmm library. Results of all runs go to the same
+    outputs, tagged by a Scenario field.
+    """
+
+    TITLES = 'TITLES'
+    WORKERS = 'WORKERS'
+
+    # prefix of the work directory created in the output folder
+    WORKDIR_PREFIX = 'swmm_ensemble_'
+
+    def commandLineName(self):
+        return 'swmm:ensemble'
+
+    def defineCharacteristics(self):
+        SwmmAlgorithm.defineCharacteristics(self)
+        self.name = 'Simulate an ensemble of scenarios'
+
+        # the titles replace the single simulation title
+        self.parameters = [p for p in self.parameters if p.name != self.TITLE]
+        self.parameters.insert(0, ParameterString(self.TITLES,
+            'Simulation titles (comma separated, all titles of the analysis options if empty)',
+            '', optional=True))
+        self.parameters.insert(1, ParameterNumber(self.WORKERS,
+            'Number of simulations run in parallel', 1, None,
+            multiprocessing.cpu_count()))
+
+    def simulationTitles(self):
+        titles = self.getParameterValue(self.TITLES)
+        if titles and titles.strip():
+            return [t.strip() for t in titles.split(',') if t.strip()]
+        uri = self.getParameterValue(self.OPTIONS)
+        if not uri:
+            raise GeoAlgorithmExecutionException(
+                    'No analysis options to take the simulation titles from')
+        titles = []
+        for feature in dataobjects.getObjectFromUri(uri).getFeatures():
+            title = unicode(feature[0])
+            if not title in titles: titles.append(title)
+        return titles
+
+    def runAlgorithm(self, progress):
+        # runs go in parallel with the command line tool, the library
+        # is only used without it and runs one simulation at a time
+        swmm_cli, swmm_lib = self.swmmSettings()
+        if swmm_cli:
+            swmm_lib = None
+
+        folder = ProcessingConfig.getSetting(ProcessingConfig.OUTPUT_FOLDER)
+        workdir = tempfile.mkdtemp(prefix=self.WORKDIR_PREFIX, dir=folder)
+        runs = self.writeRuns(workdir, swmm_cli, swmm_lib, progress)
+        writer = SwmmResultWriter(self, scenario=True,
+                mode=self.getParameterValue(self.OUTPUT_MODE))
+        if swmm_lib:
+            for title, filename, rptfilename, outfilename in runs:
+                progress.setText("running simulation '"+title+"'")
+                self.simulateInProcess(swmm_lib, filename, rptfilename,
+                        outfilename, progress, writer, title)
+            return
+
+        self.simulateRuns(runs, swmm_cli, progress)
+        elements, start, end = self.resultFilter()
+        for title, filename, rptfilename, outfilename in runs:
+            progress.setText("postprocessing output of '"+title+"'")
+            writer.write(self.resultRecords(rptfilename, outfilename,
+                progress, elements, start, end), title,
+                step=self.reportStep(filename))
+
+    def runDirectory(self, workdir, index, title):
+        rundir = os.path.join(workdir,
+                '%03d_%s'%(index, re.sub('[^\w.-]+', '_', title)))
+        os.mkdir(rundir)
+        return rundir
+
+    def writeRuns(self, workdir, swmm_cli, swmm_lib, progress):
+        """Writes the .inp file of each run in its own directory of workdir
+
+        Returns the list of (title, .inp, .rpt, .out) of the runs.
+        """
+        titles = self.simulationTitles()
+        if not titles:
+            raise GeoAlgorithmExecutionException('No simulation to run')
+
+        # sections shared by all scenarios are exported once
+        progress.setText('exporting shared sections')
+        os.mkdir(os.path.join(workdir, 'sections'))
+        rendered = self.renderSections(os.path.join(workdir, 'sections'))
+
+        # spin-ups run one at a time, scenarios with the same network
+        # before the hot start time share one
+        hotstart = self.timeParameter(self.HOTSTART_TIME)
+        runs = []
+        for i, title in enumerate(titles):
+            rundir = self.runDirectory(workdir, i, title)
+            filename = os.path.join(rundir, 'swmm.inp')
+            self.writeInp(filename, title, rendered)
+            if hotstart:
+                self.useHotStart(filename, hotstart, swmm_cli, swmm_lib,
+                        progress)
+            runs.append((title, filename, os.path.join(rundir, 'swmm.rpt'),
+                os.path.join(rundir, 'swmm.out')))
+        return runs
+
+    def simulateRuns(self, runs, swmm_cli, progress):
+        "runs the simulations on the worker pool, they must all succeed"
+        # progress only follows finished runs, the runs stop on cancel
+        canceled = self.cancelCheck(progress)
+
+        def run(args):
+            title, filename, rptfilename, outfilename = args
+            try:
+                return title, self.simulate(swmm_cli, filename, rptfilename,
+                        outfilename, None, canceled), None
+            except Exception, e:
+                return title, None, e
+
+        workers = max(1, int(self.getParameterValue(self.WORKERS) or 1))
+        progress.setText('running %d simulations on %d workers'
+                %(len(runs), workers))
+        pool = ThreadPool(min(workers, len(runs)))
+        failed = []
+        logs = {}
+        try:
+            for done, (title, log, error) in enumerate(
+                    pool.imap_unordered(run, runs)):
+                if error:
+                    failed.append(title)
+                    ProcessingLog.addToLog(ProcessingLog.LOG_ERROR,
+                            "Simulation '"+title+"' failed: "+unicode(error))
+                else:
+                    logs[title] = log
+                    ProcessingLog.addToLog(ProcessingLog.LOG_INFO,
+                            "Simulation '"+title+"'\n"+log)
+                progress.setPercentage(int(100*(done+1)/len(runs)))
+        finally:
+            pool.close()
+            pool.join()
+        if failed and canceled and canceled():
+            raise GeoAlgorithmExecutionException('Simulations canceled')
+        if failed:
+            raise GeoAlgorithmExecutionException(
+                    'Simulations failed: '+', '.join(failed))
+
+        for title, filename, rptfilename, outfilename in runs:
+            try:
+                self.checkSwmmLog(logs[title], rptfilename)
+            except RuntimeError:
+                raise GeoAlgorithmExecutionException("Simulation '"+title
+                        +"' has errors, look into logs for details")
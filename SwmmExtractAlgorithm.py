@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmExtractAlgorithm.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+
+from processing.core.GeoAlgorithmExecutionException import \
+        GeoAlgorithmExecutionException
+from processing.core.parameters import ParameterFile
+from processing.core.outputs import OutputTable
+
+from SwmmAlgorithm import SwmmAlgorithm, SwmmResultWriter, BatchWriter
+from SwmmReport import NODE
+from SwmmProfile import TimedIterator
+
+class SwmmExtractAlgorithm(SwmmAlgorithm):
+    """Extracts node and link time series of a previous simulation
+
+    Reads the binary output file if given, the text report otherwise, for
+    the elements and time window of the result filter parameters. The
+    report is read through its block index, only the blocks of the
+    selected elements are parsed.
+    """
+
+    REPORT_FILE = 'REPORT_FILE'
+    OUTPUT_FILE = 'OUTPUT_FILE'
+
+    def commandLineName(self):
+        return 'swmm:extract'
+
+    def defineCharacteristics(self):
+        self.name = 'Extract results'
+        self.group = 'Simulation'
+
+        self.addParameter(ParameterFile(self.REPORT_FILE, 'Text report (.rpt)', False, True, 'rpt'))
+        self.addParameter(ParameterFile(self.OUTPUT_FILE, 'Binary output (.out)', False, True, 'out'))
+        self.addResultFilterParameters()
+
+        self.addOutput(OutputTable(self.NODE_TABLE_OUTPUT, 'Node output table'))
+        self.addOutput(OutputTable(self.LINK_TABLE_OUTPUT, 'Link output table'))
+
+    def checkBeforeOpeningParametersDialog(self):
+        return None
+
+    def runAlgorithm(self, progress):
+        rptfilename = self.getParameterValue(self.REPORT_FILE) or ''
+        outfilename = self.getParameterValue(self.OUTPUT_FILE) or ''
+        if not os.path.isfile(rptfilename) and not os.path.isfile(outfilename):
+            raise GeoAlgorithmExecutionException(
+                    'A text report or a binary output file is needed')
+
+        node_writer = BatchWriter(self.getOutputFromName(
+                self.NODE_TABLE_OUTPUT).getTableWriter(
+                        SwmmResultWriter.nodeFields().toList()), records=True)
+        link_writer = BatchWriter(self.getOutputFromName(
+                self.LINK_TABLE_OUTPUT).getTableWriter(
+                        SwmmResultWriter.linkFields().toList()), records=True)
+
+        progress.setText('extracting results')
+        start = time.time()
+        records = TimedIterator(self.resultRecords(rptfilename, outfilename,
+            progress, *self.resultFilter()))
+        for kind, element_id, t, values in records:
+            (node_writer if kind == NODE else link_writer).add(
+                    [element_id, t] + list(values))
+        node_writer.flush()
+        link_writer.flush()
+        self.profile.add('results', 'read', records.seconds, records.rows)
+        self.profile.add('results', 'write',
+                time.time() - start - records.seconds,
+                node_writer.count + link_writer.count)
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmGeometry.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Geometries of the nodes and links joined to the results
+#
+# Only the identifier (first column) and the WKB of the features are
+# kept, and only for the identifiers found in the results: they are
+# fetched as results come, with filter expressions, until a layer had
+# FILTER_LIMIT identifiers or MAX_FILTERS lookups and is read as a whole.
+# With the simulation cache on, what was fetched from a layer is kept in
+# a sqlite file of the cache, keyed by the signature of the layer (see
+# SwmmLayer.geometrySignature), and the layer is not read again until it
+# changes.
+
+import os
+import time
+import struct
+import sqlite3
+import tempfile
+
+from qgis.core import QgsFeatureRequest, QgsGeometry, QGis
+from PyQt4.QtCore import QPyNullVariant
+
+from SwmmCache import SwmmCache
+from SwmmLayer import geometrySignature
+from SwmmSource import quoteIdentifier
+
+# identifiers and lookups with filter expressions in a layer, at most, it
+# is read as a whole past that
+FILTER_LIMIT = 10000
+MAX_FILTERS = 3
+
+# identifiers in a sqlite query
+CHUNK_SIZE = 500
+
+STORE_FILE = 'geometries.sqlite'
+
+def quoteString(value):
+    return u"'"+value.replace(u"'", u"''")+u"'"
+
+def chunks(values, size=CHUNK_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i+size]
+
+def pointCoordinates(wkb):
+    "x, y of a WKB point (2D, Z or M, ISO or EWKB), None if it's not one"
+    if not wkb or len(wkb) < 21:
+        return None
+    order = '<' if ord(wkb[0]) == 1 else '>'
+    kind, = struct.unpack(order+'I', wkb[1:5])
+    if (kind & 0xffff) % 1000 != 1:
+        return None
+    return struct.unpack(order+'2d', wkb[5:21])
+
+def lineWkb(start, end):
+    "WKB of the line between two WKB points, None if one is missing"
+    a = pointCoordinates(start)
+    b = pointCoordinates(end)
+    if a is None or b is None:
+        return None
+    return struct.pack('<BII4d', 1, 2, 2, a[0], a[1], b[0], b[1])
+
+class LayerGeometries(object):
+    """Geometries of the features of a layer, by identifier
+
+    Rows fetched from the layer go to a sqlite store, in the cache if
+    given (and if the layer has a signature), in memory otherwise. With
+    ends, rows also hold the second and third attributes, the inlet and
+    outlet nodes of a link.
+
+    A store in the cache is opened when rows are first looked up, its
+    entry is pinned (see SwmmCache.pin) until close is called.
+    """
+
+    def __init__(self, layer, cache=None, ends=False):
+        self.layer = layer
+        self.ends = ends
+        self.filtered = 0 # identifiers looked up with a filter
+        self.filters = 0 # lookups with a filter
+        signature = geometrySignature(layer) if cache else None
+        self.cache = cache if signature else None
+        self.key = SwmmCache.key('geometries', signature, ends) \
+                if signature else None
+        self.con = None
+        self.complete = False
+
+    def connection(self):
+        "connection to the store, opened if needed"
+        if self.con is None:
+            self.con = self.openStore(self.cache, self.key) \
+                    if self.key else None
+            if self.con is None:
+                self.key = None # kept in memory from now on
+                self.con = sqlite3.connect(':memory:')
+                self.createStore(self.con)
+            self.complete = bool(self.con.execute(
+                'SELECT complete FROM state').fetchone()[0])
+        return self.con
+
+    def close(self):
+        """closes a store of the cache, its entry may be evicted again,
+        a store in memory is kept"""
+        if self.key and self.con is not None:
+            self.con.close()
+            self.con = None
+            self.cache.unpin(self.key)
+
+    @staticmethod
+    def createStore(con):
+        con.execute('CREATE TABLE IF NOT EXISTS geometries ('
+                'id TEXT PRIMARY KEY, wkb BLOB, inlet TEXT, outlet TEXT)')
+        con.execute('CREATE TABLE IF NOT EXISTS state (complete INTEGER)')
+        if not con.execute('SELECT 1 FROM state').fetchone():
+            con.execute('INSERT INTO state VALUES (0)')
+        con.commit()
+
+    def openStore(self, cache, key):
+        """sqlite store of the cache entry key, created if needed, None if
+        the entry could not be pinned"""
+        entry = cache.pin(key)
+        if entry is None:
+            fd, tmp = tempfile.mkstemp(suffix='.sqlite', dir=cache.folder)
+            os.close(fd)
+            try:
+                con = sqlite3.connect(tmp)
+                self.createStore(con)
+                con.close()
+                cache.put(key, {STORE_FILE: tmp})
+            finally:
+                os.remove(tmp)
+            entry = cache.pin(key)
+            if entry is None:
+                return None # evicted by another process
+        try:
+            return sqlite3.connect(os.path.join(entry, STORE_FILE),
+                    timeout=60)
+        except sqlite3.Error:
+            cache.unpin(key)
+            return None
+
+    def fetch(self, ids):
+        """map of identifier to (WKB, inlet, outlet) for the identifiers of
+        ids found in the layer, WKB is None for features without geometry"""
+        found = {}
+        missing = set(ids)
+        con = self.connection()
+        if self.complete and len(missing) > FILTER_LIMIT:
+            rows = con.execute('SELECT id, wkb, inlet, outlet '
+                    'FROM geometries')
+        else:
+            rows = (row for chunk in chunks(missing)
+                    for row in con.execute('SELECT id, wkb, inlet, '
+                        'outlet FROM geometries WHERE id IN ('
+                        +','.join('?'*len(chunk))+')', chunk))
+        for element_id, wkb, inlet, outlet in rows:
+            if element_id in missing:
+                missing.discard(element_id)
+                if wkb is not None or inlet is not None:
+                    found[element_id] = (wkb and str(wkb), inlet, outlet)
+        if self.complete or not missing:
+            return found
+
+        if self.filtered + len(missing) > FILTER_LIMIT \
+                or self.filters >= MAX_FILTERS:
+            self.complete = True
+        else:
+            self.filtered += len(missing)
+            self.filters += 1
+        fetched = self.read(None if self.complete else missing)
+        con.executemany('INSERT OR REPLACE INTO geometries '
+                'VALUES (?, ?, ?, ?)', ((element_id,
+                    wkb and sqlite3.Binary(wkb), inlet, outlet)
+                    for element_id, (wkb, inlet, outlet) in fetched.items()))
+        # identifiers not in the layer are not looked up again until it
+        # changes, which changes the key of the store
+        con.executemany('INSERT OR IGNORE INTO geometries (id) '
+                'VALUES (?)', ((element_id,) for element_id in missing
+                    if not element_id in fetched))
+        if self.complete:
+            con.execute('UPDATE state SET complete = 1')
+        con.commit()
+        for element_id in missing:
+            if element_id in fetched:
+                found[element_id] = fetched[element_id]
+        return found
+
+    def read(self, ids=None):
+        """rows of the features of the layer whose identifier is in ids,
+        fetched with filter expressions, or of all of them"""
+        attributes = [0, 1, 2] if self.ends else [0]
+        if ids is None:
+            requests = [QgsFeatureRequest().setSubsetOfAttributes(attributes)]
+        else:
+            name = quoteIdentifier(
+                    self.layer.dataProvider().fields()[0].name())
+            requests = [QgsFeatureRequest().setFilterExpression(
+                name+u' IN ('+u','.join(quoteString(i) for i in ids)+u')')
+                .setSubsetOfAttributes(attributes)]
+        rows = {}
+        for request in requests:
+            for feature in self.layer.getFeatures(request):
+                values = feature.attributes()
+                if values[0] is None or isinstance(values[0], QPyNullVariant):
+                    continue
+                geometry = feature.geometry()
+                wkb = geometry.asWkb() if geometry else None
+                rows[unicode(values[0])] = (wkb or None,
+                        unicode(values[1]) if self.ends else None,
+                        unicode(values[2]) if self.ends else None)
+        return rows
+
+class GeometryIndex(object):
+    """WKB geometries of the elements of some layers, by identifier
+
+    Identifiers are looked up in the layers in order. With nodes (the
+    index of the node layers), links of layers that are not line layers
+    get the line from their inlet node to their outlet node.
+    """
+
+    def __init__(self, layers, cache=None, nodes=None):
+        self.layers = []
+        for layer in layers:
+            ends = nodes is not None and layer.geometryType() != QGis.Line
+            self.layers.append(LayerGeometries(layer, cache, ends))
+        self.nodes = nodes
+        self.geometries = {}
+        self.seconds = 0.
+        self.rows = 0 # identifiers looked up
+
+    def lookup(self, ids):
+        "fetches the geometries of ids that were not looked up yet"
+        missing = set(i for i in ids if not i in self.geometries)
+        if not missing:
+            return
+        start = time.time()
+        self.rows += len(missing)
+        ends = {}
+        for layer in self.layers:
+            if not missing:
+                break
+            for element_id, (wkb, inlet, outlet) in \
+                    layer.fetch(missing).items():
+                if layer.ends:
+                    ends[element_id] = (inlet, outlet)
+                else:
+                    self.geometries[element_id] = wkb
+                missing.discard(element_id)
+        if ends:
+            self.nodes.lookup(set(n for e in ends.values() for n in e))
+            for element_id, (inlet, outlet) in ends.items():
+                self.geometries[element_id] = lineWkb(
+                        self.nodes.get(inlet), self.nodes.get(outlet))
+        for element_id in missing:
+            self.geometries[element_id] = None
+        self.seconds += time.time() - start
+
+    def get(self, element_id):
+        "WKB of an element looked up before, None if it has no geometry"
+        return self.geometries.get(element_id)
+
+    def close(self):
+        """closes the stores of the layers, and of the node index, they
+        are opened again by the next lookup"""
+        for layer in self.layers:
+            layer.close()
+        if self.nodes is not None:
+            self.nodes.close()
+
+    def geometry(self, element_id):
+        wkb = self.get(element_id)
+        if wkb is None:
+            return None
+        geometry = QgsGeometry()
+        geometry.fromWkb(wkb)
+        return geometry
+
+class GeometryJoin(object):
+    """Gives their geometry to features before they go to a writer
+
+    Features are held until BatchWriter.size of them are there, the
+    geometries of their elements are then looked up at once. flush
+    closes the stores of the index.
+    """
+
+    def __init__(self, index, writer):
+        self.index = index
+        self.writer = writer
+        self.pending = []
+
+    @property
+    def count(self):
+        return self.writer.count + len(self.pending)
+
+    def add(self, feature, element_id):
+        self.pending.append((feature, element_id))
+        if len(self.pending) >= self.writer.size:
+            self.join()
+
+    def join(self):
+        self.index.lookup(set(e for f, e in self.pending))
+        geometries = self.index.geometries
+        add = self.writer.add
+        for feature, element_id in self.pending:
+            wkb = geometries.get(element_id)
+            if wkb is not None:
+                geometry = QgsGeometry()
+                geometry.fromWkb(wkb)
+                feature.setGeometry(geometry)
+            add(feature)
+        self.pending = []
+
+    def flush(self):
+        self.join()
+        self.writer.flush()
+        self.index.close()
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmHotStart.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Hot start files let a simulation start from the state saved by a
+# previous one. A run with a hot start time is split in a spin-up, from
+# the start of the simulation to the hot start time, which saves the
+# state, and the simulation proper which starts from it. The spin-up is
+# only run when what it reads changed, time series and rain data after the
+# hot start time excepted (see spinUpDigest).
+
+import os
+import io
+import hashlib
+import datetime
+
+from SwmmInp import readSections, splitRow, FILE_COLUMNS
+
+class SwmmHotStartError(Exception):
+    pass
+
+def parseOption(options, name, default=None):
+    """datetime of the NAME_DATE and NAME_TIME options
+
+    Dates are MM/DD/YYYY (or MM-DD-YYYY) and times HH:MM[:SS], the time
+    is midnight if missing. Returns default if there is no date.
+    """
+    date = options.get(name+'_DATE')
+    if not date:
+        return default
+    time = (options.get(name+'_TIME') or '0:00').split(':')
+    day = parseDate(date)
+    delta = parseTime(':'.join(time))
+    if day is None or delta is None:
+        raise SwmmHotStartError('Invalid '+name+'_DATE or '+name+'_TIME'
+                ' option: '+date+' '+':'.join(time))
+    return day + delta
+
+def parseDate(value):
+    "datetime of a MM/DD/YYYY (or MM-DD-YYYY) date, None if it is not one"
+    try:
+        month, day, year = [int(v) for v in value.replace('-', '/').split('/')]
+        return datetime.datetime(year, month, day)
+    except ValueError:
+        return None
+
+def parseTime(value):
+    "timedelta of a HH:MM[:SS] time or of decimal hours, None if invalid"
+    try:
+        if ':' in value:
+            hms = [int(v) for v in value.split(':')]
+            if len(hms) > 3:
+                return None
+            hours, minutes, seconds = (hms + [0, 0])[:3]
+            return datetime.timedelta(hours=hours, minutes=minutes,
+                    seconds=seconds)
+        return datetime.timedelta(hours=float(value))
+    except ValueError:
+        return None
+
+def formatOption(name, value):
+    "NAME_DATE and NAME_TIME options of a datetime"
+    return {name+'_DATE': value.strftime('%m/%d/%Y'),
+            name+'_TIME': value.strftime('%H:%M:%S')}
+
+def simulationPeriod(filename):
+    "start, report start and end of the simulation of an .inp file"
+    options = dict((row[0].upper(), row[1]) for row in
+            readSections(filename, ['OPTIONS']).get('OPTIONS', [])
+            if len(row) > 1)
+    start = parseOption(options, 'START')
+    end = parseOption(options, 'END')
+    if start is None or end is None:
+        raise SwmmHotStartError('START_DATE and END_DATE options are '
+                'needed to run from a hot start file')
+    return start, parseOption(options, 'REPORT_START', start), end
+
+def spinUpOptions(filename, hotstart):
+    """options of the spin-up and of the simulation from the hot start
+
+    The spin-up ends at hotstart (a datetime) and reports from the start
+    (swmm needs a report start before the end). The simulation starts at
+    hotstart, the part of the report before it is lost.
+    """
+    start, report_start, end = simulationPeriod(filename)
+    if not start < hotstart < end:
+        raise SwmmHotStartError('The hot start time '+unicode(hotstart)
+                +' is not within the simulation ('+unicode(start)+' to '
+                +unicode(end)+')')
+    spinup = formatOption('END', hotstart)
+    spinup.update(formatOption('REPORT_START', start))
+    simulation = formatOption('START', hotstart)
+    simulation.update(formatOption('REPORT_START', max(hotstart,
+        report_start)))
+    return spinup, simulation
+
+def saveLine(filename):
+    return u'SAVE HOTSTART "'+filename+u'"'
+
+def useLine(filename):
+    return u'USE HOTSTART "'+filename+u'"'
+
+def seriesTimes(values, date):
+    """Times of the points of a time series row
+
+    values are the cells after the series name, [date] time value pairs,
+    and date the last date of the series. Times without a date are
+    relative to date, as swmm reads them. Returns the times, None if the
+    row can't be read, and the last date of the series.
+    """
+    values = [v for v in values if v]
+    times = []
+    i = 0
+    while i < len(values):
+        day = parseDate(values[i])
+        if day is not None:
+            date = day
+            i += 1
+            if i == len(values):
+                break
+        delta = parseTime(values[i])
+        if delta is None:
+            return None, date
+        times.append(date + delta)
+        i += 2
+    return times, date
+
+class SeriesFilter(object):
+    """Selects the time series rows read by a simulation ending at end
+
+    keep is called with the rows of the series in order, each starting
+    with its series name. Rows with a point on or before end are kept, as
+    is the first row of each series after end, values are interpolated
+    up to it. Times without a date are relative to the last date of their
+    series, or to start. Rows that can't be read are kept.
+    """
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.dates = {}
+        self.after = set()
+
+    def keep(self, row):
+        name = row[0]
+        times, self.dates[name] = seriesTimes(row[1:],
+                self.dates.get(name, self.start))
+        if not times or min(times) <= self.end:
+            return True
+        if name in self.after:
+            return False
+        self.after.add(name)
+        return True
+
+def rainDate(values):
+    """datetime of a line of a rain file in the user prepared format
+    (station year month day hour minute value), None for other lines"""
+    try:
+        year, month, day, hour, minute = [int(v) for v in values[1:6]]
+        return datetime.datetime(year, month, day, hour, minute)
+    except ValueError:
+        return None
+
+def dataDigest(section, filename, start, end):
+    """sha1 of what a simulation from start to end reads of the file of a
+    row of section
+
+    Only the lines of time series files and rain files needed up to end
+    are hashed (see SeriesFilter and rainDate), other files are hashed
+    whole.
+    """
+    if not os.path.isfile(filename):
+        return 'missing'
+    h = hashlib.sha1()
+    series = SeriesFilter(start, end)
+    f = open(filename, 'rb')
+    try:
+        for line in f:
+            values = line.split(';', 1)[0].split()
+            if section == 'TIMESERIES' and not series.keep([None]+values):
+                continue
+            date = rainDate(values) if section == 'RAINGAGES' else None
+            if date is not None and date > end:
+                continue
+            h.update(line)
+    finally:
+        f.close()
+    return h.hexdigest()
+
+def spinUpDigest(filename):
+    """sha1 of what the simulation of a spin-up .inp file reads
+
+    Every section is hashed but [TITLE] and the SAVE HOTSTART line, with
+    the [TIMESERIES] rows and the files of rain gages and time series
+    up to the end of the spin-up (the hot start time) only: new rainfall
+    after the hot start time does not change the state it saves. The
+    files of USE lines and the climate file are hashed whole. Files are
+    hashed in place of their path, comments and blank lines are skipped.
+    """
+    start, report_start, end = simulationPeriod(filename)
+    folder = os.path.dirname(os.path.abspath(filename))
+    series = SeriesFilter(start, end)
+    h = hashlib.sha1()
+    section = None
+    f = io.open(filename, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            content = line.split(u';', 1)[0].strip()
+            if not content:
+                continue
+            if content.startswith(u'['):
+                section = content.strip(u'[]').upper()
+                h.update(section.encode('utf-8')+b'\n')
+                continue
+            if section == u'TITLE':
+                continue
+            row = splitRow(line)
+            if section == u'FILES' and [v.upper() for v in row[:2]] \
+                    == [u'SAVE', u'HOTSTART']:
+                continue
+            if section == u'TIMESERIES' and not (len(row) > 2
+                    and row[1].upper() == u'FILE') and not series.keep(row):
+                continue
+            keyword, keyword_column, column = FILE_COLUMNS.get(section,
+                    (None, 0, 0))
+            if keyword and len(row) > column \
+                    and row[keyword_column].upper() == keyword:
+                # series files of the cache are named by their content
+                row[column] = dataDigest(section, os.path.join(folder,
+                    row[column]), start, end)
+            h.update(u'\t'.join(row).encode('utf-8')+b'\n')
+    finally:
+        f.close()
+    return h.hexdigest()
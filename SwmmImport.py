@@ -0,0 +1,771 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmImport.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Import of .inp files into GeoPackage or PostGIS tables, without qgis
+#
+# Each section goes to a table named after it, with the columns of
+# SECTION_COLUMNS: the layout the export expects, the element identifier
+# first, then the values in the order of the .inp, plus an fid primary
+# key and, for nodes, links and subcatchments, a geom column. The file is
+# read in one pass and rows are inserted in batches as they are parsed,
+# coordinates go to temporary tables and the geometries are built once
+# the file is read, memory does not depend on the size of the model.
+
+import io
+import os
+import re
+import struct
+import itertools
+from collections import OrderedDict
+
+from SwmmInp import NUMBER, TEXT, KEYVAL_SECTIONS
+from SwmmSource import quoteIdentifier
+
+# rows inserted at once
+BATCH_SIZE = 10000
+
+T = TEXT
+N = NUMBER
+
+# columns of the tabular sections, values beyond the last column are
+# joined in it (it is then a text column)
+SECTION_COLUMNS = {
+    'FILES': [('action', T), ('type', T), ('filename', T)],
+    'RAINGAGES': [('name', T), ('format', T), ('interval', T), ('scf', N),
+        ('source', T), ('source_name', T), ('station', T), ('units', T)],
+    'HYDROGRAPHS': [('name', T), ('month', T), ('response', T), ('r', N),
+        ('t', N), ('k', N), ('dmax', N), ('drecov', N), ('dinit', N)],
+    'TEMPERATURE': [('keyword', T), ('parameters', T)],
+    'SUBCATCHMENTS': [('name', T), ('rain_gage', T), ('outlet', T),
+        ('area', N), ('imperv', N), ('width', N), ('slope', N),
+        ('curb_length', N), ('snow_pack', T)],
+    'SUBAREAS': [('subcatchment', T), ('n_imperv', N), ('n_perv', N),
+        ('s_imperv', N), ('s_perv', N), ('pct_zero', N), ('route_to', T),
+        ('pct_routed', N)],
+    'INFILTRATION': [('subcatchment', T), ('p1', N), ('p2', N), ('p3', N),
+        ('p4', N), ('p5', N), ('method', T)],
+    'LID_CONTROLS': [('name', T), ('layer', T), ('parameters', T)],
+    'LID_USAGE': [('subcatchment', T), ('lid', T), ('number', N),
+        ('area', N), ('width', N), ('init_sat', N), ('from_imperv', N),
+        ('to_perv', N), ('report_file', T), ('drain_to', T),
+        ('from_perv', N)],
+    'AQUIFERS': [('name', T), ('porosity', N), ('wilting_point', N),
+        ('field_capacity', N), ('conductivity', N), ('conduct_slope', N),
+        ('tension_slope', N), ('upper_evap', N), ('lower_evap', N),
+        ('lower_loss', N), ('bottom_elev', N), ('water_table', N),
+        ('upper_moist', N), ('evap_pattern', T)],
+    'GROUNDWATER': [('subcatchment', T), ('aquifer', T), ('node', T),
+        ('surface_elev', N), ('a1', N), ('b1', N), ('a2', N), ('b2', N),
+        ('a3', N), ('surface_depth', N), ('threshold_elev', T),
+        ('bottom_elev', T), ('water_table', T), ('upper_moist', T)],
+    'SNOWPACKS': [('name', T), ('surface', T), ('parameters', T)],
+    'JUNCTIONS': [('name', T), ('elevation', N), ('max_depth', N),
+        ('init_depth', N), ('surcharge_depth', N), ('ponded_area', N)],
+    'OUTFALLS': [('name', T), ('elevation', N), ('type', T),
+        ('stage_data', T), ('gated', T), ('route_to', T)],
+    'DIVIDERS': [('name', T), ('elevation', N), ('diverted_link', T),
+        ('type', T), ('parameters', T)],
+    'STORAGE': [('name', T), ('elevation', N), ('max_depth', N),
+        ('init_depth', N), ('shape', T), ('parameters', T)],
+    'CONDUITS': [('name', T), ('from_node', T), ('to_node', T),
+        ('length', N), ('roughness', N), ('in_offset', N),
+        ('out_offset', N), ('init_flow', N), ('max_flow', N)],
+    'PUMPS': [('name', T), ('from_node', T), ('to_node', T), ('curve', T),
+        ('status', T), ('startup', N), ('shutoff', N)],
+    'ORIFICES': [('name', T), ('from_node', T), ('to_node', T),
+        ('type', T), ('offset', N), ('discharge_coeff', N), ('gated', T),
+        ('close_time', N)],
+    'WEIRS': [('name', T), ('from_node', T), ('to_node', T), ('type', T),
+        ('crest_height', N), ('discharge_coeff', N), ('gated', T),
+        ('end_contractions', N), ('end_coeff', N), ('surcharge', T),
+        ('road_width', N), ('road_surface', T)],
+    'OUTLETS': [('name', T), ('from_node', T), ('to_node', T),
+        ('offset', N), ('type', T), ('coefficient', T), ('exponent', T),
+        ('gated', T)],
+    'XSECTIONS': [('link', T), ('shape', T), ('geom1', T), ('geom2', T),
+        ('geom3', N), ('geom4', N), ('barrels', N), ('culvert', N)],
+    'TRANSECTS': [('keyword', T), ('parameters', T)],
+    'LOSSES': [('link', T), ('inlet', N), ('outlet', N), ('average', N),
+        ('flap_gate', T), ('seepage', N)],
+    'CONTROLS': [('rule', T)],
+    'POLLUTANTS': [('name', T), ('units', T), ('c_rain', N), ('c_gw', N),
+        ('c_rdii', N), ('k_decay', N), ('snow_only', T),
+        ('co_pollutant', T), ('co_fraction', N), ('c_dwf', N),
+        ('c_init', N)],
+    'LANDUSES': [('name', T), ('sweep_interval', N), ('availability', N),
+        ('last_sweep', N)],
+    'COVERAGES': [('subcatchment', T), ('landuse', T), ('percent', N)],
+    'BUILDUP': [('landuse', T), ('pollutant', T), ('function', T),
+        ('c1', N), ('c2', N), ('c3', N), ('per_unit', T)],
+    'WASHOFF': [('landuse', T), ('pollutant', T), ('function', T),
+        ('c1', N), ('c2', N), ('sweep_removal', N), ('bmp_removal', N)],
+    'TREATMENT': [('node', T), ('pollutant', T), ('function', T)],
+    'INFLOWS': [('node', T), ('constituent', T), ('time_series', T),
+        ('type', T), ('units_factor', N), ('scale_factor', N),
+        ('baseline', N), ('pattern', T)],
+    'DWF': [('node', T), ('constituent', T), ('baseline', N),
+        ('patterns', T)],
+    'PATTERNS': [('name', T), ('type', T), ('factors', T)],
+    'RDII': [('node', T), ('unit_hydrograph', T), ('sewer_area', N)],
+    'LOADINGS': [('subcatchment', T), ('pollutant', T), ('buildup', N)],
+    'CURVES': [('name', T), ('type', T), ('x', N), ('y', N)],
+    'TIMESERIES': [('name', T), ('date', T), ('time', T), ('value', N)],
+    }
+
+# positions of the number columns of each section
+NUMBER_COLUMNS = dict((section, [i for i, (c, kind) in enumerate(columns)
+    if kind == NUMBER]) for section, columns in SECTION_COLUMNS.items())
+
+# geometry of the tables, and the column locating it: nodes are at the
+# [COORDINATES] of their identifier, conduits go from their inlet to their
+# outlet node through their [VERTICES], other links are at their inlet
+# node (like in the example database) and subcatchments are the
+# [Polygons] around them
+POINT = 'POINT'
+LINESTRING = 'LINESTRING'
+POLYGON = 'POLYGON'
+GEOMETRIES = {'JUNCTIONS': (POINT, 'name'), 'OUTFALLS': (POINT, 'name'),
+        'DIVIDERS': (POINT, 'name'), 'STORAGE': (POINT, 'name'),
+        'CONDUITS': (LINESTRING, 'name'), 'PUMPS': (POINT, 'from_node'),
+        'ORIFICES': (POINT, 'from_node'), 'WEIRS': (POINT, 'from_node'),
+        'OUTLETS': (POINT, 'from_node'), 'SUBCATCHMENTS': (POLYGON, 'name')}
+
+# sections of coordinates, and the temporary tables they go to, rows of
+# vertices and polygons are numbered by their line in the file
+COORDINATES = {'COORDINATES': '_swmm_coordinates',
+        'VERTICES': '_swmm_vertices', 'POLYGONS': '_swmm_polygons',
+        'POLYGON': '_swmm_polygons'}
+STAGING = OrderedDict([
+    ('_swmm_coordinates', [('name', T), ('x', N), ('y', N)]),
+    ('_swmm_vertices', [('name', T), ('seq', N), ('x', N), ('y', N)]),
+    ('_swmm_polygons', [('name', T), ('seq', N), ('x', N), ('y', N)]),
+    ])
+
+# values of the key/value sections are text, in the order of the keys
+TITLE_COLUMN = 'simulation_title'
+
+PATTERN_TYPES = ['MONTHLY', 'DAILY', 'HOURLY', 'WEEKEND']
+
+# a double quoted string (possibly empty) or a run of other characters
+TOKEN = re.compile(r'"[^"]*"|[^\s"]+')
+
+class SwmmImportError(Exception):
+    pass
+
+def tableName(section):
+    return section.lower()
+
+def isNumber(token):
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+def isDate(token):
+    "true for the dates of time series, times are hours or H:M"
+    return '/' in token or ('-' in token and not isNumber(token))
+
+def sectionRows(section, tokens):
+    """rows of the table of a section for the tokens of a line
+
+    Repeated pairs of values (curves, time series, coverages, loadings)
+    give one row per pair. Sections with optional values in the middle
+    get a None in their place.
+    """
+    name = tokens[0]
+    if section == 'CURVES':
+        kind = None if isNumber(tokens[1]) else tokens[1]
+        values = tokens[1:] if kind is None else tokens[2:]
+        return [[name, kind if i == 0 else None]+values[i:i+2]
+                for i in range(0, len(values), 2)] or [[name, kind]]
+    if section == 'TIMESERIES':
+        if tokens[1].upper() == 'FILE':
+            return [[name, tokens[1], u' '.join(tokens[2:])]]
+        rows = []
+        date = None
+        i = 1
+        while i < len(tokens):
+            if isDate(tokens[i]):
+                date = tokens[i]
+                i += 1
+            rows.append([name, date]+tokens[i:i+2])
+            date = None # swmm keeps the previous one
+            i += 2
+        return rows
+    if section in ('COVERAGES', 'LOADINGS'):
+        return [[name]+tokens[i:i+2] for i in range(1, len(tokens), 2)]
+    if section == 'OUTFALLS' and len(tokens) > 2 \
+            and tokens[2].upper() in ('FREE', 'NORMAL'):
+        return [tokens[:3]+[None]+tokens[3:]]
+    if section == 'PATTERNS' and not tokens[1].upper() in PATTERN_TYPES:
+        return [[name, None]+tokens[1:]]
+    return [tokens]
+
+def tableRow(section, columns, row, number):
+    """values of a row in the columns of a table
+
+    Extra values are joined in the last column, values of number columns
+    are converted, number is the line number for error messages.
+    """
+    if len(row) > len(columns):
+        if columns[-1][1] != TEXT:
+            raise SwmmImportError('line %d: too many values in [%s]'
+                    %(number, section))
+        row = row[:len(columns)-1]+[u' '.join(row[len(columns)-1:])]
+    values = row+[None]*(len(columns)-len(row))
+    for i in NUMBER_COLUMNS[section]:
+        if values[i] is not None:
+            try:
+                values[i] = float(values[i])
+            except ValueError:
+                raise SwmmImportError(u"line %d: '%s' is not a number (%s "
+                        "of [%s])"%(number, values[i], columns[i][0], section))
+    return values
+
+def readLines(filename):
+    """(line number, bytes read, section, line) of the content lines
+
+    Comments and blank lines are skipped, section names are upper case.
+    Lines are decoded as utf-8, or latin-1 if they are not valid utf-8.
+    """
+    section = None
+    read = 0
+    f = io.open(filename, 'rb')
+    try:
+        for number, line in enumerate(f, 1):
+            read += len(line)
+            try:
+                line = line.decode('utf-8')
+            except UnicodeDecodeError:
+                line = line.decode('latin-1')
+            line = line.split(u';', 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith(u'['):
+                section = line.strip(u'[]').strip().upper()
+                continue
+            yield number, read, section, line
+    finally:
+        f.close()
+
+class Batches(object):
+    "rows of the table being read, inserted BATCH_SIZE at a time"
+
+    def __init__(self, target):
+        self.target = target
+        self.table = None
+        self.rows = []
+        self.counts = {}
+
+    def add(self, table, rows):
+        if table != self.table:
+            self.flush()
+            self.table = table
+        self.rows.extend(rows)
+        if len(self.rows) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.target.insert(self.table, self.rows)
+            self.counts[self.table] = self.counts.get(self.table, 0) \
+                    + len(self.rows)
+            self.rows = []
+
+def importInp(filename, target, title=u'Swmm Simulation', progress=None):
+    """Imports the sections of an .inp file into target
+
+    target is a GeopackageTarget or a PostgisTarget, it is committed once
+    all the tables are written. Rows of the key/value sections (OPTIONS,
+    REPORT, EVAPORATION) are given the simulation title, repeated keys
+    (like the NODES of REPORT) are joined. progress, if given, is called
+    with the percentage of the file read. Returns a map of table name to
+    number of rows, and the names of the sections that were not imported
+    (map, labels, tags...).
+    """
+    batches = Batches(target)
+    created = set()
+    keyvals = OrderedDict()
+    rule = []
+    size = max(1, os.path.getsize(filename))
+    skipped = set()
+    percent = 0
+
+    def add(section, rows):
+        if not section in created:
+            target.create(tableName(section), SECTION_COLUMNS[section],
+                    GEOMETRIES.get(section, (None,))[0])
+            created.add(section)
+        batches.add(tableName(section), rows)
+
+    def addRule():
+        if rule:
+            add('CONTROLS', [[u'\n'.join(rule)+u'\n']])
+            del rule[:]
+
+    for number, read, section, line in readLines(filename):
+        if section != 'CONTROLS':
+            addRule()
+        if progress and 100*read//size > percent:
+            percent = 100*read//size
+            progress(percent)
+        tokens = TOKEN.findall(line)
+        if section in KEYVAL_SECTIONS:
+            values = keyvals.setdefault(section, OrderedDict())
+            key = tokens[0].lower()
+            value = u' '.join(tokens[1:])
+            values[key] = values[key]+u' '+value if key in values else value
+        elif section == 'CONTROLS':
+            if tokens[0].upper() == 'RULE':
+                addRule()
+            rule.append(line)
+        elif section in COORDINATES:
+            if len(tokens) < 3:
+                raise SwmmImportError('line %d: missing coordinate in [%s]'
+                        %(number, section))
+            try:
+                x, y = float(tokens[1]), float(tokens[2])
+            except ValueError:
+                raise SwmmImportError('line %d: invalid coordinate in [%s]'
+                        %(number, section))
+            if section == 'COORDINATES':
+                batches.add(COORDINATES[section], [[tokens[0], x, y]])
+            else:
+                batches.add(COORDINATES[section], [[tokens[0], number, x, y]])
+        elif section in SECTION_COLUMNS:
+            if len(tokens) < 2:
+                raise SwmmImportError('line %d: no value in [%s]'
+                        %(number, section))
+            add(section, [tableRow(section, SECTION_COLUMNS[section], row,
+                number) for row in sectionRows(section, tokens)])
+        elif section is not None:
+            skipped.add(section)
+    addRule()
+    batches.flush()
+
+    counts = dict((tableName(s), batches.counts.get(tableName(s), 0))
+            for s in created)
+    for section, values in keyvals.items():
+        table = tableName(section)
+        target.create(table, [(TITLE_COLUMN, T)]
+                +[(k, T) for k in values.keys()], None)
+        target.insert(table, [[title]+values.values()])
+        counts[table] = 1
+
+    for section in created:
+        if section in GEOMETRIES:
+            target.geometries(tableName(section), *GEOMETRIES[section])
+    target.commit()
+    return counts, sorted(skipped)
+
+def openTarget(destination, schema='public', srid=None, wkt=None,
+        replace=False):
+    """Opens the database the sections are imported into
+
+    destination is a postgres connection string ('PG:dbname=... host=...'
+    or 'postgresql://...') or a GeoPackage file, created if it does not
+    exist. For postgres, tables are created in schema. srid is the spatial
+    reference of the geometries (unknown if None), wkt its definition
+    (needed for a GeoPackage if it is not there yet). Existing tables are
+    an error, unless replace is true.
+    """
+    if destination.startswith('PG:'):
+        return PostgisTarget(destination[3:], schema, srid, replace)
+    if destination.startswith('postgres://') \
+            or destination.startswith('postgresql://'):
+        return PostgisTarget(destination, schema, srid, replace)
+    if destination.lower().endswith('.gpkg'):
+        return GeopackageTarget(destination, srid, wkt, replace)
+    raise SwmmImportError("Unknown destination '"+destination+"'")
+
+def mergeJoin(rows, points):
+    """(row, points) for the rows of a table and their points
+
+    rows are (name, ...) tuples and points (name, x, y) tuples, both
+    ordered by name, points of the same name are grouped in a list.
+    """
+    groups = itertools.groupby(points, lambda p: p[0])
+    name, group = next(groups, (None, None))
+    for row in rows:
+        while name is not None and name < row[0]:
+            name, group = next(groups, (None, None))
+        if name == row[0]:
+            yield row, [(p[1], p[2]) for p in group]
+            name, group = next(groups, (None, None))
+        else:
+            yield row, []
+
+def ring(points):
+    "closed ring of points, None if there are less than 3 of them"
+    if points and points[0] != points[-1]:
+        points = points+[points[0]]
+    return points if len(points) >= 4 else None
+
+class GeopackageTarget(object):
+    """tables of a GeoPackage, written with sqlite3
+
+    The import is one transaction, rolled back if the target is closed
+    before it is committed. Geometries are encoded as GeoPackage blobs of
+    little endian WKB, without envelope.
+    """
+
+    WKB_TYPES = {POINT: 1, LINESTRING: 2, POLYGON: 3}
+    KINDS = {TEXT: 'TEXT', NUMBER: 'REAL'}
+    # 'GPKG' and version 1.2 of the specification
+    APPLICATION_ID = 1196444487
+    USER_VERSION = 10200
+    # rows of gpkg_spatial_ref_sys every GeoPackage has
+    SRS = [('Undefined cartesian SRS', -1, 'NONE', -1, 'undefined',
+                'undefined cartesian coordinate reference system'),
+            ('Undefined geographic SRS', 0, 'NONE', 0, 'undefined',
+                'undefined geographic coordinate reference system'),
+            ('WGS 84 geodetic', 4326, 'EPSG', 4326, 'GEOGCS["WGS 84",'
+                'DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563,'
+                'AUTHORITY["EPSG","7030"]],AUTHORITY["EPSG","6326"]],'
+                'PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],'
+                'UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],'
+                'AUTHORITY["EPSG","4326"]]', 'longitude/latitude coordinates '
+                'in decimal degrees on the WGS 84 spheroid')]
+
+    def __init__(self, filename, srid=None, wkt=None, replace=False):
+        import sqlite3
+        self.sqlite3 = sqlite3
+        self.srs_id = srid if srid is not None else -1
+        self.replace = replace
+        self.committed = False
+        self.indexed = False
+        self.columns = dict((table, [c for c, k in columns])
+                for table, columns in STAGING.items())
+        self.filename = filename
+        self.created = not os.path.exists(filename)
+        try:
+            self.con = sqlite3.connect(filename, isolation_level=None)
+        except sqlite3.Error, e:
+            raise SwmmImportError('Could not open '+filename+': '
+                    +unicode(e))
+        try:
+            self.con.execute('BEGIN')
+            if self.created:
+                self.con.execute('PRAGMA application_id = %d'
+                        %self.APPLICATION_ID)
+                self.con.execute('PRAGMA user_version = %d'
+                        %self.USER_VERSION)
+            self.createMetadata(srid, wkt)
+            for table, columns in STAGING.items():
+                self.con.execute('CREATE TEMP TABLE '+table+'('
+                        +', '.join(c+' '+self.KINDS[k] for c, k in columns)
+                        +')')
+        except sqlite3.Error, e:
+            self.close()
+            raise SwmmImportError(filename+' is not a GeoPackage: '
+                    +unicode(e))
+        except SwmmImportError:
+            self.close()
+            raise
+
+    def createMetadata(self, srid, wkt):
+        "creates the GeoPackage tables, if needed, and the srs of srid"
+        con = self.con
+        con.execute('CREATE TABLE IF NOT EXISTS gpkg_spatial_ref_sys ('
+                'srs_name TEXT NOT NULL, '
+                'srs_id INTEGER NOT NULL PRIMARY KEY, '
+                'organization TEXT NOT NULL, '
+                'organization_coordsys_id INTEGER NOT NULL, '
+                'definition TEXT NOT NULL, description TEXT)')
+        con.execute('CREATE TABLE IF NOT EXISTS gpkg_contents ('
+                'table_name TEXT NOT NULL PRIMARY KEY, '
+                'data_type TEXT NOT NULL, identifier TEXT UNIQUE, '
+                'description TEXT DEFAULT \'\', '
+                'last_change DATETIME NOT NULL DEFAULT '
+                '(strftime(\'%Y-%m-%dT%H:%M:%fZ\',\'now\')), '
+                'min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE, '
+                'srs_id INTEGER, CONSTRAINT fk_gc_r_srs_id '
+                'FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id))')
+        con.execute('CREATE TABLE IF NOT EXISTS gpkg_geometry_columns ('
+                'table_name TEXT NOT NULL, column_name TEXT NOT NULL, '
+                'geometry_type_name TEXT NOT NULL, srs_id INTEGER NOT NULL, '
+                'z TINYINT NOT NULL, m TINYINT NOT NULL, '
+                'CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name), '
+                'CONSTRAINT fk_gc_tn FOREIGN KEY (table_name) '
+                'REFERENCES gpkg_contents(table_name), '
+                'CONSTRAINT fk_gc_srs FOREIGN KEY (srs_id) '
+                'REFERENCES gpkg_spatial_ref_sys (srs_id))')
+        # the three rows required by the specification
+        con.executemany('INSERT OR IGNORE INTO gpkg_spatial_ref_sys '
+                'VALUES (?, ?, ?, ?, ?, ?)', self.SRS)
+        if srid is not None and srid > 0:
+            if wkt is not None:
+                con.execute('INSERT OR IGNORE INTO gpkg_spatial_ref_sys '
+                        'VALUES (?, ?, ?, ?, ?, ?)', ('EPSG:%d'%srid, srid,
+                            'EPSG', srid, wkt, None))
+            elif not con.execute('SELECT 1 FROM gpkg_spatial_ref_sys '
+                    'WHERE srs_id = ?', (srid,)).fetchone():
+                raise SwmmImportError('The definition of srid %d is '
+                        'needed for a GeoPackage'%srid)
+
+    def create(self, table, columns, geometry):
+        "creates the table of a section, with a geometry column if given"
+        con = self.con
+        existing = con.execute("SELECT name FROM sqlite_master "
+                "WHERE type IN ('table', 'view') AND lower(name) = lower(?)",
+                (table,)).fetchone()
+        if existing:
+            if not self.replace:
+                raise SwmmImportError("Table '"+existing[0]
+                        +"' already exists")
+            for metadata in ('gpkg_geometry_columns', 'gpkg_contents'):
+                con.execute('DELETE FROM '+metadata
+                        +' WHERE lower(table_name) = lower(?)', (table,))
+            con.execute('DROP TABLE '+quoteIdentifier(existing[0]))
+        con.execute('CREATE TABLE '+quoteIdentifier(table)+' ('
+                'fid INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, '
+                +', '.join(quoteIdentifier(c)+' '+self.KINDS[k]
+                    for c, k in columns)
+                +(', geom '+geometry if geometry else '')+')')
+        con.execute('INSERT INTO gpkg_contents (table_name, data_type, '
+                'identifier, srs_id) VALUES (?, ?, ?, ?)', (table,
+                    'features' if geometry else 'attributes', table,
+                    self.srs_id if geometry else None))
+        if geometry:
+            con.execute('INSERT INTO gpkg_geometry_columns '
+                    'VALUES (?, ?, ?, ?, 0, 0)',
+                    (table, 'geom', geometry, self.srs_id))
+        self.columns[table] = [c for c, k in columns]
+
+    def insert(self, table, rows):
+        columns = self.columns[table]
+        self.con.executemany('INSERT INTO '+quoteIdentifier(table)+' ('
+                +', '.join(quoteIdentifier(c) for c in columns)
+                +') VALUES ('+', '.join('?'*len(columns))+')', rows)
+
+    def blob(self, geometry, points):
+        "GeoPackage blob of a geometry, points are (x, y) tuples"
+        header = 'GP'+struct.pack('<BBi', 0, 1, self.srs_id) \
+                +struct.pack('<BI', 1, self.WKB_TYPES[geometry])
+        if geometry == POINT:
+            return self.sqlite3.Binary(header+struct.pack('<2d', *points[0]))
+        if geometry == POLYGON:
+            header += struct.pack('<I', 1)
+        return self.sqlite3.Binary(header+struct.pack('<I', len(points))
+                +struct.pack('<%dd'%(2*len(points)),
+                    *itertools.chain.from_iterable(points)))
+
+    def geometries(self, table, geometry, column):
+        """builds the geometries of a table from the staged coordinates,
+        column locates the geometry (see GEOMETRIES)"""
+        con = self.con
+        if not self.indexed:
+            con.execute('CREATE INDEX temp._swmm_coordinates_name '
+                    'ON _swmm_coordinates(name)')
+            self.indexed = True
+        table = quoteIdentifier(table)
+        column = quoteIdentifier(column)
+        if geometry == POINT:
+            located = ((self.blob(POINT, [(x, y)]), fid) for fid, x, y in
+                    con.cursor().execute('SELECT t.fid, c.x, c.y FROM '
+                        +table+' t JOIN _swmm_coordinates c '
+                        'ON c.name = t.'+column))
+        elif geometry == LINESTRING:
+            rows = con.cursor().execute('SELECT t.name, t.fid, a.x, a.y, '
+                    'b.x, b.y FROM '+table+' t '
+                    'JOIN _swmm_coordinates a ON a.name = t.from_node '
+                    'JOIN _swmm_coordinates b ON b.name = t.to_node '
+                    'ORDER BY t.name')
+            vertices = con.cursor().execute('SELECT name, x, y '
+                    'FROM _swmm_vertices ORDER BY name, seq')
+            located = ((self.blob(LINESTRING, [(ax, ay)]+points+[(bx, by)]),
+                    fid) for (name, fid, ax, ay, bx, by), points
+                    in mergeJoin(rows, vertices))
+        else:
+            rows = con.cursor().execute('SELECT '+column+', fid FROM '
+                    +table+' ORDER BY '+column)
+            polygons = con.cursor().execute('SELECT name, x, y '
+                    'FROM _swmm_polygons ORDER BY name, seq')
+            located = ((self.blob(POLYGON, points), fid)
+                    for (name, fid), points in ((row, ring(points))
+                        for row, points in mergeJoin(rows, polygons))
+                    if points)
+        # the updates are computed in a temporary table first, sqlite
+        # does not allow updating a table while one of its cursors is open
+        con.execute('CREATE TEMP TABLE _swmm_geometries '
+                '(fid INTEGER PRIMARY KEY, geom BLOB)')
+        con.executemany('INSERT OR REPLACE INTO _swmm_geometries (geom, fid) '
+                'VALUES (?, ?)', located)
+        con.execute('UPDATE '+table+' SET geom = (SELECT g.geom '
+                'FROM _swmm_geometries g WHERE g.fid = '+table+'.fid) '
+                'WHERE fid IN (SELECT fid FROM _swmm_geometries)')
+        con.execute('DROP TABLE _swmm_geometries')
+
+    def commit(self):
+        try:
+            self.con.execute('COMMIT')
+        except self.sqlite3.Error, e:
+            raise SwmmImportError('Could not write the GeoPackage: '
+                    +unicode(e))
+        self.committed = True
+
+    def close(self):
+        "rolls back an import that was not committed"
+        if not self.committed:
+            self.con.execute('ROLLBACK')
+        self.con.close()
+        if not self.committed and self.created:
+            os.remove(self.filename)
+
+class PostgisTarget(object):
+    """tables of a postgres schema, written with psycopg2
+
+    Rows are loaded with COPY, coordinates go to temporary tables dropped
+    at the end of the transaction, and the geometries are built by the
+    server. The import is one transaction, rolled back if the target is
+    closed before it is committed.
+    """
+
+    KINDS = {TEXT: 'text', NUMBER: 'double precision'}
+
+    def __init__(self, dsn, schema='public', srid=None, replace=False):
+        try:
+            import psycopg2
+        except ImportError:
+            raise SwmmImportError('psycopg2 is needed to write to postgres')
+        self.psycopg2 = psycopg2
+        try:
+            self.con = psycopg2.connect(dsn)
+        except psycopg2.Error, e:
+            raise SwmmImportError('Could not connect to postgres: '
+                    +unicode(e))
+        self.schema = schema
+        self.srid = srid if srid is not None else 0
+        self.replace = replace
+        self.committed = False
+        self.indexed = False
+        self.columns = {}
+        self.names = {}
+        cur = self.con.cursor()
+        for table, columns in STAGING.items():
+            cur.execute('CREATE TEMP TABLE '+table+' ('
+                    +', '.join(c+' '+self.KINDS[k] for c, k in columns)
+                    +') ON COMMIT DROP')
+            self.columns[table] = [c for c, k in columns]
+            self.names[table] = table
+
+    def create(self, table, columns, geometry):
+        "see GeopackageTarget.create"
+        name = quoteIdentifier(self.schema)+'.'+quoteIdentifier(table)
+        cur = self.con.cursor()
+        try:
+            cur.execute('SELECT to_regclass(%s)', (name,))
+            if cur.fetchone()[0] is not None:
+                if not self.replace:
+                    raise SwmmImportError("Table '"+self.schema+'.'+table
+                            +"' already exists")
+                cur.execute('DROP TABLE '+name)
+            cur.execute('CREATE TABLE '+name+' (fid serial PRIMARY KEY, '
+                    +', '.join(quoteIdentifier(c)+' '+self.KINDS[k]
+                        for c, k in columns)
+                    +(', geom geometry(%s, %d)'%(geometry, self.srid)
+                        if geometry else '')+')')
+        except self.psycopg2.Error, e:
+            raise SwmmImportError('Could not create '+name+': '+unicode(e))
+        self.columns[table] = [c for c, k in columns]
+        self.names[table] = name
+
+    @staticmethod
+    def csvValue(v):
+        "csv field of COPY, unquoted empty fields are null"
+        if v is None:
+            return u''
+        if isinstance(v, (int, long, float)):
+            return repr(v)
+        return u'"'+v.replace(u'"', u'""')+u'"'
+
+    def insert(self, table, rows):
+        data = io.BytesIO()
+        for row in rows:
+            data.write(u','.join(map(self.csvValue, row)).encode('utf-8')
+                    +'\n')
+        data.seek(0)
+        try:
+            self.con.cursor().copy_expert('COPY '+self.names[table]+' ('
+                    +', '.join(quoteIdentifier(c)
+                        for c in self.columns[table])
+                    +") FROM STDIN WITH (FORMAT csv, ENCODING 'UTF8')",
+                    data)
+        except self.psycopg2.Error, e:
+            raise SwmmImportError('Could not load '+self.names[table]+': '
+                    +unicode(e))
+
+    def geometries(self, table, geometry, column):
+        "see GeopackageTarget.geometries"
+        name = self.names[table]
+        cur = self.con.cursor()
+        if not self.indexed:
+            for staging in STAGING.keys():
+                cur.execute('CREATE INDEX ON '+staging+' (name)')
+                cur.execute('ANALYZE '+staging)
+            self.indexed = True
+        point = 'ST_MakePoint(%s.x, %s.y)'
+        if geometry == POINT:
+            sql = ('UPDATE '+name+' t SET geom = ST_SetSRID('+point%('c', 'c')
+                    +', %(srid)s) FROM _swmm_coordinates c '
+                    'WHERE c.name = t.'+quoteIdentifier(column))
+        elif geometry == LINESTRING:
+            sql = ('UPDATE '+name+' t SET geom = ST_SetSRID(ST_MakeLine('
+                    'ARRAY['+point%('a', 'a')+'] || coalesce(('
+                    'SELECT array_agg('+point%('v', 'v')+' ORDER BY v.seq) '
+                    'FROM _swmm_vertices v WHERE v.name = t.name), '
+                    "'{}'::geometry[]) || ARRAY["+point%('b', 'b')+']), '
+                    '%(srid)s) FROM _swmm_coordinates a, _swmm_coordinates b '
+                    'WHERE a.name = t.from_node AND b.name = t.to_node')
+        else:
+            sql = ('UPDATE '+name+' t SET geom = ST_SetSRID(ST_MakePolygon('
+                    'CASE WHEN ST_IsClosed(p.line) THEN p.line '
+                    'ELSE ST_AddPoint(p.line, ST_StartPoint(p.line)) END), '
+                    '%(srid)s) FROM (SELECT name, ST_MakeLine('
+                    +point%('p', 'p')+' ORDER BY seq) AS line '
+                    'FROM _swmm_polygons p GROUP BY name) p '
+                    'WHERE p.name = t.'+quoteIdentifier(column)
+                    +' AND ST_NPoints(p.line) >= '
+                    'CASE WHEN ST_IsClosed(p.line) THEN 4 ELSE 3 END')
+        try:
+            cur.execute(sql, {'srid': self.srid})
+        except self.psycopg2.Error, e:
+            raise SwmmImportError('Could not build the geometries of '
+                    +name+': '+unicode(e))
+
+    def commit(self):
+        try:
+            self.con.commit()
+        except self.psycopg2.Error, e:
+            raise SwmmImportError('Could not write to postgres: '+unicode(e))
+        self.committed = True
+
+    def close(self):
+        if not self.committed:
+            self.con.rollback()
+        self.con.close()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmImportAlgorithm.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import time
+
+from qgis.core import QgsCoordinateReferenceSystem
+
+from processing.core.GeoAlgorithmExecutionException import \
+        GeoAlgorithmExecutionException
+from processing.core.ProcessingLog import ProcessingLog
+from processing.core.parameters import ParameterFile
+from processing.core.parameters import ParameterString
+from processing.core.parameters import ParameterCrs
+from processing.core.parameters import ParameterBoolean
+
+from SwmmAlgorithm import SwmmAlgorithm
+from SwmmImport import SwmmImportError, openTarget, importInp
+
+class SwmmImportAlgorithm(SwmmAlgorithm):
+    """Imports an .inp file into the section tables of a database
+
+    The tables have the layout of the example database, they can be
+    loaded as the layers of the simulation algorithm once imported. The
+    file is streamed into a GeoPackage or a PostGIS schema (see
+    SwmmImport.importInp), large models do not go through qgis features.
+    """
+
+    INP_FILE = 'INP_FILE'
+    DESTINATION = 'DESTINATION'
+    SCHEMA = 'SCHEMA'
+    CRS = 'CRS'
+    REPLACE = 'REPLACE'
+
+    def commandLineName(self):
+        return 'swmm:import'
+
+    def defineCharacteristics(self):
+        self.name = 'Import an .inp file'
+        self.group = 'Simulation'
+
+        self.addParameter(ParameterFile(self.INP_FILE, 'Swmm input file (.inp)', False, False, 'inp'))
+        self.addParameter(ParameterString(self.DESTINATION, 'GeoPackage file or postgres connection string (PG:dbname=... host=...)', ''))
+        self.addParameter(ParameterString(self.SCHEMA, 'Postgres schema', 'public'))
+        self.addParameter(ParameterCrs(self.CRS, 'Coordinate reference system', 'EPSG:4326'))
+        self.addParameter(ParameterString(self.TITLE, 'Simulation title of the analysis options', 'Swmm Simulation'))
+        self.addParameter(ParameterBoolean(self.REPLACE, 'Replace existing tables', False))
+
+    def checkBeforeOpeningParametersDialog(self):
+        return None
+
+    def runAlgorithm(self, progress):
+        destination = self.getParameterValue(self.DESTINATION)
+        if not destination:
+            raise GeoAlgorithmExecutionException(
+                    'A GeoPackage file or a postgres connection is needed')
+        crs = QgsCoordinateReferenceSystem(self.getParameterValue(self.CRS))
+        srid = crs.postgisSrid() if crs.isValid() else None
+
+        progress.setText('importing '+self.getParameterValue(self.INP_FILE))
+        start = time.time()
+        try:
+            target = openTarget(destination,
+                    self.getParameterValue(self.SCHEMA) or 'public', srid,
+                    crs.toWkt() if srid else None,
+                    self.getParameterValue(self.REPLACE))
+            try:
+                counts, skipped = importInp(
+                        self.getParameterValue(self.INP_FILE), target,
+                        self.getParameterValue(self.TITLE),
+                        progress.setPercentage)
+            finally:
+                target.close()
+        except (SwmmImportError, EnvironmentError), e:
+            raise GeoAlgorithmExecutionException(unicode(e))
+        self.profile.add('import', 'tables', time.time() - start,
+                sum(counts.values()))
+
+        ProcessingLog.addToLog(ProcessingLog.LOG_INFO, 'Imported '
+                +', '.join('%s (%d)'%t for t in sorted(counts.items()))
+                +(', not imported: '+', '.join(skipped) if skipped else ''))
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmInp.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import io
+import re
+import hashlib
+
+# version of the formatting of sections, to be incremented whenever the
+# text written for the same rows changes (it is part of cache keys)
+INP_FORMAT = 1
+
+# size of the write buffer of .inp files
+BUFFER_SIZE = 1 << 20
+
+# for date and time saved as timestamps
+TIMESTAMP = re.compile('^(\d\d\d\d)-(\d\d)-(\d\d) (\d\d:\d\d):\d\d')
+
+# values of a space separated line, double quoted ones may hold spaces
+QUOTED = re.compile(u'"[^"]*"|[^\\s"]+', re.UNICODE)
+
+# column kinds, numbers can never look like NULL or like a timestamp
+NUMBER = 'number'
+TEXT = 'text'
+
+# sections in the order they are written in the .inp file
+SECTIONS = ['OPTIONS', 'REPORT', 'FILES', 'RAINGAGES', 'HYDROGRAPHS',
+        'EVAPORATION', 'TEMPERATURE', 'SUBCATCHMENTS', 'SUBAREAS',
+        'INFILTRATION', 'LID_CONTROLS', 'LID_USAGE', 'AQUIFERS',
+        'GROUNDWATER', 'SNOWPACKS', 'JUNCTIONS', 'OUTFALLS', 'DIVIDERS',
+        'STORAGE', 'CONDUITS', 'PUMPS', 'ORIFICES', 'WEIRS', 'OUTLETS',
+        'XSECTIONS', 'TRANSECTS', 'LOSSES', 'CONTROLS', 'POLLUTANTS',
+        'LANDUSES', 'COVERAGES', 'BUILDUP', 'WASHOFF', 'TREATMENT', 'INFLOWS',
+        'DWF', 'PATTERNS', 'RDII', 'LOADINGS', 'CURVES', 'TIMESERIES']
+
+# sections with one row per simulation title
+KEYVAL_SECTIONS = ['OPTIONS', 'REPORT', 'EVAPORATION']
+
+# sections whose rows may refer to a file read by the simulation: the
+# keyword, its column and the column of the path
+FILE_COLUMNS = {'FILES': (u'USE', 0, 2), 'RAINGAGES': (u'FILE', 4, 5),
+        'TEMPERATURE': (u'FILE', 0, 1), 'TIMESERIES': (u'FILE', 1, 2)}
+
+def openInp(filename):
+    "buffered utf-8 output file, line ends are written as is"
+    return io.open(filename, 'w', encoding='utf-8', newline='',
+            buffering=BUFFER_SIZE)
+
+# values are qgis attributes or, without qgis, database values where
+# NULL is None
+
+def formatText(v):
+    if v is None:
+        return u''
+    s = unicode(v)
+    if s == u'NULL':
+        return u''
+    m = TIMESTAMP.match(s)
+    if m:
+        return m.group(2)+u'/'+m.group(3)+u'/'+m.group(1)+u'\t'+m.group(4)
+    return s
+
+def formatNumber(v):
+    if v is None:
+        return u''
+    s = unicode(v)
+    return u'' if s == u'NULL' else s
+
+FORMATTERS = {NUMBER: formatNumber, TEXT: formatText}
+
+def tableHeader(table_name, columns):
+    "section and comment lines starting a tabular section"
+    return [u'['+table_name+u']\n',
+            u';'+u''.join([c+u'\t' for c in columns])+u'\n']
+
+def tableLines(table_name, columns, kinds, rows):
+    """Lines of a tabular section
+
+    columns are the names written in the comment line, kinds the column
+    kinds used to pick the cell formatter and rows an iterable of value
+    sequences with one value per column.
+    """
+    formatters = [FORMATTERS[kind] for kind in kinds]
+    for line in tableHeader(table_name, columns):
+        yield line
+    for row in rows:
+        yield u''.join([fmt(v)+u'\t' for fmt, v in zip(formatters, row)])+u'\n'
+    yield u'\n'
+
+def keyValLines(table_name, keys, rows):
+    """Lines of a key/value section
+
+    keys are the column names, rows the value sequences of the rows
+    selected for the simulation, the first column (the simulation
+    title) is not written.
+    """
+    yield u'['+table_name+u']\n'
+    for row in rows:
+        for key, v in zip(keys[1:], row[1:]):
+            s = unicode(v)
+            if s != u'NULL':
+                yield key.upper()+u'\t'+s+u'\n'
+            else:
+                yield u'\t'
+        yield u'\n'
+    yield u'\n'
+
+def splitRow(line):
+    """values of a line of an .inp section, comment removed
+
+    Rows written by tableLines (each value followed by a tab) are split
+    on tabs, empty values keep their place. Other lines are split on
+    spaces and tabs. Double quotes around a value are removed, a quoted
+    value may hold spaces.
+    """
+    line = line.split(u';', 1)[0].rstrip(u'\r\n')
+    if line.endswith(u'\t'):
+        values = [v.strip() for v in line.strip(u' ').split(u'\t')[:-1]]
+    else:
+        values = QUOTED.findall(line)
+    return [v[1:-1] if len(v) > 1 and v[0] == v[-1] == u'"' else v
+            for v in values]
+
+def sectionLines(filename, names):
+    """iterates over the (section name, line) of some sections of an .inp
+    file, comments and blank lines are skipped"""
+    section = None
+    f = io.open(filename, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            content = line.split(u';', 1)[0].strip()
+            if not content:
+                continue
+            if content.startswith(u'['):
+                section = content.strip(u'[]').upper()
+            elif section in names:
+                yield section, line
+    finally:
+        f.close()
+
+def readSections(filename, names):
+    """Rows of some sections of an .inp file
+
+    Returns a map of section name to the list of its rows, each row being
+    the list of its values (see splitRow). Comments and blank lines are
+    skipped, sections not in names are not kept.
+    """
+    sections = {}
+    for section, line in sectionLines(filename, names):
+        sections.setdefault(section, []).append(splitRow(line))
+    return sections
+
+def externalFiles(filename):
+    """Paths of the files read by the simulation of an .inp file
+
+    These are the interface files of the USE lines of [FILES], the files
+    of rain gages and of [TIMESERIES] rows, and the climate file of
+    [TEMPERATURE]. Relative paths are taken from the directory of the
+    .inp file. Each path is listed once.
+    """
+    folder = os.path.dirname(os.path.abspath(filename))
+    paths = []
+    for section, line in sectionLines(filename, FILE_COLUMNS.keys()):
+        if not u'FILE' in line.upper() and not u'USE' in line.upper():
+            continue # most rows of a large [TIMESERIES], not split
+        row = splitRow(line)
+        keyword, keyword_column, column = FILE_COLUMNS[section]
+        if len(row) > column and row[keyword_column].upper() == keyword:
+            path = os.path.join(folder, row[column])
+            if not path in paths:
+                paths.append(path)
+    return paths
+
+def patchInp(src, dst, options={}, files=[]):
+    """Copies an .inp file, changing some of its options
+
+    options maps option names to the values written in place of the ones
+    of the [OPTIONS] section, options not found are added. files are lines
+    added to the [FILES] section, which is added if there is none. Other
+    lines are copied as is. Returns the sha1 of the written text, the
+    [TITLE] section and added [FILES] lines excepted, so that it does not
+    depend on the simulation title nor on the paths these lines refer to.
+    """
+    h = hashlib.sha1()
+    files = [line+u'\n' for line in files]
+    section = None
+    i = io.open(src, 'r', encoding='utf-8', newline='')
+    o = openInp(dst)
+    try:
+        def write(line):
+            o.write(line)
+            if section != u'TITLE':
+                h.update(line.encode('utf-8'))
+        for line in i:
+            content = line.split(u';', 1)[0].strip()
+            if content.startswith(u'['):
+                section = content.strip(u'[]').upper()
+                write(line)
+                if section == u'OPTIONS':
+                    for key, value in options.items():
+                        write(key+u'\t'+value+u'\n')
+                elif section == u'FILES':
+                    o.writelines(files)
+                    files = []
+            elif section == u'OPTIONS' and content \
+                    and content.split()[0].upper() in options:
+                continue
+            else:
+                write(line)
+        if files:
+            o.write(u'\n[FILES]\n')
+            o.writelines(files)
+    finally:
+        i.close()
+        o.close()
+    return h.hexdigest()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmLayer.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import hashlib
+from qgis.core import QgsFeatureRequest
+
+import SwmmPostgis
+
+# providers reading a local file, the file path comes first in the source
+FILE_PROVIDERS = ['ogr', 'spatialite', 'delimitedtext']
+
+# files of a shapefile, and sqlite journals, which hold rows of a layer
+# besides the file of its source
+SHAPEFILE_EXTENSIONS = ['.shp', '.shx', '.dbf', '.prj', '.cpg']
+JOURNAL_SUFFIXES = ['-wal', '-shm', '-journal']
+
+def layerSignature(layer):
+    """Cheap signature of the content of a layer
+
+    Changes whenever the rows of the layer may have changed. It is made of
+    the layer source, fields, feature count and, depending on the
+    provider, the size and modification time of the underlying files (see
+    layerFiles) or a row hash computed by the postgres server. Layers with
+    pending edits, or whose provider gives no such information, fall back
+    to a hash of the attributes of their features.
+    """
+    parts = signatureParts(layer)
+    return partsDigest(parts+[storedSignature(layer) or
+        attributeDigest(layer)])
+
+def geometrySignature(layer):
+    """Signature of the content of a layer, geometries included
+
+    Like layerSignature, without the fallback: None if the layer has
+    pending edits or if its provider gives no cheap signature.
+    """
+    signature = storedSignature(layer)
+    if signature is None:
+        return None
+    return partsDigest(signatureParts(layer)+[signature])
+
+def signatureParts(layer):
+    provider = layer.dataProvider()
+    parts = [layer.source(), provider.name(), provider.featureCount()]
+    parts += [field.name()+':'+str(field.type())
+            for field in provider.fields()]
+    return parts
+
+def layerFiles(path):
+    """the file of a layer and the ones holding part of its rows: the
+    other files of a shapefile (attributes are in the .dbf) and sqlite
+    journals (GeoPackage and spatialite)"""
+    files = [path]
+    base, ext = os.path.splitext(path)
+    if ext.lower() in SHAPEFILE_EXTENSIONS:
+        for extension in SHAPEFILE_EXTENSIONS:
+            for candidate in (base+extension, base+extension.upper()):
+                if not candidate in files and os.path.isfile(candidate):
+                    files.append(candidate)
+    files += [path+suffix for suffix in JOURNAL_SUFFIXES
+            if os.path.isfile(path+suffix)]
+    return files
+
+def storedSignature(layer):
+    """modification time of the files or row hash of the postgres table
+    of a layer, None if it has pending edits or no such thing"""
+    provider = layer.dataProvider()
+    path = layer.source().split('|')[0].split('?')[0]
+    if layer.isModified():
+        return None
+    if provider.name() in FILE_PROVIDERS and os.path.isfile(path):
+        signature = []
+        for filename in layerFiles(path):
+            st = os.stat(filename)
+            signature.append('%s:%d:%r'%(os.path.basename(filename),
+                st.st_size, st.st_mtime))
+        return ';'.join(signature)
+    if SwmmPostgis.isPostgis(layer):
+        return SwmmPostgis.tableSignature(layer)
+    return None
+
+def partsDigest(parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(unicode(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+def attributeDigest(layer):
+    "sha1 of the attributes of the features, edit buffer included"
+    h = hashlib.sha1()
+    request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+    for feature in layer.getFeatures(request):
+        h.update(u'\t'.join([unicode(v)
+            for v in feature.attributes()]).encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()
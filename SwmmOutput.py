@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmOutput.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import struct
+import bisect
+import datetime
+import numpy
+
+from SwmmReport import NODE, LINK
+
+# layout of the swmm5 binary output file (see output.c in swmm sources):
+#
+#   opening records  : magic, version, flow units, #subcatch, #nodes,
+#                      #links, #pollutants (7 x int32)
+#   object ids       : length prefixed names of subcatchments, nodes,
+#                      links and pollutants, then pollutant unit codes
+#   input properties : subcatchment areas, node type/invert/max depth,
+#                      link type/offsets/max depth/length
+#   variable codes   : reported variables for each object kind
+#   start date       : float64 (days since 12/30/1899), report step (int32)
+#   results          : one record per reporting period, a float64 date
+#                      followed by float32 values of every reported
+#                      subcatchment, node, link and system variable
+#   closing records  : id, input and output positions, #periods,
+#                      error code, magic (6 x int32)
+
+MAGIC_NUMBER = 516114522
+CLOSING_RECORDS_SIZE = 6*4
+
+FLOW_UNITS = ['CFS', 'GPM', 'MGD', 'CMS', 'LPS', 'MLD']
+
+SUBCATCH_VARIABLES = ['Rainfall', 'SnowDepth', 'Evaporation', 'Infiltration',
+        'Runoff', 'GroundwaterFlow', 'GroundwaterElevation', 'SoilMoisture']
+NODE_VARIABLES = ['Depth', 'Head', 'Volume', 'LateralInflow', 'Inflow',
+        'Flooding']
+LINK_VARIABLES = ['Flow', 'Depth', 'Velocity', 'Volume', 'Capacity']
+SYSTEM_VARIABLES = ['Temperature', 'Rainfall', 'SnowDepth', 'Infiltration',
+        'Runoff', 'DryWeatherInflow', 'GroundwaterInflow', 'RdiiInflow',
+        'ExternalInflow', 'LateralInflow', 'Flooding', 'Outflow', 'Storage',
+        'Evaporation', 'PotentialEvaporation']
+
+# dates are stored as days since this epoch
+EPOCH = datetime.datetime(1899, 12, 30)
+
+class SwmmOutputError(Exception):
+    pass
+
+class SwmmOutput(object):
+    """Read access to a swmm5 binary output file
+
+    The results are memory mapped, nothing is loaded before it is
+    accessed. Node, link and subcatchment results are exposed as float32
+    arrays indexed by element x time x variable, system results as time x
+    variable. Element indices follow the order of node_ids, link_ids and
+    subcatch_ids, variable indices the order of the *_variables lists.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            f.seek(0, 2)
+            size = f.tell()
+            if size < 7*4 + CLOSING_RECORDS_SIZE:
+                raise SwmmOutputError(filename+' is not a swmm output file')
+
+            f.seek(size - CLOSING_RECORDS_SIZE)
+            (id_pos, input_pos, output_pos, self.nperiods,
+                    self.error_code, magic) = struct.unpack(
+                            '<6i', f.read(CLOSING_RECORDS_SIZE))
+            f.seek(0)
+            (magic_start, self.version, flow_units, nsubcatch, nnodes,
+                    nlinks, npolluts) = struct.unpack('<7i', f.read(7*4))
+            if magic != MAGIC_NUMBER or magic_start != MAGIC_NUMBER:
+                raise SwmmOutputError(filename+' is not a swmm output file')
+            self.flow_units = FLOW_UNITS[flow_units] \
+                    if 0 <= flow_units < len(FLOW_UNITS) else str(flow_units)
+
+            f.seek(id_pos)
+            self.subcatch_ids = self._readIds(f, nsubcatch)
+            self.node_ids = self._readIds(f, nnodes)
+            self.link_ids = self._readIds(f, nlinks)
+            self.pollutant_ids = self._readIds(f, npolluts)
+
+            f.seek(input_pos)
+            self.subcatch_properties = self._readProperties(f, nsubcatch,
+                    [('area', '<f4')])
+            self.node_properties = self._readProperties(f, nnodes,
+                    [('type', '<i4'), ('invert', '<f4'),
+                     ('max_depth', '<f4')])
+            self.link_properties = self._readProperties(f, nlinks,
+                    [('type', '<i4'), ('offset1', '<f4'), ('offset2', '<f4'),
+                     ('max_depth', '<f4'), ('length', '<f4')])
+
+            self.subcatch_variables = self._readVariables(f,
+                    SUBCATCH_VARIABLES)
+            self.node_variables = self._readVariables(f, NODE_VARIABLES)
+            self.link_variables = self._readVariables(f, LINK_VARIABLES)
+            self.system_variables = self._readVariables(f, SYSTEM_VARIABLES)
+
+            self.start_date, = struct.unpack('<d', f.read(8))
+            self.report_step, = struct.unpack('<i', f.read(4))
+
+        fields = [('date', '<f8')]
+        for name, n, variables in (
+                ('subcatch', nsubcatch, self.subcatch_variables),
+                ('node', nnodes, self.node_variables),
+                ('link', nlinks, self.link_variables)):
+            if n and variables:
+                fields.append((name, '<f4', (n, len(variables))))
+        fields.append(('system', '<f4', (len(self.system_variables),)))
+        dtype = numpy.dtype(fields)
+
+        if output_pos + self.nperiods*dtype.itemsize \
+                > size - CLOSING_RECORDS_SIZE:
+            raise SwmmOutputError(filename+' is truncated')
+
+        self._periods = numpy.memmap(filename, dtype=dtype, mode='r',
+                offset=output_pos, shape=(self.nperiods,)) \
+                        if self.nperiods else numpy.zeros(0, dtype)
+
+    def _readIds(self, f, n):
+        ids = []
+        for i in range(n):
+            length, = struct.unpack('<i', f.read(4))
+            ids.append(f.read(length).decode('utf-8', 'replace'))
+        return ids
+
+    def _readProperties(self, f, n, fields):
+        nprop, = struct.unpack('<i', f.read(4))
+        f.read(4*nprop) # property codes, the layout is fixed
+        return numpy.fromfile(f, dtype=numpy.dtype(fields), count=n)
+
+    def _readVariables(self, f, names):
+        nvar, = struct.unpack('<i', f.read(4))
+        codes = struct.unpack('<%di'%nvar, f.read(4*nvar))
+        variables = []
+        for code in codes:
+            if code < len(names):
+                variables.append(names[code])
+            else:
+                # pollutant concentrations come after the fixed variables
+                variables.append(self.pollutant_ids[code-len(names)])
+        return variables
+
+    def _results(self, name, n, variables):
+        if name in self._periods.dtype.names:
+            return self._periods[name].transpose(1, 0, 2)
+        return numpy.zeros((n, self.nperiods, len(variables)), numpy.float32)
+
+    @property
+    def subcatchments(self):
+        return self._results('subcatch', len(self.subcatch_ids),
+                self.subcatch_variables)
+
+    @property
+    def nodes(self):
+        return self._results('node', len(self.node_ids), self.node_variables)
+
+    @property
+    def links(self):
+        return self._results('link', len(self.link_ids), self.link_variables)
+
+    @property
+    def system(self):
+        return self._periods['system']
+
+    def times(self):
+        "date and time of each reporting period, rounded to the second"
+        return [EPOCH + datetime.timedelta(seconds=int(round(d*86400.)))
+                for d in self._periods['date']]
+
+    def close(self):
+        # the mapping is released once the last array view is gone
+        self._periods = None
+
+def outputRecords(output, percent=None, elements=None, start=None, end=None):
+    """Iterate over the node and link results of a SwmmOutput
+
+    Yields the same records as SwmmReport.readReport, values are picked
+    from the memory mapped (element x time x variable) arrays one element
+    at a time, only for the elements and the time window given (see
+    readReport), other values are not read. percent, if given, is called
+    each time the percentage of elements done changes.
+    """
+    times = [t.strftime('%Y-%m-%d %H:%M:%S') for t in output.times()]
+    first = bisect.bisect_left(times, start) if start else 0
+    last = bisect.bisect_right(times, end) if end else len(times)
+    times = times[first:last]
+    node_columns = [output.node_variables.index(v)
+            for v in ('Inflow', 'Flooding', 'Depth', 'Head')]
+    link_columns = [output.link_variables.index(v)
+            for v in ('Flow', 'Velocity', 'Depth', 'Capacity')]
+    node_indices = [i for i, node_id in enumerate(output.node_ids)
+            if elements is None or node_id in elements]
+    link_indices = [i for i, link_id in enumerate(output.link_ids)
+            if elements is None or link_id in elements]
+    total = max(1, len(node_indices) + len(link_indices))
+
+    done_percent = -1
+
+    nodes = output.nodes
+    for done, i in enumerate(node_indices):
+        for time, values in zip(times,
+                nodes[i][first:last, node_columns].tolist()):
+            yield NODE, output.node_ids[i], time, values
+        if percent and 100*(done+1)//total != done_percent:
+            done_percent = 100*(done+1)//total
+            percent(done_percent)
+
+    links = output.links
+    for done, i in enumerate(link_indices):
+        # capacity is the filled fraction of the cross section
+        for time, (flow, velocity, depth, capacity) in zip(times,
+                links[i][first:last, link_columns].tolist()):
+            yield LINK, output.link_ids[i], time, [flow, velocity, depth,
+                    100*capacity]
+        if percent and 100*(len(node_indices)+done+1)//total != done_percent:
+            done_percent = 100*(len(node_indices)+done+1)//total
+            percent(done_percent)
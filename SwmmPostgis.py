@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmPostgis.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+from qgis.core import QgsDataSourceURI
+
+from SwmmInp import TEXT
+from SwmmSource import quoteIdentifier
+
+# psycopg2 is optional, postgres layers are read through qgis without it
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+def isPostgis(layer):
+    return psycopg2 is not None \
+            and layer.dataProvider().name() == 'postgres'
+
+def connect(layer):
+    "connection to the database of a postgres layer"
+    return psycopg2.connect(
+            QgsDataSourceURI(layer.source()).connectionInfo())
+
+def fromClause(layer):
+    "FROM clause selecting the rows of the layer, subset string included"
+    uri = QgsDataSourceURI(layer.source())
+    sql = ' FROM '+uri.quotedTablename()+' AS t'
+    if uri.sql():
+        sql += ' WHERE '+uri.sql()
+    return sql
+
+def keyColumns(layer):
+    "primary key columns of the layer, as named in fromClause"
+    fields = layer.dataProvider().fields()
+    return ['t.'+quoteIdentifier(fields[i].name())
+            for i in layer.dataProvider().pkAttributeIndexes()]
+
+def tableSignature(layer):
+    """Row count and md5 of the rows of a postgres layer
+
+    Computed by the server, the rows do not go over the wire. Rows are
+    hashed in the order of the primary key, or of their md5 without one,
+    the scan order of the table changes when rows are updated. Returns
+    None if it can't be computed.
+    """
+    order = ', '.join(keyColumns(layer)) or 'md5(t::text)'
+    try:
+        con = connect(layer)
+        try:
+            cur = con.cursor()
+            cur.execute("SELECT count(*), md5(string_agg(md5(t::text), '' "
+                    "ORDER BY "+order+"))"+fromClause(layer))
+            count, digest = cur.fetchone()
+            return '%d:%s'%(count, digest)
+        finally:
+            con.close()
+    except psycopg2.Error:
+        return None
+
+# quote character of the COPY output of sections, it never occurs in the
+# values and is removed from the output
+COPY_QUOTE = b'\x01'
+
+# text cells looking like timestamps are written as date and time columns,
+# as SwmmInp.formatText does
+TIMESTAMP_CELL = ("regexp_replace(%s, "
+        "'^(\\d\\d\\d\\d)-(\\d\\d)-(\\d\\d) (\\d\\d:\\d\\d):\\d\\d.*$', "
+        "'\\2/\\3/\\1' || chr(9) || '\\4')")
+
+def sectionCopy(layer, columns, kinds):
+    """COPY statement writing the rows of a tabular section
+
+    Rows are formatted by the server as SwmmInp.tableLines does, each
+    value followed by a tab. Values are written in csv mode with
+    COPY_QUOTE as quote, the ones holding a tab or a line end (e.g. the
+    rules of CONTROLS) come quoted. Empty and NULL values are written
+    as empty strings, unquoted. Rows are ordered by the primary key.
+    Tables without one (e.g. TIMESERIES, CURVES, CONTROLS) are read in
+    scan order, as qgis and SwmmSource read them: the order of their rows
+    matters and sorting on a column would mix rows sharing its value.
+    """
+    cells = []
+    for column, kind in zip(columns, kinds):
+        cell = 't.'+quoteIdentifier(column)+'::text'
+        if kind == TEXT:
+            cell = TIMESTAMP_CELL%("nullif("+cell+", 'NULL')")
+        cells.append("nullif("+cell+", '')")
+    # an empty last column gives the tab after the last value
+    cells.append('NULL::text')
+    keys = keyColumns(layer)
+    return ("COPY (SELECT "+', '.join(cells)+fromClause(layer)
+            +(" ORDER BY "+', '.join(keys) if keys else '')+") TO STDOUT "
+            "WITH (FORMAT csv, DELIMITER E'\\t', NULL '', "
+            "QUOTE E'\\x01')")
+
+class Unquote(object):
+    "file like object removing COPY_QUOTE from what is written to out"
+
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, data):
+        self.out.write(data.replace(COPY_QUOTE, b''))
+
+def copySection(layer, columns, kinds, out):
+    """Writes the rows of a tabular section with COPY TO STDOUT
+
+    The rows of the columns given (with the column kinds of
+    SwmmInp.tableLines) are formatted by the server (see sectionCopy) and
+    streamed to out, a binary file, as utf-8 text. Returns the number of
+    rows, or None if the server failed, out may then hold part of the
+    rows.
+    """
+    try:
+        con = connect(layer)
+        try:
+            con.set_client_encoding('UTF8')
+            cur = con.cursor()
+            cur.copy_expert(sectionCopy(layer, columns, kinds), Unquote(out))
+            return cur.rowcount
+        finally:
+            con.close()
+    except psycopg2.Error:
+        return None
+
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmProfile.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+import time
+import json
+import pstats
+import cProfile
+import datetime
+import threading
+from StringIO import StringIO
+from collections import OrderedDict
+
+# number of functions listed in the log when the python profiler is on
+STATS_LINES = 30
+
+class TimedIterator(object):
+    """Wraps an iterable, counts its items and the seconds spent getting
+    them (including the time spent in the generators it depends on)"""
+
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.seconds = 0.
+        self.rows = 0
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        start = time.time()
+        try:
+            item = self.iterator.next()
+        finally:
+            self.seconds += time.time() - start
+        self.rows += 1
+        return item
+
+class SwmmProfile(object):
+    """Wall time, row and byte counts of the phases of a run
+
+    Measures are accumulated per (phase, section) in the order they are
+    first recorded, section is a section name (or any detail of the
+    phase) or None. Recording is thread safe, simulations of an ensemble
+    add to the same profile.
+
+    With python set, the whole run is also profiled with cProfile.
+    """
+
+    def __init__(self, python=False):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.started = datetime.datetime.now()
+        self.start = time.time()
+        self.seconds = None
+        self.profiler = cProfile.Profile() if python else None
+
+    def add(self, phase, section=None, seconds=0., rows=0, bytes=0):
+        with self.lock:
+            entry = self.entries.get((phase, section))
+            if entry is None:
+                entry = {'seconds': 0., 'rows': 0, 'bytes': 0, 'calls': 0}
+                self.entries[(phase, section)] = entry
+            entry['seconds'] += seconds
+            entry['rows'] += rows
+            entry['bytes'] += bytes
+            entry['calls'] += 1
+
+    def timed(self, phase, section, iterable):
+        "iterate over iterable, recording the time spent and rows fetched"
+        timed = TimedIterator(iterable)
+        try:
+            for item in timed:
+                yield item
+        finally:
+            self.add(phase, section, timed.seconds, timed.rows)
+
+    def run(self, function, *args):
+        "calls function, under the python profiler if it is on"
+        try:
+            if self.profiler:
+                return self.profiler.runcall(function, *args)
+            return function(*args)
+        finally:
+            self.seconds = time.time() - self.start
+
+    def summary(self):
+        "text table of the measures, with a total per phase"
+        totals = OrderedDict()
+        for (phase, section), entry in self.entries.iteritems():
+            total = totals.setdefault(phase, [0., 0, 0])
+            total[0] += entry['seconds']
+            total[1] += entry['rows']
+            total[2] += entry['bytes']
+        lines = ['Swmm profile, %.3fs in total'%(self.seconds or 0.),
+                '%-12s %-16s %10s %10s %12s'%('phase', 'section', 'seconds',
+                    'rows', 'bytes')]
+        for phase, (seconds, rows, bytes) in totals.iteritems():
+            lines.append('%-12s %-16s %10.3f %10d %12d'%(phase, '', seconds,
+                rows, bytes))
+            for (p, section), entry in self.entries.iteritems():
+                if p == phase and section is not None:
+                    lines.append('%-12s %-16s %10.3f %10d %12d'%('', section,
+                        entry['seconds'], entry['rows'], entry['bytes']))
+        return '\n'.join(lines)
+
+    def pythonStats(self):
+        "functions taking the most cumulative time, None without profiler"
+        if not self.profiler:
+            return None
+        s = StringIO()
+        pstats.Stats(self.profiler, stream=s).sort_stats('cumulative')\
+                .print_stats(STATS_LINES)
+        return s.getvalue()
+
+    def save(self, filename, statsfilename=None):
+        """Writes the measures as JSON, and the cProfile statistics to
+        statsfilename if the python profiler is on"""
+        f = open(filename, 'w')
+        try:
+            json.dump({'started': self.started.isoformat(),
+                'seconds': self.seconds,
+                'entries': [dict(entry, phase=phase, section=section)
+                    for (phase, section), entry in self.entries.iteritems()]},
+                f, indent=2)
+        finally:
+            f.close()
+        if self.profiler and statsfilename:
+            self.profiler.dump_stats(statsfilename)
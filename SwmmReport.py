@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmReport.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import re
+import json
+
+NODE = 'Node'
+LINK = 'Link'
+
+MONTHS = {'JAN':'01',
+          'FEB':'02',
+          'MAR':'03',
+          'APR':'04',
+          'MAY':'05',
+          'JUN':'06',
+          'JUL':'07',
+          'AUG':'08',
+          'SEP':'09',
+          'OCT':'10',
+          'NOV':'11',
+          'DEC':'12'}
+
+DATE = re.compile('^(\S+)-(\d\d)-(\d\d\d\d)$')
+
+# reporting step in the analysis options of a report
+REPORT_STEP = re.compile(
+        b'^\s*Report Time Step \.+ (\d+):(\d\d):(\d\d)\s*$')
+
+# converted dates, there is one per simulated day
+_dates = {}
+
+def convert_date(d):
+    converted = _dates.get(d)
+    if converted is None:
+        m = DATE.match(d)
+        if not m : raise RuntimeError
+        converted = m.group(3)+'-'+MONTHS[m.group(1)]+'-'+m.group(2)
+        _dates[d] = converted
+    return converted
+
+def blockHeader(line):
+    "(kind, id) of a <<< Node X >>> or <<< Link X >>> line, None otherwise"
+    if line.startswith(b'  <<< Node ') or line.startswith(b'  <<< Link '):
+        line = line.rstrip()
+        return (NODE if line[6:10] == b'Node' else LINK,
+                line[11:-4].decode('utf-8'))
+    return None
+
+def reportStep(filename):
+    """seconds of the reporting step of a report, from its analysis
+    options, None if they are not found before the time series"""
+    o = open(filename, 'rb')
+    try:
+        for line in o:
+            m = REPORT_STEP.match(line)
+            if m:
+                return 3600*int(m.group(1)) + 60*int(m.group(2)) \
+                        + int(m.group(3))
+            if blockHeader(line):
+                break
+    finally:
+        o.close()
+    return None
+
+def indexFilename(filename):
+    return os.path.splitext(filename)[0]+'.idx'
+
+def indexReport(filename):
+    """Byte offset and row count of the time series blocks of a report
+
+    Returns a list of [kind, id, offset, rows] in the order of the file,
+    offset is the position of the first row of the block.
+    """
+    blocks = []
+    o = open(filename, 'rb')
+    try:
+        block = None
+        line = o.readline()
+        while line:
+            header = blockHeader(line)
+            if header:
+                for i in range(4):
+                    o.readline()
+                block = [header[0], header[1], o.tell(), 0]
+                blocks.append(block)
+            elif block:
+                if line.strip():
+                    block[3] += 1
+                else:
+                    block = None
+            line = o.readline()
+    finally:
+        o.close()
+    return blocks
+
+def reportIndex(filename):
+    """Index of a report, see indexReport
+
+    The index is saved next to the report (same name, .idx extension)
+    and reused as long as the size and modification time of the report
+    did not change.
+    """
+    st = os.stat(filename)
+    signature = [st.st_size, st.st_mtime]
+    try:
+        f = open(indexFilename(filename), 'r')
+        try:
+            index = json.load(f)
+        finally:
+            f.close()
+        if index['report'] == signature:
+            return index['blocks']
+    except (IOError, ValueError, KeyError, TypeError):
+        pass
+    blocks = indexReport(filename)
+    try:
+        f = open(indexFilename(filename), 'w')
+        try:
+            json.dump({'report': signature, 'blocks': blocks}, f)
+        finally:
+            f.close()
+    except IOError:
+        pass # read only folder, the index is rebuilt next time
+    return blocks
+
+def readRow(kind, element_id, line):
+    tbl = line.split()
+    if len(tbl) >= 6:
+        return (kind, element_id,
+                convert_date(tbl[0])+' '+tbl[1],
+                [float(tbl[2]), float(tbl[3]), float(tbl[4]), float(tbl[5])])
+    return None
+
+def readReport(filename, progress=None, elements=None, start=None, end=None):
+    """Iterate over the node and link time series of a text report
+
+    The report must have been produced with the time series tables
+    (<<< Node X >>> and <<< Link X >>> blocks). Yields (kind, id, time,
+    values) with kind NODE or LINK, time as 'YYYY-MM-DD HH:MM:SS' and the
+    four values of the table as floats (inflow, flooding, depth and head
+    for nodes, flow, velocity, depth and percent full for links).
+    progress, if given, is called each time the percentage of the file
+    read changes.
+
+    elements, a set of ids, restricts the output to the blocks of those
+    elements, which are found with the report index (see reportIndex).
+    start and end, 'YYYY-MM-DD HH:MM:SS' strings, restrict it to a time
+    window, bounds included.
+    """
+    if elements is not None:
+        for record in readIndexed(filename, progress, elements, start, end):
+            yield record
+        return
+    total_size = os.path.getsize(filename) or 1
+    total_read = 0
+    percent = -1
+    o = open(filename, 'rb')
+    element_id = ''
+    kind = None
+    line = o.readline()
+    while line:
+        total_read += len(line)
+        if element_id and not line.strip():
+            element_id = ''
+        else:
+            header = blockHeader(line)
+            if header:
+                kind, element_id = header
+                for i in range(5):
+                    line = o.readline()
+                    total_read += len(line)
+        if element_id:
+            record = readRow(kind, element_id, line)
+            if record and not (start and record[2] < start):
+                if end and record[2] > end:
+                    element_id = '' # rows are sorted by time
+                else:
+                    yield record
+        if progress and 100*total_read//total_size != percent:
+            percent = 100*total_read//total_size
+            progress(percent)
+        line = o.readline()
+    o.close()
+
+def readIndexed(filename, progress, elements, start, end):
+    "records of the blocks of elements, see readReport"
+    blocks = [b for b in reportIndex(filename) if b[1] in elements]
+    o = open(filename, 'rb')
+    try:
+        for i, (kind, element_id, offset, rows) in enumerate(blocks):
+            o.seek(offset)
+            for j in range(rows):
+                record = readRow(kind, element_id, o.readline())
+                if not record or (start and record[2] < start):
+                    continue
+                if end and record[2] > end:
+                    break
+                yield record
+            if progress:
+                progress(100*(i+1)//len(blocks))
+    finally:
+        o.close()
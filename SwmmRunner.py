@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmRunner.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import re
+import Queue
+import threading
+import subprocess
+from collections import deque
+
+# percent complete printed by swmm, e.g. "... Running [=====   ] 45.0%"
+PERCENT = re.compile(r'(\d+(?:\.\d+)?)%')
+
+# number of console lines kept in memory, the full output goes to a file
+LOG_LINES = 200
+
+# seconds between two checks of cancellation while swmm is silent
+POLL_INTERVAL = 0.2
+
+class SwmmCanceled(Exception):
+    pass
+
+def tailLines(filename, count=LOG_LINES):
+    "last lines of a console output file"
+    o = open(filename, 'rb')
+    try:
+        return ''.join(deque(o, count))
+    finally:
+        o.close()
+
+def _pump(stream, queue):
+    for chunk in iter(lambda: os.read(stream.fileno(), 4096), b''):
+        queue.put(chunk)
+    queue.put(None)
+
+def runProcess(args, logfilename, percent=None, canceled=None):
+    """Runs a command line program and returns the end of its output
+
+    The console output is written as is to logfilename while it is read,
+    only the last LOG_LINES lines are kept in memory (carriage return
+    updates of a line count as one line, the last one). percent, if
+    given, is called with the integer progress found in the output each
+    time it changes. canceled, if given, is polled while the program runs,
+    the program is terminated and SwmmCanceled raised once it returns
+    True.
+    """
+    proc = subprocess.Popen(args,
+            stdout=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=False)
+    queue = Queue.Queue()
+    reader = threading.Thread(target=_pump, args=(proc.stdout, queue))
+    reader.daemon = True
+    reader.start()
+
+    tail = deque(maxlen=LOG_LINES)
+    line = b'' # current line, up to its last carriage return
+    pending = b'' # text after the last line break or carriage return
+    current = -1
+    log = open(logfilename, 'wb')
+    try:
+        while True:
+            try:
+                chunk = queue.get(timeout=POLL_INTERVAL)
+            except Queue.Empty:
+                chunk = b''
+            if canceled and canceled():
+                raise SwmmCanceled('Simulation canceled')
+            if chunk is None:
+                break
+            log.write(chunk)
+
+            text = pending + chunk
+            cut = max(text.rfind(b'\r'), text.rfind(b'\n')) + 1
+            complete, pending = text[:cut], text[cut:]
+            if not complete:
+                continue
+            if percent:
+                found = PERCENT.findall(complete)
+                if found and min(100, int(float(found[-1]))) != current:
+                    current = min(100, int(float(found[-1])))
+                    percent(current)
+            lines = (line + complete).split(b'\n')
+            line = lines.pop()
+            for l in lines:
+                tail.append(l.rstrip(b'\r').split(b'\r')[-1] + b'\n')
+            # only the last update of the line is kept
+            line = line[line.rfind(b'\r', 0, len(line) - 1) + 1:]
+        proc.wait()
+    finally:
+        log.close()
+        if proc.poll() is None:
+            proc.terminate()
+            proc.wait()
+    last = (line + pending).rstrip(b'\r').split(b'\r')[-1]
+    if last:
+        tail.append(last)
+    return b''.join(tail)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmSeries.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+import os
+import io
+import re
+import hashlib
+from collections import OrderedDict
+
+# series files kept open while rows are dispatched, rows of a series are
+# usually contiguous and only one file is written at a time
+MAX_OPEN_FILES = 64
+
+def seriesFilename(index, name):
+    "file name of a series, safe on any file system"
+    return '%04d_%s.dat'%(index, re.sub(r'[^\w.-]+', '_', name)[:64])
+
+class SeriesWriter(object):
+    """Writes the lines of time series to one file per series
+
+    Lines are added with the name of their series, in any order, each
+    series gets its own utf-8 file in folder (see seriesFilename). Files
+    are hashed while they are written, close returns the list of (name,
+    path, sha1 of the content) in the order series were first seen.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.series = OrderedDict() # name -> [path, sha1, line count]
+        self.open = OrderedDict() # name -> file, least recently used first
+
+    def file(self, name):
+        f = self.open.pop(name, None)
+        if f is None:
+            series = self.series.get(name)
+            if series is None:
+                series = [os.path.join(self.folder,
+                    seriesFilename(len(self.series), name)),
+                    hashlib.sha1(), 0]
+                self.series[name] = series
+            if len(self.open) >= MAX_OPEN_FILES:
+                self.open.popitem(last=False)[1].close()
+            f = io.open(series[0], 'a', encoding='utf-8', newline='')
+        self.open[name] = f
+        return f
+
+    def add(self, name, line):
+        self.file(name).write(line)
+        series = self.series[name]
+        series[1].update(line.encode('utf-8'))
+        series[2] += 1
+
+    def close(self):
+        for f in self.open.values():
+            f.close()
+        self.open.clear()
+        return [(name, path, h.hexdigest())
+                for name, (path, h, count) in self.series.items()]
+
+def fileLine(name, path):
+    "line of a [TIMESERIES] section reading a series from a file"
+    return name+u'\tFILE\t"'+path+u'"\n'
+
+def seriesPaths(filename):
+    "paths of the series files referenced by a rendered [TIMESERIES]"
+    paths = []
+    f = io.open(filename, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            cells = line.split(u'\t')
+            if len(cells) > 2 and cells[1] == u'FILE':
+                paths.append(cells[2].strip().strip(u'"'))
+    finally:
+        f.close()
+    return paths
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmSource.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+# Section tables read without qgis, for the command line (see SwmmCli.py)
+#
+# Tables are named after the sections (case does not matter), like the
+# layers the processing algorithms pick by default. Primary key and
+# geometry columns are not exported, rows come in primary key order. The
+# modules needed by a kind of source are only imported when a source of
+# that kind is opened.
+
+import os
+
+from SwmmInp import NUMBER, TEXT
+
+class SwmmSourceError(Exception):
+    pass
+
+def openSource(source, schema='public'):
+    """Opens the section tables of a data source
+
+    source is a postgres connection string ('PG:dbname=... host=...' or
+    'postgresql://...'), a GeoPackage file or a folder of shapefiles (and
+    .dbf tables). For postgres, tables are looked up in schema.
+    """
+    if source.startswith('PG:'):
+        return PostgisSource(source[3:], schema)
+    if source.startswith('postgres://') or source.startswith('postgresql://'):
+        return PostgisSource(source, schema)
+    if os.path.isdir(source):
+        return OgrSource(source)
+    if os.path.isfile(source) and source.lower().endswith('.gpkg'):
+        return GeopackageSource(source)
+    raise SwmmSourceError("Unknown data source '"+source+"'")
+
+def quoteIdentifier(name):
+    return '"'+name.replace('"', '""')+'"'
+
+def sqliteDateTime(declared_type):
+    "True for the declared types of date and time columns"
+    t = (declared_type or '').upper()
+    return 'DATETIME' in t or 'TIMESTAMP' in t
+
+def sqliteKind(declared_type):
+    "column kind from the declared type of a sqlite column"
+    t = (declared_type or '').upper()
+    for number in ('INT', 'REAL', 'FLOA', 'DOUB', 'NUMERIC', 'DECIMAL',
+            'BOOL'):
+        if number in t:
+            return NUMBER
+    return TEXT
+
+class GeopackageSource(object):
+    "tables of a GeoPackage, read with sqlite3"
+
+    def __init__(self, filename):
+        import sqlite3
+        self.con = sqlite3.connect(filename)
+        try:
+            self.tables = dict((table.lower(), table) for table, in
+                    self.con.execute('SELECT table_name FROM gpkg_contents'))
+            self.geometries = dict((table.lower(), column.lower())
+                    for table, column in self.con.execute(
+                        'SELECT table_name, column_name '
+                        'FROM gpkg_geometry_columns'))
+        except sqlite3.Error, e:
+            self.con.close()
+            raise SwmmSourceError(filename+' is not a GeoPackage: '
+                    +unicode(e))
+
+    def table(self, name):
+        """(columns, kinds, rows) of the table of a section, None if there
+        is no such table, rows are an iterator"""
+        table = self.tables.get(name.lower())
+        if table is None:
+            return None
+        geometry = self.geometries.get(table.lower())
+        # cid, name, type, notnull, default, position in the primary key
+        info = self.con.execute('PRAGMA table_info('
+                +quoteIdentifier(table)+')').fetchall()
+        columns = [c for c in info if not c[5] and c[1].lower() != geometry]
+        keys = [c[1] for c in sorted(info, key=lambda c: c[5]) if c[5]]
+        # GeoPackage DATETIME values are ISO 8601 with a T separator, it
+        # is replaced to get the date and time columns of formatText
+        rows = self.con.execute('SELECT '
+                +', '.join("replace("+quoteIdentifier(c[1])+", 'T', ' ')"
+                    if sqliteDateTime(c[2]) else quoteIdentifier(c[1])
+                    for c in columns)
+                +' FROM '+quoteIdentifier(table)
+                +(' ORDER BY '+', '.join(quoteIdentifier(k) for k in keys)
+                    if keys else ''))
+        return ([c[1] for c in columns], [sqliteKind(c[2]) for c in columns],
+                rows)
+
+    def close(self):
+        self.con.close()
+
+class PostgisSource(object):
+    """tables of a postgres schema, read with psycopg2
+
+    Rows are streamed with a server side cursor. Floating point numbers
+    are fetched as double precision, and integers and other values as
+    text, like the postgres provider of qgis gives them.
+    """
+
+    # rows fetched at once from the server side cursors
+    FETCH_SIZE = 10000
+
+    # types of the number columns given as doubles by qgis
+    DOUBLE_TYPES = ('float4', 'float8', 'numeric')
+
+    def __init__(self, dsn, schema='public'):
+        try:
+            import psycopg2
+            import psycopg2.extensions
+        except ImportError:
+            raise SwmmSourceError('psycopg2 is needed to read from postgres')
+        self.psycopg2 = psycopg2
+        try:
+            self.con = psycopg2.connect(dsn)
+        except psycopg2.Error, e:
+            raise SwmmSourceError('Could not connect to postgres: '
+                    +unicode(e))
+        psycopg2.extensions.register_type(psycopg2.extensions.UNICODE,
+                self.con)
+        self.schema = schema
+        self.cursors = 0
+
+    def table(self, name):
+        "see GeopackageSource.table"
+        cur = self.con.cursor()
+        cur.execute("SELECT c.oid, c.relname FROM pg_class c "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = %s AND lower(c.relname) = lower(%s) "
+                "AND c.relkind IN ('r', 'v', 'm', 'f', 'p')",
+                (self.schema, name))
+        found = cur.fetchone()
+        if not found:
+            return None
+        oid, table = found
+        cur.execute("SELECT a.attname, t.typname, t.typcategory, "
+                "a.attnum = ANY(coalesce(i.indkey::int2[], '{}')) "
+                "FROM pg_attribute a JOIN pg_type t ON t.oid = a.atttypid "
+                "LEFT JOIN pg_index i ON i.indrelid = a.attrelid "
+                "AND i.indisprimary "
+                "WHERE a.attrelid = %s AND a.attnum > 0 "
+                "AND NOT a.attisdropped ORDER BY a.attnum", (oid,))
+        attributes = cur.fetchall()
+        cur.close()
+        columns = [a for a in attributes if not a[3]
+                and a[1] not in ('geometry', 'geography')]
+        keys = [a[0] for a in attributes if a[3]]
+        # a named cursor streams the rows instead of fetching them all
+        self.cursors += 1
+        rows = self.con.cursor('swmm_section_%d'%self.cursors)
+        rows.itersize = self.FETCH_SIZE
+        rows.execute('SELECT '
+                +', '.join(quoteIdentifier(a[0])
+                    +('::float8' if a[1] in self.DOUBLE_TYPES else '::text')
+                    for a in columns)
+                +' FROM '+quoteIdentifier(self.schema)+'.'
+                +quoteIdentifier(table)
+                +(' ORDER BY '+', '.join(quoteIdentifier(k) for k in keys)
+                    if keys else ''))
+        return ([a[0] for a in columns],
+                [NUMBER if a[2] == 'N' else TEXT for a in columns], rows)
+
+    def close(self):
+        self.con.close()
+
+class OgrSource(object):
+    "shapefiles and dbf tables of a folder, read with ogr"
+
+    def __init__(self, folder):
+        try:
+            from osgeo import ogr
+        except ImportError:
+            raise SwmmSourceError('gdal python bindings are needed to read '
+                    'shapefiles')
+        self.ogr = ogr
+        self.files = {}
+        for filename in sorted(os.listdir(folder)):
+            name, ext = os.path.splitext(filename)
+            # a shapefile comes with a .dbf of the same name
+            if ext.lower() == '.shp' or (ext.lower() == '.dbf'
+                    and not name.lower() in self.files):
+                self.files[name.lower()] = os.path.join(folder, filename)
+
+    def table(self, name):
+        "see GeopackageSource.table"
+        filename = self.files.get(name.lower())
+        if filename is None:
+            return None
+        ogr = self.ogr
+        dataset = ogr.Open(filename)
+        if dataset is None:
+            raise SwmmSourceError('Could not open '+filename)
+        layer = dataset.GetLayer(0)
+        definition = layer.GetLayerDefn()
+        fields = [definition.GetFieldDefn(i)
+                for i in range(definition.GetFieldCount())]
+        kinds = [NUMBER if field.GetType() in (ogr.OFTInteger, ogr.OFTReal,
+            getattr(ogr, 'OFTInteger64', ogr.OFTInteger)) else TEXT
+            for field in fields]
+
+        def rows():
+            # the dataset must outlive the iteration over its layer
+            d = dataset
+            for feature in layer:
+                row = []
+                for i, kind in enumerate(kinds):
+                    if not feature.IsFieldSet(i):
+                        row.append(None)
+                    elif kind == NUMBER:
+                        row.append(feature.GetField(i))
+                    else:
+                        row.append(feature.GetFieldAsString(i)
+                                .decode('utf-8', 'replace'))
+                yield row
+
+        return [field.GetName().decode('utf-8') for field in fields], kinds, \
+                rows()
+
+    def close(self):
+        pass
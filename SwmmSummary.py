@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmSummary.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import datetime
+from collections import OrderedDict
+
+from SwmmReport import NODE, LINK
+
+# statistics computed for each element, in the order of the values
+# returned by SwmmSummary.nodes and SwmmSummary.links, times are
+# 'YYYY-MM-DD HH:MM:SS' strings, volumes are in flow units x seconds.
+# There is no surcharge statistic for nodes: surcharge is the head above
+# the crown of the highest conduit of a node, which is neither in the
+# records nor in the output file. HoursFlooded for nodes, and HoursFull
+# for conduits (flowing full), stand for it.
+NODE_STATISTICS = ['MaxDepth', 'TimeMaxDepth', 'MeanDepth', 'MaxHead',
+        'MaxInflow', 'TimeMaxInflow', 'FloodVolume', 'HoursFlooded']
+LINK_STATISTICS = ['MaxFlow', 'TimeMaxFlow', 'MeanFlow', 'MaxVelocity',
+        'MaxDepth', 'MaxPercentFull', 'TimeMaxPercentFull', 'HoursFull']
+
+# statistics that are times of peak, the others are numbers
+TIME_STATISTICS = ['TimeMaxDepth', 'TimeMaxInflow', 'TimeMaxPercentFull']
+
+def parseTime(time):
+    return datetime.datetime.strptime(time, '%Y-%m-%d %H:%M:%S')
+
+class SwmmSummary(object):
+    """Per element statistics of result records, computed in one pass
+
+    Records (as yielded by SwmmReport.readReport) are added one at a
+    time and only a few running values are kept per element, memory does
+    not depend on the number of time steps, and records may come element
+    by element or time step by time step. Durations and volumes assume
+    the constant reporting step of swmm, it is taken from the first two
+    times found in the records or, when they hold a single time (e.g. a
+    one step time window), is report_step (in seconds) if given.
+    Unknown percent full values (None) are ignored.
+    """
+
+    def __init__(self, report_step=None):
+        self.node_stats = OrderedDict()
+        self.link_stats = OrderedDict()
+        self.step = None # seconds
+        self.report_step = report_step
+        self._first_time = None
+
+    def add(self, kind, element_id, time, values):
+        if self.step is None:
+            if self._first_time is None:
+                self._first_time = time
+            elif time != self._first_time:
+                self.step = abs(parseTime(time)
+                        - parseTime(self._first_time)).total_seconds()
+
+        if kind == NODE:
+            inflow, flooding, depth, head = values
+            s = self.node_stats.get(element_id)
+            if s is None:
+                # count, max depth, time, sum of depths, max head,
+                # max inflow, time, sum of flooding, count flooded
+                s = [0, depth, time, 0., head, inflow, time, 0., 0]
+                self.node_stats[element_id] = s
+            s[0] += 1
+            if depth > s[1]: s[1], s[2] = depth, time
+            s[3] += depth
+            if head > s[4]: s[4] = head
+            if inflow > s[5]: s[5], s[6] = inflow, time
+            if flooding > 0:
+                s[7] += flooding
+                s[8] += 1
+        else:
+            flow, velocity, depth, percent_full = values
+            s = self.link_stats.get(element_id)
+            if s is None:
+                # count, max |flow|, time, sum of flows, max |velocity|,
+                # max depth, max percent full, time, count full
+                s = [0, abs(flow), time, 0., abs(velocity), depth,
+                        percent_full,
+                        time if percent_full is not None else None, 0]
+                self.link_stats[element_id] = s
+            s[0] += 1
+            if abs(flow) > s[1]: s[1], s[2] = abs(flow), time
+            s[3] += flow
+            if abs(velocity) > s[4]: s[4] = abs(velocity)
+            if depth > s[5]: s[5] = depth
+            if percent_full is not None:
+                if s[6] is None or percent_full > s[6]:
+                    s[6], s[7] = percent_full, time
+                if percent_full >= 100: s[8] += 1
+
+    def nodes(self):
+        "iterate over (node id, values of NODE_STATISTICS)"
+        step = self.step or self.report_step or 0.
+        for node_id, s in self.node_stats.iteritems():
+            yield node_id, [s[1], s[2], s[3]/s[0], s[4], s[5], s[6],
+                    s[7]*step, s[8]*step/3600.]
+
+    def links(self):
+        "iterate over (link id, values of LINK_STATISTICS)"
+        step = self.step or self.report_step or 0.
+        for link_id, s in self.link_stats.iteritems():
+            yield link_id, [s[1], s[2], s[3]/s[0], s[4], s[5], s[6], s[7],
+                    s[8]*step/3600.]
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmSweep.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Variants of a model for parameter sweeps and calibration, described as
+# patches of columns of its tabular sections
+
+from collections import OrderedDict
+
+from SwmmInp import tableLines, formatNumber
+
+class SwmmSweepError(Exception):
+    pass
+
+def number(v):
+    "float of a cell, None if it is empty"
+    s = formatNumber(v)
+    if not s:
+        return None
+    try:
+        return float(s)
+    except ValueError:
+        raise SwmmSweepError("'"+s+"' is not a number")
+
+def multiply(v, x):
+    v = number(v)
+    return v if v is None else v*x
+
+def add(v, x):
+    v = number(v)
+    return v if v is None else v+x
+
+def assign(v, x):
+    return x
+
+# patch operations, by symbol, applied to a cell and the patch value
+OPERATIONS = OrderedDict([('*', multiply), ('+', add), ('=', assign)])
+
+def parseVariants(rows):
+    """Patches of the variants of a sweep, from the rows of a table
+
+    Rows are (variant, section, column, operation, value, elements),
+    operation is one of OPERATIONS ('=' if empty) and elements the comma
+    separated identifiers of the patched rows (all rows if empty). A
+    variant has as many patches as it has rows, a row without section
+    only declares a variant (without patch, it runs the base model).
+    Empty cells are None. Returns an OrderedDict of variant name to its
+    list of (section, column, operation, value, set of elements or None).
+    """
+    variants = OrderedDict()
+    for row in rows:
+        name, section, column, operation, value, elements = \
+                (list(row) + [None]*6)[:6]
+        if name is None or not unicode(name).strip():
+            raise SwmmSweepError('Variant without name')
+        patches = variants.setdefault(unicode(name).strip(), [])
+        if section is None or not unicode(section).strip():
+            continue
+        section = unicode(section).strip().upper()
+        if column is None:
+            raise SwmmSweepError("No column patched in "+section
+                    +" by variant '"+unicode(name)+"'")
+        operation = unicode(operation).strip() if operation is not None \
+                else u'='
+        if not operation in OPERATIONS:
+            raise SwmmSweepError("Unknown operation '"+operation
+                    +"', expected one of "+' '.join(OPERATIONS))
+        if operation != u'=':
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                raise SwmmSweepError("Variant '"+unicode(name)+"' has no "
+                        "number to apply with '"+operation+"'")
+        elements = set(e.strip() for e in unicode(elements).split(u',')
+                if e.strip()) if elements is not None else None
+        patches.append((section, unicode(column).strip(), operation, value,
+            elements or None))
+    return variants
+
+class SectionTable(object):
+    """Rows of a tabular section, held in memory to be patched
+
+    A patch (see parseVariants) changes a column of every row, or of the
+    rows whose first column is one of its elements. Patched rows are
+    copies, the rows of the table are left as they are.
+    """
+
+    def __init__(self, table_name, columns, kinds, rows):
+        self.table_name = table_name
+        self.columns = columns
+        self.kinds = kinds
+        self.rows = [list(row) for row in rows]
+        self.index = dict((c.upper(), i) for i, c in enumerate(columns))
+
+    def patchedRows(self, patches):
+        changes = []
+        for section, column, operation, value, elements in patches:
+            if section != self.table_name:
+                continue
+            i = self.index.get(column.upper())
+            if i is None:
+                raise SwmmSweepError('No column '+column+' in '
+                        +self.table_name)
+            changes.append((i, OPERATIONS[operation], value, elements))
+        for row in self.rows:
+            patched = None
+            for i, apply, value, elements in changes:
+                if elements is not None and not unicode(row[0]) in elements:
+                    continue
+                if patched is None:
+                    patched = list(row)
+                patched[i] = apply(patched[i], value)
+            yield patched or row
+
+    def lines(self, patches):
+        "lines of the section with patches applied"
+        return tableLines(self.table_name, self.columns, self.kinds,
+                self.patchedRows(patches))
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    SwmmSweepAlgorithm.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+import multiprocessing
+
+from processing.core.GeoAlgorithmExecutionException import \
+        GeoAlgorithmExecutionException
+from processing.core.parameters import ParameterTable
+from processing.core.parameters import ParameterNumber
+from processing.core.parameters import ParameterSelection
+from processing.tools import dataobjects
+
+from SwmmAlgorithm import SwmmAlgorithm, SwmmResultWriter
+from SwmmEnsembleAlgorithm import SwmmEnsembleAlgorithm
+from SwmmInp import openInp
+from SwmmSweep import SwmmSweepError, SectionTable, parseVariants
+
+class SwmmSweepAlgorithm(SwmmEnsembleAlgorithm):
+    """Runs variants of a model differing in a few columns of its sections
+
+    The model is exported once, the sections patched by the variants are
+    also read in memory (see SwmmSweep.SectionTable) and only these
+    sections are written again for each variant. Variants run like the
+    scenarios of an ensemble, tagged by their name in the Scenario field,
+    and the outputs hold summary statistics by default: one feature per
+    element and variant, to compare the peak flows at some outfalls for
+    instance.
+    """
+
+    VARIANTS = 'VARIANTS'
+
+    WORKDIR_PREFIX = 'swmm_sweep_'
+
+    def commandLineName(self):
+        return 'swmm:sweep'
+
+    def defineCharacteristics(self):
+        SwmmAlgorithm.defineCharacteristics(self)
+        self.name = 'Run a parameter sweep'
+
+        self.parameters.insert(1, ParameterTable(self.VARIANTS,
+            'Variants (name, section, column, operation *, + or =, value, element ids or all if empty)'))
+        self.parameters.insert(2, ParameterNumber(self.WORKERS,
+            'Number of simulations run in parallel', 1, None,
+            multiprocessing.cpu_count()))
+        for i, p in enumerate(self.parameters):
+            if p.name == self.OUTPUT_MODE:
+                self.parameters[i] = ParameterSelection(self.OUTPUT_MODE,
+                        'Output layers', self.OUTPUT_MODES,
+                        SwmmResultWriter.SUMMARY_FEATURES)
+
+    def variants(self):
+        layer = dataobjects.getObjectFromUri(
+                self.getParameterValue(self.VARIANTS))
+        rows = ([None if unicode(v) == 'NULL' else v
+            for v in feature.attributes()]
+            for feature in layer.getFeatures())
+        try:
+            variants = parseVariants(rows)
+        except SwmmSweepError, e:
+            raise GeoAlgorithmExecutionException(unicode(e))
+        if not variants:
+            raise GeoAlgorithmExecutionException('No variant to run')
+        return variants
+
+    def sectionTable(self, table_name):
+        "rows of a tabular section, read in memory to be patched"
+        if not table_name in self.INP_SECTIONS \
+                or table_name in self.KEYVAL_SECTIONS:
+            raise GeoAlgorithmExecutionException(table_name
+                    +' is not a tabular section, it cannot be patched')
+        uri = self.getParameterValue(table_name)
+        if not uri:
+            raise GeoAlgorithmExecutionException('No '+table_name
+                    +' layer to patch')
+        return SectionTable(table_name, *self.tableRows(table_name,
+            dataobjects.getObjectFromUri(uri)))
+
+    def writeRuns(self, workdir, swmm_cli, swmm_lib, progress):
+        """Writes the .inp file of each variant in its own directory
+
+        Returns the list of (variant, .inp, .rpt, .out) of the runs.
+        """
+        variants = self.variants()
+
+        progress.setText('exporting the base model')
+        os.mkdir(os.path.join(workdir, 'sections'))
+        rendered = self.renderSections(os.path.join(workdir, 'sections'))
+        tables = {}
+        for patches in variants.values():
+            for section, column, operation, value, elements in patches:
+                if not section in tables:
+                    tables[section] = self.sectionTable(section)
+
+        title = self.getParameterValue(self.TITLE)
+        hotstart = self.timeParameter(self.HOTSTART_TIME)
+        runs = []
+        for i, (variant, patches) in enumerate(variants.items()):
+            progress.setText("writing variant '"+variant+"'")
+            rundir = self.runDirectory(workdir, i, variant)
+            sections = dict(rendered)
+            for table_name in set(patch[0] for patch in patches):
+                start = time.time()
+                sections[table_name] = os.path.join(rundir, table_name+'.inp')
+                f = openInp(sections[table_name])
+                try:
+                    f.writelines(tables[table_name].lines(patches))
+                except SwmmSweepError, e:
+                    raise GeoAlgorithmExecutionException("Variant '"
+                            +variant+"': "+unicode(e))
+                finally:
+                    f.close()
+                self.profile.add('patch', table_name, time.time() - start,
+                        bytes=os.path.getsize(sections[table_name]))
+            filename = os.path.join(rundir, 'swmm.inp')
+            self.writeInp(filename, title, sections)
+            if hotstart:
+                self.useHotStart(filename, hotstart, swmm_cli, swmm_lib,
+                        progress)
+            runs.append((variant, filename, os.path.join(rundir, 'swmm.rpt'),
+                os.path.join(rundir, 'swmm.out')))
+        return runs
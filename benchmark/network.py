@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    network.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Synthetic networks and results for the benchmarks
+#
+# A network is a chain of junctions draining to one outfall, with one
+# conduit (and its cross section) per junction. Layers are in memory
+# stand-ins for qgis layers, features are built when they are iterated,
+# like a data provider would. Reports and binary output files hold values
+# for every node and link at each reporting step.
+
+import re
+import struct
+import datetime
+
+import numpy
+
+from qgis.core import QgsField, QgsFields, QgsFeature, QgsGeometry, QGis
+from PyQt4.QtCore import QVariant, QPyNullVariant
+
+START = datetime.datetime(2026, 1, 1)
+STEP = 300 # reporting step in seconds
+TITLE = 'Benchmark'
+MAGIC_NUMBER = 516114522
+
+class Provider(object):
+    def __init__(self, layer):
+        self.layer = layer
+    def fields(self):
+        return self.layer._fields
+    def pkAttributeIndexes(self):
+        return self.layer._pk
+    def name(self):
+        return 'memory'
+    def featureCount(self):
+        return self.layer.featureCount()
+
+class Layer(object):
+    """In memory layer, rows is a function returning the rows iterator
+
+    geometry, if given, gives the WKT of a row.
+    """
+
+    def __init__(self, name, fields, rows, count, geometry=None, pk=()):
+        self._name = name
+        self._fields = QgsFields()
+        for name, kind in fields:
+            self._fields.append(QgsField(name, kind))
+        self._rows = rows
+        self._count = count
+        self._geometry = geometry
+        self._pk = list(pk)
+
+    def name(self):
+        return self._name
+    def source(self):
+        return 'memory?'+self._name
+    def dataProvider(self):
+        return Provider(self)
+    def featureCount(self):
+        return self._count
+    def isModified(self):
+        return False
+    def crs(self):
+        return None
+    def geometryType(self):
+        if self._geometry is None:
+            return None
+        return QGis.Line if self._geometry(next(self._rows())) \
+                .startswith('LINESTRING') else QGis.Point
+
+    def getFeatures(self, request=None):
+        ids = None
+        if request is not None and getattr(request, 'expression', None):
+            # only the '"field" IN (...)' filters of the geometry index,
+            # rows are all read like a provider without index would
+            ids = set(v.replace("''", "'") for v in re.findall(
+                "'((?:[^']|'')*)'", request.expression))
+        for row in self._rows():
+            if ids is not None and not row[0] in ids:
+                continue
+            feature = QgsFeature(self._fields)
+            feature.setAttributes(row)
+            if self._geometry:
+                feature.setGeometry(QgsGeometry(self._geometry(row)))
+            yield feature
+
+def nodeId(i):
+    return 'J%d'%i
+
+def linkId(i):
+    return 'C%d'%i
+
+def layers(junctions, timeseries):
+    """Layers of a network, by section name
+
+    The network has junctions junctions, as many conduits and one
+    outfall, and a TIMESERIES table of timeseries rows.
+    """
+    outfall = 'OUT'
+    def junctionRows():
+        for i in xrange(junctions):
+            yield [nodeId(i), 100. - 0.001*i, 3., 0., 0., 0., i]
+    def outfallRows():
+        yield [outfall, 90., 'FREE', QPyNullVariant(), 'NO',
+                QPyNullVariant(), 0]
+    def conduitRows():
+        for i in xrange(junctions):
+            yield [linkId(i), nodeId(i),
+                    nodeId(i+1) if i+1 < junctions else outfall,
+                    100., 0.013, 0., 0., 0., 0., i]
+    def xsectionRows():
+        for i in xrange(junctions):
+            yield [linkId(i), 'CIRCULAR', 1., 0., 0., 0., 1, i]
+    def timeseriesRows():
+        for i in xrange(timeseries):
+            t = START + datetime.timedelta(seconds=60*i)
+            yield ['RAIN%d'%(i//1000), t.strftime('%m/%d/%Y'),
+                    t.strftime('%H:%M'), 0.1*(i%37), i]
+
+    number = QVariant.Double
+    text = QVariant.String
+    integer = QVariant.Int
+    options = [('SIMULATION_TITLE', text), ('FLOW_UNITS', text),
+            ('START_DATE', text), ('START_TIME', text),
+            ('REPORT_STEP', text), ('ROUTING_STEP', text)]
+    return {
+        'OPTIONS': Layer('options', options,
+            lambda: iter([[TITLE, 'CMS', '01/01/2026', '00:00:00',
+                '00:05:00', '00:00:30']]), 1),
+        'REPORT': Layer('report', [('SIMULATION_TITLE', text),
+            ('NODES', text), ('LINKS', text)],
+            lambda: iter([[TITLE, 'ALL', 'ALL']]), 1),
+        'JUNCTIONS': Layer('junctions', [('Name', text),
+            ('Elevation', number), ('MaxDepth', number),
+            ('InitDepth', number), ('SurDepth', number),
+            ('Aponded', number), ('fid', integer)],
+            junctionRows, junctions,
+            lambda row: 'POINT(%d 0)'%row[6], pk=[6]),
+        'OUTFALLS': Layer('outfalls', [('Name', text),
+            ('Elevation', number), ('Type', text), ('StageData', text),
+            ('Gated', text), ('RouteTo', text), ('fid', integer)],
+            outfallRows, 1, lambda row: 'POINT(%d 0)'%junctions, pk=[6]),
+        'CONDUITS': Layer('conduits', [('Name', text), ('FromNode', text),
+            ('ToNode', text), ('Length', number), ('Roughness', number),
+            ('InOffset', number), ('OutOffset', number),
+            ('InitFlow', number), ('MaxFlow', number), ('fid', integer)],
+            conduitRows, junctions,
+            lambda row: 'LINESTRING(%d 0, %d 0)'%(row[9], row[9]+1),
+            pk=[9]),
+        'XSECTIONS': Layer('xsections', [('Link', text), ('Shape', text),
+            ('Geom1', number), ('Geom2', number), ('Geom3', number),
+            ('Geom4', number), ('Barrels', integer), ('fid', integer)],
+            xsectionRows, junctions, pk=[7]),
+        'TIMESERIES': Layer('timeseries', [('Name', text), ('Date', text),
+            ('Time', text), ('Value', number), ('fid', integer)],
+            timeseriesRows, timeseries, pk=[4]),
+        }
+
+def values(kind, element, step):
+    "values of an element at a reporting step, made up but varying"
+    x = 0.001*((element*7 + step*13)%1000)
+    if kind == 'node':
+        return [x, 0., x, 100. + x]
+    return [x, 2*x, x, 100*x]
+
+def writeReport(filename, junctions, steps):
+    """Text report with the time series tables of every element
+
+    Only the <<< Node X >>> and <<< Link X >>> blocks are written, with
+    the layout of swmm 5.0 reports.
+    """
+    times = [START + datetime.timedelta(seconds=STEP*(k+1))
+            for k in range(steps)]
+    times = [t.strftime('%b-%d-%Y  %H:%M:%S').upper() for t in times]
+    f = open(filename, 'w')
+    try:
+        f.write('\n  EPA STORM WATER MANAGEMENT MODEL - VERSION 5.0\n\n')
+        for kind, name, head, count, ids in (
+                ('node', 'Node', 'Inflow  Flooding     Depth      Head',
+                    junctions+1, lambda i: nodeId(i) if i < junctions
+                    else 'OUT'),
+                ('link', 'Link', '  Flow  Velocity     Depth   Percent',
+                    junctions, linkId)):
+            for i in xrange(count):
+                f.write('  <<< %s %s >>>\n'%(name, ids(i)))
+                f.write('  '+'-'*52+'\n')
+                f.write('                          '+head+'\n')
+                f.write('  Date        Time           CMS       CMS'
+                        '         m         m\n')
+                f.write('  '+'-'*52+'\n')
+                for k, t in enumerate(times):
+                    f.write('  %s %9.3f %9.3f %9.3f %9.3f\n'%(
+                        (t,)+tuple(values(kind, i, k))))
+                f.write('\n')
+    finally:
+        f.close()
+
+def writeOutput(filename, junctions, steps):
+    "binary output file with the layout written by swmm 5.1"
+    node_ids = [nodeId(i) for i in range(junctions)]+['OUT']
+    link_ids = [linkId(i) for i in range(junctions)]
+    nnodes = len(node_ids)
+    nlinks = len(link_ids)
+    f = open(filename, 'wb')
+    try:
+        f.write(struct.pack('<7i', MAGIC_NUMBER, 51000, 3, 0, nnodes,
+            nlinks, 0))
+        id_pos = f.tell()
+        for element_id in node_ids+link_ids:
+            f.write(struct.pack('<i', len(element_id))+element_id)
+        input_pos = f.tell()
+        f.write(struct.pack('<2i', 1, 1))
+        f.write(struct.pack('<4i', 3, 0, 2, 3))
+        nodes = numpy.zeros(nnodes, [('type', '<i4'), ('invert', '<f4'),
+            ('max_depth', '<f4')])
+        nodes['max_depth'] = 3.
+        nodes.tofile(f)
+        f.write(struct.pack('<6i', 5, 0, 3, 3, 3, 4))
+        links = numpy.zeros(nlinks, [('type', '<i4'), ('offset1', '<f4'),
+            ('offset2', '<f4'), ('max_depth', '<f4'), ('length', '<f4')])
+        links['max_depth'] = 1.
+        links['length'] = 100.
+        links.tofile(f)
+        for nvar in (8, 6, 5, 15):
+            f.write(struct.pack('<%di'%(nvar+1), nvar, *range(nvar)))
+        start = (START - datetime.datetime(1899, 12, 30)).total_seconds()
+        f.write(struct.pack('<di', start/86400., STEP))
+        output_pos = f.tell()
+
+        node_base = numpy.arange(nnodes)
+        link_base = numpy.arange(nlinks)
+        for k in range(steps):
+            f.write(struct.pack('<d', (start + STEP*(k+1))/86400.))
+            x = 0.001*((node_base*7 + k*13)%1000)
+            # depth, head, volume, lateral inflow, inflow, flooding
+            numpy.column_stack([x, 100.+x, x, x, x,
+                numpy.zeros(nnodes)]).astype('<f4').tofile(f)
+            x = 0.001*((link_base*7 + k*13)%1000)
+            # flow, depth, velocity, volume, capacity
+            numpy.column_stack([x, x, 2*x, x, x]).astype('<f4').tofile(f)
+            numpy.zeros(15, '<f4').tofile(f)
+        f.write(struct.pack('<6i', id_pos, input_pos, output_pos, steps, 0,
+            MAGIC_NUMBER))
+    finally:
+        f.close()
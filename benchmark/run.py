@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    run.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Benchmarks of the export, simulation driver and result processing phases
+#
+# Runs headless, qgis and processing are replaced by the stand-ins of the
+# stubs directory. Each phase runs in its own python process, on a
+# synthetic network (see network.py), so that its peak memory can be
+# measured. Results are saved as JSON and can be compared with a previous
+# run:
+#
+#   python benchmark/run.py --sizes 10000,100000 --output new.json \
+#           --compare old.json
+
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import tempfile
+import subprocess
+from collections import OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'stubs'))
+sys.path.insert(0, os.path.dirname(HERE))
+
+try:
+    import resource
+except ImportError:
+    resource = None # windows, memory is not measured
+
+import network
+
+# a phase is slower than in the compared results above this ratio
+REGRESSION_RATIO = 1.2
+
+# number of scenarios looked up in the keyval phase, at most
+MAX_TITLES = 1000
+
+def peakMemory():
+    "peak resident memory of the process in kB (bytes on macOS)"
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+class Progress(object):
+    def setPercentage(self, percent):
+        pass
+    def setText(self, text):
+        pass
+
+class Context(object):
+    "files and algorithm of a network, built before a phase is timed"
+
+    def __init__(self, args, size):
+        self.size = size
+        self.steps = args.steps
+        self.timeseries = args.timeseries or size
+        self.folder = os.path.join(args.workdir, 'network_%d'%size)
+        self.rptfilename = os.path.join(self.folder, 'swmm.rpt')
+        self.outfilename = os.path.join(self.folder, 'swmm.out')
+
+    def generate(self):
+        if not os.path.isdir(self.folder):
+            os.makedirs(self.folder)
+        network.writeReport(self.rptfilename, self.size, self.steps)
+        network.writeOutput(self.outfilename, self.size, self.steps)
+
+    def algorithm(self, layers=None):
+        from processing.core.ProcessingConfig import ProcessingConfig
+        from processing.tools import dataobjects
+        from SwmmAlgorithm import SwmmAlgorithm
+        ProcessingConfig.setSettingValue('OUTPUT_FOLDER', self.folder)
+        ProcessingConfig.setSettingValue('Swmm_CACHE_SIZE', 0)
+        alg = SwmmAlgorithm()
+        layers = layers or network.layers(self.size, self.timeseries)
+        for name, layer in layers.items():
+            dataobjects.objects[name] = layer
+            alg.setParameterValue(name, name)
+        return alg
+
+# phases return the number of items they processed, setup(context)
+# builds what is not timed
+
+def exportSetup(context):
+    return context.algorithm()
+
+def export(context, alg):
+    alg.writeInp(os.path.join(context.folder, 'swmm.inp'), network.TITLE)
+    return 3*context.size + context.timeseries
+
+def keyvalSetup(context):
+    from PyQt4.QtCore import QVariant
+    titles = ['Scenario %d'%i
+            for i in range(min(MAX_TITLES, max(1, context.size//100)))]
+    layers = network.layers(context.size, context.timeseries)
+    layers['OPTIONS'] = network.Layer('options',
+            [('SIMULATION_TITLE', QVariant.String),
+             ('FLOW_UNITS', QVariant.String)],
+            lambda: ([title, 'CMS'] for title in titles), len(titles))
+    return context.algorithm(layers), titles
+
+def keyval(context, setup):
+    alg, titles = setup
+    for title in titles:
+        for line in alg.swmmKeyVal('OPTIONS', title):
+            pass
+    return len(titles)
+
+def report(context, setup):
+    from SwmmReport import readReport
+    count = 0
+    for record in readReport(context.rptfilename):
+        count += 1
+    return count
+
+def reportIndex(context, setup):
+    from SwmmReport import readReport, indexFilename
+    if os.path.exists(indexFilename(context.rptfilename)):
+        os.remove(indexFilename(context.rptfilename))
+    elements = set(network.nodeId(i)
+            for i in range(0, context.size, max(1, context.size//100)))
+    count = 0
+    for record in readReport(context.rptfilename, None, elements):
+        count += 1
+    return count
+
+def outputSetup(context):
+    return context.algorithm()
+
+def output(context, alg):
+    from SwmmOutput import SwmmOutput
+    count = 0
+    for record in alg.outputRecords(SwmmOutput(context.outfilename),
+            Progress()):
+        count += 1
+    return count
+
+def writer(mode):
+    def write(context, alg):
+        from SwmmAlgorithm import SwmmResultWriter
+        from SwmmOutput import SwmmOutput
+        records = alg.outputRecords(SwmmOutput(context.outfilename),
+                Progress())
+        SwmmResultWriter(alg, mode=mode).write(records)
+        return sum(alg.getOutputFromName(name).count for name in (
+            alg.NODE_OUTPUT, alg.LINK_OUTPUT, alg.NODE_TABLE_OUTPUT,
+            alg.LINK_TABLE_OUTPUT))
+    return write
+
+# prints the console output of swmm, with one progress update per step
+CONSOLE = r'''
+import sys
+steps = int(sys.argv[1])
+sys.stdout.write('\n o  Retrieving project data')
+for k in range(steps):
+    sys.stdout.write('\r... Running [%s] %.1f%% [ 0.00s]'
+            % ('=' * (50 * k // steps), 100. * k / steps))
+sys.stdout.write('\n\n... EPA-SWMM completed in 0.00s successfully.\n')
+'''
+
+def runner(context, setup):
+    from SwmmRunner import runProcess
+    steps = context.size
+    runProcess([sys.executable, '-c', CONSOLE, str(steps)],
+            os.path.join(context.folder, 'swmm.log'),
+            Progress().setPercentage)
+    return steps
+
+PHASES = OrderedDict([
+    ('export', (exportSetup, export)),
+    ('keyval', (keyvalSetup, keyval)),
+    ('report', (None, report)),
+    ('report_index', (None, reportIndex)),
+    ('output', (outputSetup, output)),
+    ('write_time_steps', (outputSetup, writer(0))),
+    ('write_elements', (outputSetup, writer(1))),
+    ('write_summary', (outputSetup, writer(2))),
+    ('runner', (None, runner)),
+    ])
+
+def runPhase(args):
+    "runs one phase in this process and prints its measures"
+    context = Context(args, args.size)
+    setup, phase = PHASES[args.phase]
+    setup = setup(context) if setup else None
+    baseline = peakMemory()
+    start = time.time()
+    items = phase(context, setup)
+    seconds = time.time() - start
+    print json.dumps({'phase': args.phase, 'size': args.size,
+        'items': items, 'seconds': seconds,
+        'items_per_second': items/seconds if seconds else None,
+        'baseline_rss_kb': baseline, 'peak_rss_kb': peakMemory()})
+
+def revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                cwd=HERE, stderr=open(os.devnull, 'w')).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, filename):
+    "prints the time ratios with previous results, True if none regressed"
+    f = open(filename)
+    try:
+        previous = dict(((r['phase'], r['size']), r)
+                for r in json.load(f)['results'])
+    finally:
+        f.close()
+    ok = True
+    for r in results:
+        p = previous.get((r['phase'], r['size']))
+        if not p or not p['seconds']:
+            continue
+        ratio = r['seconds']/p['seconds']
+        regressed = ratio > REGRESSION_RATIO
+        ok = ok and not regressed
+        print '%-18s %9d  x%.2f%s'%(r['phase'], r['size'], ratio,
+                '  REGRESSION' if regressed else '')
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description='swmm plugin benchmarks')
+    parser.add_argument('--sizes', default='10000,100000,1000000',
+            help='comma separated numbers of junctions (and conduits)')
+    parser.add_argument('--steps', type=int, default=12,
+            help='number of reporting steps of the results')
+    parser.add_argument('--timeseries', type=int, default=0,
+            help='number of TIMESERIES rows (the network size if 0)')
+    parser.add_argument('--phases', default=','.join(PHASES.keys()),
+            help='comma separated phases to run')
+    parser.add_argument('--workdir', default=None,
+            help='folder of the generated files (temporary if not given)')
+    parser.add_argument('--output', default='benchmark.json',
+            help='JSON file of the results')
+    parser.add_argument('--compare', default=None,
+            help='JSON file of previous results to compare with')
+    parser.add_argument('--phase', help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        runPhase(args)
+        return 0
+
+    args.workdir = args.workdir or tempfile.mkdtemp(prefix='swmm_benchmark_')
+    results = []
+    for size in [int(s) for s in args.sizes.split(',')]:
+        Context(args, size).generate()
+        for phase in args.phases.split(','):
+            command = [sys.executable, os.path.abspath(__file__),
+                    '--phase', phase, '--size', str(size),
+                    '--steps', str(args.steps),
+                    '--timeseries', str(args.timeseries),
+                    '--workdir', args.workdir]
+            result = json.loads(subprocess.check_output(command)
+                    .strip().splitlines()[-1])
+            results.append(result)
+            print '%-18s %9d %10.2fs %12.0f/s %10s kB'%(phase, size,
+                    result['seconds'], result['items_per_second'] or 0,
+                    result['peak_rss_kb'])
+
+    f = open(args.output, 'w')
+    try:
+        json.dump({'date': datetime.datetime.now().isoformat(),
+            'python': sys.version.split()[0], 'revision': revision(),
+            'steps': args.steps, 'timeseries': args.timeseries,
+            'results': results}, f, indent=2)
+    finally:
+        f.close()
+    if args.compare and not compare(results, args.compare):
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+# minimal stand-in for the PyQt4 module used by the plugin, benchmarks only
+
+class QVariant(object):
+    Invalid = 0
+    Bool = 1
+    Int = 2
+    UInt = 3
+    LongLong = 4
+    ULongLong = 5
+    Double = 6
+    String = 10
+    Date = 14
+    Time = 15
+    DateTime = 16
+
+class QPyNullVariant(object):
+    def __init__(self, t=None):
+        pass
+    def __str__(self):
+        return 'NULL'
+    def __unicode__(self):
+        return u'NULL'
+    def __eq__(self, other):
+        return isinstance(other, QPyNullVariant)
+    def __ne__(self, other):
+        return not self == other
+    def __nonzero__(self):
+        return False
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+# minimal stand-in for the PyQt4 module used by the plugin, benchmarks only
+
+class QIcon(object):
+    def __init__(self, *args):
+        pass
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+class AlgorithmProvider(object):
+    def __init__(self):
+        self.algs = []
+    def initializeSettings(self):
+        pass
+    def unload(self):
+        pass
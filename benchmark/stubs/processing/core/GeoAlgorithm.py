@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+# minimal stand-in for the processing framework, benchmarks only
+
+class GeoAlgorithm(object):
+    def __init__(self):
+        self.parameters = []
+        self.outputs = []
+        self.values = {}
+        self.defineCharacteristics()
+    def addParameter(self, parameter):
+        self.parameters.append(parameter)
+    def addOutput(self, output):
+        self.outputs.append(output)
+    def getParameterValue(self, name):
+        if name in self.values:
+            return self.values[name]
+        for parameter in self.parameters:
+            if parameter.name == name:
+                return parameter.default
+    def setParameterValue(self, name, value):
+        self.values[name] = value
+        return True
+    def getOutputFromName(self, name):
+        for output in self.outputs:
+            if output.name == name:
+                return output
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+class Setting(object):
+    def __init__(self, group, name, description, default, *args, **kwargs):
+        self.group = group
+        self.name = name
+        self.description = description
+        self.value = default
+
+class ProcessingConfig(object):
+    OUTPUT_FOLDER = 'OUTPUT_FOLDER'
+    settings = {}
+    @staticmethod
+    def addSetting(setting):
+        ProcessingConfig.settings[setting.name] = setting
+    @staticmethod
+    def removeSetting(name):
+        ProcessingConfig.settings.pop(name, None)
+    @staticmethod
+    def getSetting(name):
+        setting = ProcessingConfig.settings.get(name)
+        return setting.value if setting else None
+    @staticmethod
+    def setSettingValue(name, value):
+        ProcessingConfig.settings[name] = Setting('', name, '', value)
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+class ProcessingLog(object):
+    LOG_INFO = 'INFO'
+    LOG_ERROR = 'ERROR'
+    LOG_WARNING = 'WARNING'
+    @staticmethod
+    def addToLog(level, message):
+        pass
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+class CountingWriter(object):
+    "counts what is written, nothing is kept"
+    def __init__(self, output):
+        self.output = output
+    def addFeature(self, feature):
+        self.output.count += 1
+    def addFeatures(self, features):
+        self.output.count += len(features)
+    def addRecord(self, record):
+        self.output.count += 1
+
+class Output(object):
+    def __init__(self, name='', description=''):
+        self.name = name
+        self.description = description
+        self.value = None
+        self.count = 0
+    def getVectorWriter(self, fields, geomType, crs, options=None):
+        return CountingWriter(self)
+    def getTableWriter(self, fields):
+        return CountingWriter(self)
+
+class OutputVector(Output):
+    pass
+
+class OutputTable(Output):
+    pass
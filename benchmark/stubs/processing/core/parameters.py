@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+class Parameter(object):
+    def __init__(self, name='', description='', default=None, optional=False):
+        self.name = name
+        self.description = description
+        self.default = default
+        self.optional = optional
+
+class ParameterVector(Parameter):
+    VECTOR_TYPE_POINT = 0
+    VECTOR_TYPE_LINE = 1
+    VECTOR_TYPE_POLYGON = 2
+    VECTOR_TYPE_ANY = -1
+    def __init__(self, name='', description='', shapetype=None, optional=False):
+        Parameter.__init__(self, name, description, None, optional)
+
+class ParameterTable(Parameter):
+    def __init__(self, name='', description='', optional=False):
+        Parameter.__init__(self, name, description, None, optional)
+
+class ParameterString(Parameter):
+    def __init__(self, name='', description='', default='', multiline=False,
+            optional=False):
+        Parameter.__init__(self, name, description, default, optional)
+
+class ParameterNumber(Parameter):
+    def __init__(self, name='', description='', minValue=None, maxValue=None,
+            default=None, optional=False):
+        Parameter.__init__(self, name, description, default, optional)
+
+class ParameterFile(Parameter):
+    def __init__(self, name='', description='', isFolder=False, optional=True,
+            ext=None):
+        Parameter.__init__(self, name, description, None, optional)
+
+class ParameterBoolean(Parameter):
+    def __init__(self, name='', description='', default=False, optional=False):
+        Parameter.__init__(self, name, description, default, optional)
+
+class ParameterSelection(Parameter):
+    def __init__(self, name='', description='', options=[], default=0,
+            isSource=False, optional=False):
+        Parameter.__init__(self, name, description, default, optional)
+        self.options = options
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+# layers by uri, filled by the benchmark
+objects = {}
+
+def getObjectFromUri(uri):
+    return objects[uri]
+
+def getVectorLayers(*args):
+    return list(objects.values())
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+import tempfile
+
+def userFolder():
+    return tempfile.gettempdir()
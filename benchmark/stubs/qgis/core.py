@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+# minimal stand-in for the qgis module used by the plugin, benchmarks only
+
+from PyQt4.QtCore import QVariant, QPyNullVariant
+
+class QGis(object):
+    WKBPoint = 1
+    WKBLineString = 2
+    WKBPolygon = 3
+    Point = 0
+    Line = 1
+    Polygon = 2
+
+class QgsField(object):
+    def __init__(self, name, type=QVariant.String, typeName=''):
+        self._name = name
+        self._type = type
+    def name(self):
+        return self._name
+    def type(self):
+        return self._type
+
+class QgsFields(list):
+    def toList(self):
+        return list(self)
+    def count(self):
+        return len(self)
+    def indexFromName(self, name):
+        for i, field in enumerate(self):
+            if field.name() == name:
+                return i
+        return -1
+
+class QgsGeometry(object):
+    def __init__(self, wkt=''):
+        self._wkt = wkt
+    @staticmethod
+    def fromWkt(wkt):
+        return QgsGeometry(wkt)
+    def exportToWkt(self):
+        return self._wkt
+    def asWkb(self):
+        # the WKT stands for the WKB
+        return self._wkt
+    def fromWkb(self, wkb):
+        self._wkt = wkb
+
+class QgsFeature(object):
+    def __init__(self, fields=None):
+        self._fields = fields if fields is not None else QgsFields()
+        self._attributes = []
+        self._geometry = None
+    def __getitem__(self, key):
+        if not isinstance(key, int):
+            key = self._fields.indexFromName(key)
+        return self._attributes[key]
+    def attributes(self):
+        return self._attributes
+    def setAttributes(self, attributes):
+        self._attributes = list(attributes)
+    def geometry(self):
+        return self._geometry
+    def setGeometry(self, geometry):
+        self._geometry = geometry
+    def fields(self):
+        return self._fields
+
+class QgsFeatureRequest(object):
+    NoGeometry = 1
+    SubsetOfAttributes = 2
+    def __init__(self):
+        self.flags = 0
+        self.expression = None
+        self.attributes = None
+    def setFlags(self, flags):
+        self.flags = flags
+        return self
+    def setFilterExpression(self, expression):
+        self.expression = expression
+        return self
+    def setSubsetOfAttributes(self, attributes):
+        self.attributes = attributes
+        return self
+
+class QgsDataSourceURI(object):
+    def __init__(self, uri=''):
+        self.uri = uri
+
+class QgsCoordinateReferenceSystem(object):
+    def __init__(self, *args):
+        pass
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_cache.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import shutil
+import hashlib
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from SwmmCache import SwmmCache, fileDigest, linkOrCopy
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = SwmmCache(os.path.join(self.folder, 'cache'), 100)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def source(self, name, size):
+        path = os.path.join(self.folder, name)
+        f = open(path, 'wb')
+        f.write(b'x'*size)
+        f.close()
+        return path
+
+    def entries(self):
+        return sorted(os.listdir(self.cache.folder))
+
+    def put(self, key, size, mtime):
+        "stores an entry of size bytes last used at mtime"
+        path = self.cache.put(key, {'data': self.source(key, size)})
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_key(self):
+        key = SwmmCache.key('result', u'é', 3)
+        self.assertEqual(key, SwmmCache.key('result', u'é'.encode('utf-8'),
+            '3'))
+        self.assertEqual(len(key), 40)
+        self.assertNotEqual(key, SwmmCache.key(u'é', 'result', 3))
+        # parts are separated
+        self.assertNotEqual(SwmmCache.key('ab', 'c'), SwmmCache.key('a', 'bc'))
+        # stable across versions, entries of previous runs are reused
+        self.assertEqual(SwmmCache.key('a', 'b'),
+                hashlib.sha1(b'a\0b\0').hexdigest())
+
+    def test_put(self):
+        self.assertEqual(self.cache.get('a'), None)
+        path = self.cache.put('a', {'swmm.rpt': self.source('rpt', 3),
+            'swmm.out': self.source('out', 4)})
+        self.assertEqual(path, self.cache.path('a'))
+        self.assertEqual(self.cache.get('a'), path)
+        self.assertEqual(sorted(os.listdir(path)), ['swmm.out', 'swmm.rpt'])
+        self.assertEqual(fileDigest(os.path.join(path, 'swmm.rpt')),
+                fileDigest(os.path.join(self.folder, 'rpt')))
+        # the same key again keeps the first entry, no temporary is left
+        self.assertEqual(self.cache.put('a', {'other': self.source('x', 1)}),
+                path)
+        self.assertEqual(self.entries(), ['a'])
+        self.assertEqual(sorted(os.listdir(path)), ['swmm.out', 'swmm.rpt'])
+
+    def test_put_error(self):
+        self.assertRaises((IOError, OSError), self.cache.put, 'a',
+                {'data': os.path.join(self.folder, 'missing')})
+        self.assertEqual(self.entries(), [])
+
+    def test_lru(self):
+        self.put('a', 40, 1000)
+        self.put('b', 40, 3000)
+        self.put('c', 40, 2000)
+        # 120 bytes, the least recently used goes
+        self.assertEqual(self.entries(), ['b', 'c'])
+        self.cache.get('c') # now the most recently used
+        os.utime(self.cache.path('b'), (1500, 1500))
+        self.put('d', 40, 4000)
+        self.assertEqual(self.entries(), ['c', 'd'])
+        # an entry larger than the cache is still kept when stored
+        self.cache.put('e', {'data': self.source('e', 150)})
+        self.assertEqual(self.entries(), ['e'])
+        self.cache.evict()
+        self.assertEqual(self.entries(), [])
+
+    def test_temporary_skipped(self):
+        tmp = tempfile.mkdtemp(prefix='.tmp_', dir=self.cache.folder)
+        self.source('big', 500)
+        linkOrCopy(os.path.join(self.folder, 'big'),
+                os.path.join(tmp, 'data'))
+        self.put('a', 40, 1000)
+        self.assertEqual(self.entries(), [os.path.basename(tmp), 'a'])
+
+    def test_pinned(self):
+        self.put('a', 60, 1000)
+        self.assertEqual(self.cache.pin('a'), self.cache.path('a'))
+        os.utime(self.cache.path('a'), (1000, 1000))
+        self.put('b', 60, 2000)
+        # a is older but in use
+        self.assertEqual(self.entries(), ['a', 'b'])
+        self.cache.unpin('a')
+        self.cache.evict()
+        self.assertEqual(self.entries(), ['b'])
+        self.assertEqual(self.cache.pin('a'), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_engine.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# SwmmLibrary driven by a stand-in of the swmm5 shared library: the
+# toolkit functions are python callables taking the same ctypes
+# arguments, results are made up from the elapsed time.
+
+import os
+import sys
+import ctypes
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import SwmmEngine
+import SwmmCli
+from SwmmEngine import SwmmLibrary, SwmmEngineError, timeStep
+from SwmmReport import NODE, LINK
+from SwmmRunner import SwmmCanceled
+
+INP = u'''[TITLE]
+engine test
+
+[OPTIONS]
+START_DATE\t01/01/2026
+START_TIME\t00:00:00
+END_DATE\t01/01/2026
+END_TIME\t01:00:00
+REPORT_STEP\t0.25
+
+[CONDUITS]
+;Name\tFromNode\tToNode\tLength\tRoughness\t
+C1\t\tO1\t100\t0.013\t
+C2\tJ1\tO1\t200\t0.013\t
+
+[PUMPS]
+P1  J1  O1  *  ON
+
+[XSECTIONS]
+;Link\tShape\tGeom1\tGeom2\t
+C1\tCIRCULAR\t2\t0\t
+C2\t\t2\t1\t
+
+'''
+
+def value(argument):
+    "object given by reference to a toolkit function"
+    return argument._obj
+
+class Function(object):
+    "stand-in of a ctypes function, argtypes can be set"
+
+    def __init__(self, function):
+        self.function = function
+        self.argtypes = None
+
+    def __call__(self, *args):
+        return self.function(*args)
+
+class FakeLibrary(object):
+    """swmm5 library of a network with nodes J1, O1 and links C1, C2, P1
+
+    Routing steps are of routing_step seconds. At each step, node results
+    are 10*node index + result code + elapsed hours, link flow and depth
+    are 0.1 + elapsed hours, the volume of C2 is its flow times 100 and
+    the setting of P1 is 1.
+    """
+
+    NODES = ['J1', 'O1']
+    LINKS = ['C1', 'C2', 'P1']
+
+    def __init__(self, duration=3600, routing_step=300, open_error=0):
+        self.duration = duration
+        self.routing_step = routing_step
+        self.open_error = open_error
+        self.elapsed = 0
+        self.calls = []
+        for name in ('swmm_open', 'swmm_start', 'swmm_step', 'swmm_end',
+                'swmm_report', 'swmm_close', 'swmm_getError',
+                'swmm_countObjects', 'swmm_getObjectId',
+                'swmm_getNodeResult', 'swmm_getLinkResult',
+                'swmm_getSimulationDateTime'):
+            setattr(self, name, Function(getattr(self, '_'+name)))
+
+    def _swmm_open(self, inp, rpt, out):
+        self.calls.append('open')
+        self.outfilename = out.decode('utf-8')
+        return self.open_error
+
+    def _swmm_start(self, save):
+        self.calls.append('start')
+        return 0
+
+    def _swmm_step(self, elapsed):
+        self.elapsed += self.routing_step
+        if self.elapsed > self.duration:
+            value(elapsed).value = 0.
+        else:
+            value(elapsed).value = self.elapsed/86400.
+        return 0
+
+    def _swmm_end(self):
+        self.calls.append('end')
+        return 0
+
+    def _swmm_report(self):
+        self.calls.append('report')
+        return 0
+
+    def _swmm_close(self):
+        self.calls.append('close')
+        return 0
+
+    def _swmm_getError(self, message, size):
+        message.value = b'ERROR 200: one or more errors in input file'
+        return 0
+
+    def _swmm_countObjects(self, kind, count):
+        value(count).value = len(self.NODES if kind == SwmmEngine.SM_NODE
+                else self.LINKS)
+        return 0
+
+    def _swmm_getObjectId(self, kind, index, buf):
+        buf.value = (self.NODES if kind == SwmmEngine.SM_NODE
+                else self.LINKS)[index].encode('utf-8')
+        return 0
+
+    def _swmm_getSimulationDateTime(self, kind, *values):
+        seconds = self.duration if kind == SwmmEngine.SM_ENDDATE else 0
+        for v, x in zip(values, (2026, 1, 1, seconds//3600,
+                seconds//60%60, seconds%60)):
+            value(v).value = x
+        return 0
+
+    def hours(self):
+        return self.elapsed/3600.
+
+    def _swmm_getNodeResult(self, index, result, v):
+        value(v).value = 10*index + result + self.hours()
+        return 0
+
+    def _swmm_getLinkResult(self, index, result, v):
+        flow = 0.1 + self.hours()
+        if result == SwmmEngine.SM_LINKVOL:
+            value(v).value = 100*flow if self.LINKS[index] == 'C2' else 0.
+        elif result == SwmmEngine.SM_SETTING:
+            value(v).value = 1.
+        else:
+            value(v).value = flow
+        return 0
+
+class SwmmLibraryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, 'swmm.inp')
+        f = open(self.filename, 'w')
+        f.write(INP.encode('utf-8'))
+        f.close()
+        self.loader = ctypes.CDLL
+        self.fake = FakeLibrary()
+        ctypes.CDLL = lambda path: self.fake
+
+    def tearDown(self):
+        ctypes.CDLL = self.loader
+        shutil.rmtree(self.folder)
+
+    def run_library(self, *args, **kwargs):
+        return list(SwmmLibrary('libswmm5.so').run(self.filename,
+            os.path.join(self.folder, 'swmm.rpt'),
+            os.path.join(self.folder, 'swmm.out'), *args, **kwargs))
+
+    def test_records(self):
+        records = self.run_library()
+        times = sorted(set(r[2] for r in records))
+        self.assertEqual(times, ['2026-01-01 00:15:00', '2026-01-01 00:30:00',
+            '2026-01-01 00:45:00', '2026-01-01 01:00:00'])
+        self.assertEqual(len(records), 4*5)
+        results = dict(((kind, element_id, time), values)
+                for kind, element_id, time, values in records)
+
+        # inflow, flooding, depth and head
+        self.assertEqual(results[NODE, 'O1', '2026-01-01 00:30:00'],
+                [10.5, 14.5, 15.5, 16.5])
+        # C1 has no volume, C2 a volume of 100 times its flow, empty
+        # cells of their rows do not shift the length and full depth
+        flow = 0.1 + 0.5
+        c1 = results[LINK, 'C1', '2026-01-01 00:30:00']
+        c2 = results[LINK, 'C2', '2026-01-01 00:30:00']
+        pump = results[LINK, 'P1', '2026-01-01 00:30:00']
+        self.assertAlmostEqual(c1[0], flow)
+        self.assertEqual(c1[1], 0.)
+        self.assertAlmostEqual(c1[3], 100*flow/2)
+        self.assertAlmostEqual(c2[1], 2.)
+        self.assertAlmostEqual(c2[3], 100*flow/2)
+        self.assertEqual(pump[1], 0.)
+        self.assertEqual(pump[3], 100.)
+        self.assertEqual(self.fake.calls,
+                ['open', 'start', 'end', 'report', 'close'])
+
+    def test_filters(self):
+        records = self.run_library(set(['J1', 'C2']), '2026-01-01 00:30:00',
+                '2026-01-01 00:45:00')
+        self.assertEqual(sorted(set((r[1], r[2]) for r in records)),
+                [('C2', '2026-01-01 00:30:00'), ('C2', '2026-01-01 00:45:00'),
+                 ('J1', '2026-01-01 00:30:00'), ('J1', '2026-01-01 00:45:00')])
+
+    def test_end_filter(self):
+        # the end only filters results, the run and its report go on
+        percents = []
+        records = self.run_library(end='2026-01-01 00:30:00',
+                percent=percents.append)
+        self.assertEqual(sorted(set(r[2] for r in records)),
+                ['2026-01-01 00:15:00', '2026-01-01 00:30:00'])
+        self.assertEqual(self.fake.elapsed, 3600 + 300)
+        self.assertEqual(percents[-1], 100)
+        self.assertEqual(self.fake.calls,
+                ['open', 'start', 'end', 'report', 'close'])
+
+    def test_cli_output(self):
+        # the report reads its tables back from a real binary output,
+        # which is removed after the run
+        records = list(SwmmCli.runInProcess('libswmm5.so', self.filename,
+            os.path.join(self.folder, 'swmm.rpt'), quiet=True))
+        self.assertEqual(len(records), 4*5)
+        self.assertEqual(os.path.dirname(self.fake.outfilename), self.folder)
+        self.assertTrue(self.fake.outfilename.endswith('.out'))
+        self.assertEqual(os.listdir(self.folder), ['swmm.inp'])
+
+    def test_percent(self):
+        percents = []
+        self.run_library(percent=percents.append)
+        self.assertEqual(percents[0], 8)
+        self.assertEqual(percents[-1], 100)
+        self.assertEqual(percents, sorted(set(percents)))
+
+    def test_zero_duration(self):
+        self.fake.duration = 0
+        percents = []
+        self.assertEqual(self.run_library(percent=percents.append), [])
+        self.assertEqual(percents, [100])
+
+    def test_error(self):
+        self.fake.open_error = 200
+        with self.assertRaises(SwmmEngineError) as raised:
+            self.run_library()
+        self.assertTrue('one or more errors' in unicode(raised.exception))
+        self.assertEqual(self.fake.calls, ['open'])
+
+    def test_cancel(self):
+        with self.assertRaises(SwmmCanceled):
+            self.run_library(canceled=lambda: self.fake.elapsed > 1000)
+        self.assertEqual(self.fake.calls, ['open', 'start', 'end', 'close'])
+
+    def test_missing_function(self):
+        del self.fake.swmm_getLinkResult
+        self.assertRaises(SwmmEngineError, SwmmLibrary, 'libswmm5.so')
+
+class TimeStepTestCase(unittest.TestCase):
+
+    def test_formats(self):
+        self.assertEqual(timeStep(u'00:15:00'), 900)
+        self.assertEqual(timeStep(u'0:15'), 900)
+        self.assertEqual(timeStep(u'1:00:30'), 3630)
+        self.assertEqual(timeStep(u'0.25'), 900)
+        self.assertEqual(timeStep(u'1'), 3600)
+        self.assertEqual(timeStep(u'0.001'), 4)
+
+    def test_invalid(self):
+        for step in (u'', u'abc', u'1:2:3:4', u'0', u'00:00:00'):
+            self.assertRaises(SwmmEngineError, timeStep, step)
+
+if __name__ == '__main__':
+    unittest.main()
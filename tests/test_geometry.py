@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_geometry.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Geometry stores kept in the cache, qgis is replaced by the stand-ins of
+# the benchmarks.
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmark'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmark', 'stubs'))
+sys.path.insert(0, ROOT)
+
+from PyQt4.QtCore import QVariant
+import network
+from SwmmCache import SwmmCache
+from SwmmGeometry import GeometryIndex, GeometryJoin
+
+class FileProvider(network.Provider):
+    def name(self):
+        return 'ogr'
+
+class FileLayer(network.Layer):
+    "junctions of a benchmark network, with the signature of a file"
+
+    def __init__(self, filename, junctions):
+        network.Layer.__init__(self, 'junctions',
+                [('Name', QVariant.String)],
+                lambda: ([network.nodeId(i)] for i in xrange(junctions)),
+                junctions, lambda row: 'POINT(%s 0)'%row[0][1:])
+        self.filename = filename
+        self.reads = 0
+
+    def source(self):
+        return self.filename
+
+    def dataProvider(self):
+        return FileProvider(self)
+
+    def getFeatures(self, request=None):
+        self.reads += 1
+        return network.Layer.getFeatures(self, request)
+
+class Writer(object):
+    "BatchWriter stand-in keeping the features"
+
+    def __init__(self):
+        self.size = 2
+        self.count = 0
+        self.features = []
+
+    def add(self, feature):
+        self.features.append(feature)
+        self.count += 1
+
+    def flush(self):
+        pass
+
+class GeometryStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, 'junctions.shp')
+        f = open(self.filename, 'w')
+        f.write('x')
+        f.close()
+        self.cache = SwmmCache(os.path.join(self.folder, 'cache'), 1)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def entries(self):
+        return [name for name in os.listdir(self.cache.folder)
+                if not name.startswith('.')]
+
+    def test_pinned_until_flush(self):
+        layer = FileLayer(self.filename, 10)
+        writer = Writer()
+        join = GeometryJoin(GeometryIndex([layer], self.cache), writer)
+        feature = network.QgsFeature()
+        join.add(feature, 'J3')
+        join.add(network.QgsFeature(), 'X')
+        self.assertEqual(writer.features[0].geometry().exportToWkt(),
+                'POINT(3 0)')
+        self.assertEqual(writer.features[1].geometry(), None)
+        # the cache is full, the store in use is not evicted
+        store, = self.entries()
+        self.cache.evict()
+        self.assertEqual(self.entries(), [store])
+        join.flush()
+        self.cache.evict()
+        self.assertEqual(self.entries(), [])
+
+    def test_reopened(self):
+        self.cache.max_size = 1 << 20
+        layer = FileLayer(self.filename, 10)
+        index = GeometryIndex([layer], self.cache)
+        index.lookup(['J1'])
+        index.close()
+        index.lookup(['J2'])
+        self.assertEqual(layer.reads, 2)
+        index.close()
+        # a new index reads the store, not the layer
+        index = GeometryIndex([layer], self.cache)
+        index.lookup(['J1', 'J2', 'X'])
+        index.close()
+        self.assertEqual(layer.reads, 3)
+        self.assertEqual(index.get('J2'), 'POINT(2 0)')
+        self.assertEqual(index.get('X'), None)
+
+class PinTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = SwmmCache(self.folder, 0)
+        self.filename = os.path.join(self.folder, '.tmp_file')
+        f = open(self.filename, 'w')
+        f.write('x')
+        f.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_pin(self):
+        self.cache.put('a', {'file': self.filename})
+        self.assertEqual(self.cache.pin('b'), None)
+        self.assertEqual(self.cache.pin('a'), self.cache.path('a'))
+        self.cache.pin('a')
+        self.cache.evict()
+        self.cache.unpin('a')
+        self.cache.evict()
+        self.assertTrue(self.cache.get('a'))
+        self.cache.unpin('a')
+        self.cache.evict()
+        self.assertEqual(self.cache.get('a'), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_hotstart.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Keys of hot start files, qgis is replaced by the stand-ins of the
+# benchmarks and the spin-up simulation by a stand-in writing the file.
+
+import os
+import io
+import sys
+import shutil
+import datetime
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmark', 'stubs'))
+sys.path.insert(0, ROOT)
+
+from processing.core.ProcessingConfig import ProcessingConfig
+from SwmmInp import patchInp
+from SwmmHotStart import spinUpOptions, spinUpDigest, seriesTimes, rainDate
+from SwmmAlgorithm import SwmmAlgorithm
+
+INP = u'''[TITLE]
+%(title)s
+
+[OPTIONS]
+START_DATE\t01/01/2026\t
+START_TIME\t00:00:00\t
+END_DATE\t01/02/2026\t
+END_TIME\t00:00:00\t
+REPORT_STEP\t0:15:00\t
+
+[FILES]
+%(files)s
+
+[RAINGAGES]
+G1\tINTENSITY\t0:15\t1.0\tTIMESERIES\tR1\t
+G2\tINTENSITY\t0:15\t1.0\tFILE\t"gage.dat"\tSTA1\tMM\t
+
+[JUNCTIONS]
+J1\t100\t3\t0\t0\t0\t
+
+[TIMESERIES]
+;Name\tDate\tTime\tValue\t
+R1\t01/01/2026\t00:00\t0\t
+R1\t\t02:00\t%(r1)s\t
+R1\t01/01/2026\t12:00\t%(r1_after)s\t
+R1\t01/01/2026\t18:00\t%(r1_later)s\t
+R2\tFILE\t"%(series)s"\t
+I1\t3\t%(i1)s\t
+'''
+
+GAGE = '''STA1 2026 1 1 1 0 %s
+STA1 2026 1 1 20 0 %s
+'''
+
+class Progress(object):
+    def setText(self, text):
+        pass
+    def setPercentage(self, value):
+        pass
+
+class Algorithm(SwmmAlgorithm):
+    "counts the spin-ups, which only write the hot start file"
+
+    def __init__(self):
+        SwmmAlgorithm.__init__(self)
+        self.spinups = 0
+
+    def spinUp(self, filename, swmm_cli, swmm_lib, progress):
+        self.spinups += 1
+        hsfilename = os.path.join(os.path.dirname(filename),
+                'swmm_spinup.hsf')
+        f = open(hsfilename, 'wb')
+        f.write(b'state %d'%self.spinups)
+        f.close()
+
+class HotStartTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, 'swmm.inp')
+        self.swmm = os.path.join(self.folder, 'swmm5')
+        self.write(self.swmm, b'')
+        self.write(os.path.join(self.folder, 'r2.dat'),
+                b'01/01/2026\t01:00\t1\t\n01/01/2026\t12:00\t5\t\n'
+                b'01/01/2026\t20:00\t6\t\n')
+        self.settings = dict(ProcessingConfig.settings)
+        ProcessingConfig.setSettingValue('Swmm_CACHE_FOLDER',
+                os.path.join(self.folder, 'cache'))
+        ProcessingConfig.setSettingValue('Swmm_CACHE_SIZE', 10)
+
+    def tearDown(self):
+        ProcessingConfig.settings = self.settings
+        shutil.rmtree(self.folder)
+
+    def write(self, filename, content):
+        f = open(filename, 'wb')
+        f.write(content)
+        f.close()
+
+    def inp(self, gage=('1', '2'), **values):
+        text = dict(title=u'forecast', files=u'', r1=u'2', r1_after=u'3',
+                r1_later=u'4', series=u'r2.dat', i1=u'1')
+        text.update(values)
+        f = io.open(self.filename, 'w', encoding='utf-8')
+        f.write(INP%text)
+        f.close()
+        self.write(os.path.join(self.folder, 'gage.dat'), GAGE%gage)
+        return self.filename
+
+    def digest(self, **values):
+        "digest of the spin-up to 06:00 of an .inp"
+        spinup = os.path.join(self.folder, 'swmm_spinup.inp')
+        patchInp(self.inp(**values), spinup, spinUpOptions(self.filename,
+            datetime.datetime(2026, 1, 1, 6))[0])
+        return spinUpDigest(spinup)
+
+    def test_series_times(self):
+        date = datetime.datetime(2026, 1, 1)
+        self.assertEqual(seriesTimes([u'', u'1.5', u'2'], date),
+                ([date + datetime.timedelta(hours=1.5)], date))
+        day = datetime.datetime(2026, 1, 2)
+        self.assertEqual(seriesTimes([u'01/02/2026', u'0:30', u'1',
+            u'1:00', u'2'], date), ([day + datetime.timedelta(minutes=30),
+                day + datetime.timedelta(hours=1)], day))
+        self.assertEqual(seriesTimes([u'x', u'1'], date), (None, date))
+        self.assertEqual(rainDate(['STA1', '2026', '1', '1', '1', '0',
+            '1']), datetime.datetime(2026, 1, 1, 1))
+        self.assertEqual(rainDate(['header']), None)
+
+    def test_digest(self):
+        digest = self.digest()
+        # title, rainfall after the end of the spin-up
+        self.assertEqual(self.digest(title=u'other'), digest)
+        self.assertEqual(self.digest(r1_later=u'9'), digest)
+        self.assertEqual(self.digest(gage=('1', '9')), digest)
+        self.write(os.path.join(self.folder, 'r3.dat'),
+                b'01/01/2026\t01:00\t1\t\n01/01/2026\t12:00\t5\t\n'
+                b'01/01/2026\t20:00\t7\t\n')
+        self.assertEqual(self.digest(series=u'r3.dat'), digest)
+        # the first point after the end is interpolated up to it
+        self.assertNotEqual(self.digest(r1_after=u'9'), digest)
+        self.assertNotEqual(self.digest(r1=u'9'), digest)
+        self.assertNotEqual(self.digest(gage=('9', '2')), digest)
+        self.assertNotEqual(self.digest(i1=u'9'), digest)
+        self.assertNotEqual(self.digest(series=u'missing.dat'), digest)
+
+    def test_reused(self):
+        self.inp()
+        alg = Algorithm()
+        alg.useHotStart(self.filename, '2026-01-01 06:00:00', self.swmm, None,
+                Progress())
+        self.assertEqual(alg.spinups, 1)
+        # new rainfall after the hot start time
+        self.inp(r1_later=u'9', gage=('1', '9'))
+        alg.useHotStart(self.filename, '2026-01-01 06:00:00', self.swmm, None,
+                Progress())
+        self.assertEqual(alg.spinups, 1)
+        self.assertIn(u'USE HOTSTART', io.open(self.filename,
+            encoding='utf-8').read())
+        self.inp(r1=u'9')
+        alg.useHotStart(self.filename, '2026-01-01 06:00:00', self.swmm, None,
+                Progress())
+        self.assertEqual(alg.spinups, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_import.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Import of example1.inp into a GeoPackage and export back to an .inp
+# file. Only sqlite3 is needed.
+
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from SwmmImport import SwmmImportError, openTarget, importInp
+from SwmmInp import SECTIONS, readSections
+from SwmmCli import export
+
+EXAMPLE = os.path.join(ROOT, 'example', 'example1.inp')
+
+def tokens(rows):
+    """values of the rows split on blanks, numbers as floats: the text of
+    the numbers and the grouping of the columns may change on export"""
+    result = []
+    for row in rows:
+        values = []
+        for value in row:
+            for token in value.split():
+                try:
+                    values.append(float(token))
+                except ValueError:
+                    values.append(token)
+        result.append(values)
+    return result
+
+class ImportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.gpkg = os.path.join(self.folder, 'network.gpkg')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def importExample(self, srid=None, wkt=None):
+        target = openTarget(self.gpkg, srid=srid, wkt=wkt)
+        try:
+            return importInp(EXAMPLE, target, u'example1')
+        finally:
+            target.close()
+
+    def test_round_trip(self):
+        counts, skipped = self.importExample()
+        self.assertEqual(counts['conduits'], 9)
+        self.assertEqual(counts['junctions'], 8)
+        self.assertEqual(sorted(skipped), ['MAP', 'TAGS', 'TITLE'])
+
+        filename = os.path.join(self.folder, 'example1.inp')
+        export(self.gpkg, filename, u'example1')
+        before = readSections(EXAMPLE, SECTIONS)
+        after = readSections(filename, SECTIONS)
+        self.assertEqual(sorted(after), sorted(before))
+        for section in before:
+            self.assertEqual(tokens(after[section]),
+                    tokens(before[section]), section)
+
+    def test_spatial_ref_sys(self):
+        self.importExample(srid=4326)
+        con = sqlite3.connect(self.gpkg)
+        try:
+            srs = con.execute('SELECT srs_id, organization, '
+                    'organization_coordsys_id FROM gpkg_spatial_ref_sys '
+                    'ORDER BY srs_id').fetchall()
+            srid = con.execute('SELECT DISTINCT srs_id FROM '
+                    'gpkg_geometry_columns').fetchall()
+        finally:
+            con.close()
+        self.assertEqual(srs, [(-1, 'NONE', -1), (0, 'NONE', 0),
+            (4326, 'EPSG', 4326)])
+        self.assertEqual(srid, [(4326,)])
+
+    def test_unknown_srid(self):
+        self.assertRaises(SwmmImportError, self.importExample, srid=2154)
+        self.importExample(srid=2154, wkt='PROJCS["RGF93 / Lambert-93"]')
+        con = sqlite3.connect(self.gpkg)
+        try:
+            self.assertEqual(con.execute('SELECT definition FROM '
+                'gpkg_spatial_ref_sys WHERE srs_id = 2154').fetchall(),
+                [('PROJCS["RGF93 / Lambert-93"]',)])
+        finally:
+            con.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_inp.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import io
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from SwmmInp import splitRow, readSections, externalFiles
+
+class InpTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, 'swmm.inp')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, text):
+        f = io.open(self.filename, 'w', encoding='utf-8')
+        f.write(text)
+        f.close()
+
+    def test_split_row(self):
+        self.assertEqual(splitRow(u'C1\t\tO1\t100\t\n'),
+                [u'C1', u'', u'O1', u'100'])
+        self.assertEqual(splitRow(u'  C1   J1 O1  ; comment\n'),
+                [u'C1', u'J1', u'O1'])
+        self.assertEqual(splitRow(u'R1 FILE "my rain.dat"\r\n'),
+                [u'R1', u'FILE', u'my rain.dat'])
+        self.assertEqual(splitRow(u'R1\tFILE\t"/data/rain.dat"\t\n'),
+                [u'R1', u'FILE', u'/data/rain.dat'])
+
+    def test_read_sections(self):
+        self.write(u'[TITLE]\nt\n\n[OPTIONS]\nFLOW_UNITS\tCMS\n\t'
+                u'ROUTING_STEP\t0:00:30\n\n[conduits]\n;Name\tFrom\t\n'
+                u'C1\t\tO1\t\n')
+        self.assertEqual(readSections(self.filename, ['OPTIONS', 'CONDUITS']),
+                {'OPTIONS': [[u'FLOW_UNITS', u'CMS'],
+                    [u'ROUTING_STEP', u'0:00:30']],
+                 'CONDUITS': [[u'C1', u'', u'O1']]})
+
+    def test_external_files(self):
+        self.write(u'[FILES]\nUSE INFLOWS "inflows.txt"\n'
+                u'SAVE OUTFLOWS "outflows.txt"\n'
+                u'USE HOTSTART "/tmp/state.hsf"\n\n'
+                u'[RAINGAGES]\nG1 INTENSITY 0:15 1.0 FILE "gage.dat" STA1 MM\n'
+                u'G2 INTENSITY 0:15 1.0 TIMESERIES R2\n\n'
+                u'[TEMPERATURE]\nFILE climate.dat\n\n'
+                u'[TIMESERIES]\nR1\tFILE\t"series/r1.dat"\t\n'
+                u'R2\t01/01/2026\t00:00\t1.5\t\n'
+                u'R3\tFILE\t"series/r1.dat"\t\n')
+        self.assertEqual(externalFiles(self.filename),
+                [os.path.join(self.folder, 'inflows.txt'), '/tmp/state.hsf',
+                 os.path.join(self.folder, 'gage.dat'),
+                 os.path.join(self.folder, 'climate.dat'),
+                 os.path.join(self.folder, 'series', 'r1.dat')])
+
+if __name__ == '__main__':
+    unittest.main()
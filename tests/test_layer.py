@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_layer.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Signatures of file based layers, qgis is replaced by the stand-ins of
+# the benchmarks.
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmark', 'stubs'))
+sys.path.insert(0, ROOT)
+
+from qgis.core import QgsField, QgsFields
+from SwmmLayer import layerSignature, geometrySignature, layerFiles
+
+class Provider(object):
+    def __init__(self, fields):
+        self._fields = fields
+    def name(self):
+        return 'ogr'
+    def featureCount(self):
+        return 2
+    def fields(self):
+        return self._fields
+
+class Layer(object):
+    "ogr layer of a file, its rows are never read"
+
+    def __init__(self, source):
+        self._source = source
+        fields = QgsFields()
+        fields.append(QgsField('Name'))
+        self.provider = Provider(fields)
+    def source(self):
+        return self._source
+    def dataProvider(self):
+        return self.provider
+    def isModified(self):
+        return False
+    def getFeatures(self, request=None):
+        raise AssertionError('a file layer is not read for its signature')
+
+class SignatureTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def touch(self, name, content='x'):
+        path = os.path.join(self.folder, name)
+        f = open(path, 'ab')
+        f.write(content)
+        f.close()
+        return path
+
+    def test_shapefile(self):
+        shp = self.touch('conduits.shp')
+        self.touch('conduits.shx')
+        self.touch('conduits.DBF')
+        self.touch('other.dbf')
+        self.assertEqual(sorted(os.path.basename(f)
+            for f in layerFiles(shp)),
+            ['conduits.DBF', 'conduits.shp', 'conduits.shx'])
+        layer = Layer(shp+'|layerid=0')
+        signature = layerSignature(layer)
+        geometry = geometrySignature(layer)
+        self.assertEqual(layerSignature(layer), signature)
+        # attributes edited, only the .dbf changed
+        self.touch('conduits.DBF', 'y')
+        self.assertNotEqual(layerSignature(layer), signature)
+        self.assertNotEqual(geometrySignature(layer), geometry)
+
+    def test_geopackage(self):
+        gpkg = self.touch('network.gpkg')
+        layer = Layer(gpkg+'|layername=junctions')
+        signature = layerSignature(layer)
+        # rows not yet checkpointed to the database
+        self.touch('network.gpkg-wal')
+        self.assertNotEqual(layerSignature(layer), signature)
+        signature = layerSignature(layer)
+        self.touch('network.gpkg-wal', 'y')
+        self.assertNotEqual(layerSignature(layer), signature)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_output.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Binary output files written here with the layout of swmm 5.1, for a
+# network with a subcatchment, two nodes, two links and a pollutant.
+
+import os
+import sys
+import struct
+import shutil
+import datetime
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from SwmmOutput import SwmmOutput, SwmmOutputError, outputRecords, \
+        MAGIC_NUMBER
+from SwmmReport import NODE, LINK
+
+START = datetime.datetime(2026, 1, 1)
+STEP = 300
+SUBCATCHMENTS = ['S1']
+NODES = ['J1', 'O1']
+LINKS = ['C1', 'P1']
+POLLUTANTS = ['TSS']
+
+def nodeValues(i, k):
+    "depth, head, volume, lateral inflow, inflow, flooding and TSS"
+    return [i + k, 100. + i + k, 2., 0.5, 10.*i + k, 0.25*k, 7.]
+
+def linkValues(i, k):
+    "flow, depth, velocity, volume, capacity and TSS"
+    return [i + k, 0.5, 2., 3., 0.125*k, 7.]
+
+def writeOutput(filename, periods, magic=MAGIC_NUMBER,
+        closing_magic=MAGIC_NUMBER):
+    f = open(filename, 'wb')
+    try:
+        f.write(struct.pack('<7i', magic, 51000, 3, len(SUBCATCHMENTS),
+            len(NODES), len(LINKS), len(POLLUTANTS)))
+        id_pos = f.tell()
+        for element_id in SUBCATCHMENTS + NODES + LINKS + POLLUTANTS:
+            f.write(struct.pack('<i', len(element_id))+element_id)
+        f.write(struct.pack('<i', 0)) # pollutant unit
+        input_pos = f.tell()
+        f.write(struct.pack('<2i', 1, 1))
+        f.write(struct.pack('<f', 10.))
+        f.write(struct.pack('<4i', 3, 0, 2, 3))
+        for i in range(len(NODES)):
+            f.write(struct.pack('<i2f', i, 90., 3.))
+        f.write(struct.pack('<6i', 5, 0, 3, 3, 3, 4))
+        for i in range(len(LINKS)):
+            f.write(struct.pack('<i4f', 2*i, 0., 0., 1., 100.))
+        for nvar in (8, 6, 5, 15):
+            codes = range(nvar) + ([nvar] if nvar < 15 else [])
+            f.write(struct.pack('<%di'%(len(codes)+1), len(codes), *codes))
+        start = (START - datetime.datetime(1899, 12, 30)).total_seconds()
+        f.write(struct.pack('<di', start/86400., STEP))
+        output_pos = f.tell()
+        for k in range(periods):
+            f.write(struct.pack('<d', (start + STEP*(k+1))/86400.))
+            f.write(struct.pack('<9f', *range(9)))
+            for i in range(len(NODES)):
+                f.write(struct.pack('<7f', *nodeValues(i, k)))
+            for i in range(len(LINKS)):
+                f.write(struct.pack('<6f', *linkValues(i, k)))
+            f.write(struct.pack('<15f', *range(15)))
+        f.write(struct.pack('<6i', id_pos, input_pos, output_pos, periods,
+            0, closing_magic))
+    finally:
+        f.close()
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, 'swmm.out')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def time(self, k):
+        return (START + datetime.timedelta(seconds=STEP*(k+1))).strftime(
+                '%Y-%m-%d %H:%M:%S')
+
+    def test_header(self):
+        writeOutput(self.filename, 4)
+        output = SwmmOutput(self.filename)
+        self.assertEqual(output.flow_units, 'CMS')
+        self.assertEqual(output.subcatch_ids, SUBCATCHMENTS)
+        self.assertEqual(output.node_ids, NODES)
+        self.assertEqual(output.link_ids, LINKS)
+        self.assertEqual(output.pollutant_ids, POLLUTANTS)
+        self.assertEqual(output.node_variables[-2:], ['Flooding', 'TSS'])
+        self.assertEqual(list(output.link_properties['length']),
+                [100., 100.])
+        self.assertEqual(output.report_step, STEP)
+        self.assertEqual(output.nperiods, 4)
+        self.assertEqual(output.times()[0], START
+                + datetime.timedelta(seconds=STEP))
+        self.assertEqual(output.times()[-1], START
+                + datetime.timedelta(seconds=4*STEP))
+        self.assertEqual(list(output.nodes[1][2]), nodeValues(1, 2))
+        self.assertEqual(list(output.system[3][:3]), [0., 1., 2.])
+        output.close()
+
+    def test_records(self):
+        writeOutput(self.filename, 4)
+        records = list(outputRecords(SwmmOutput(self.filename)))
+        self.assertEqual(len(records), 4*(len(NODES)+len(LINKS)))
+        results = dict(((kind, element_id, time), values)
+                for kind, element_id, time, values in records)
+        # inflow, flooding, depth and head
+        self.assertEqual(results[NODE, 'O1', self.time(2)],
+                [12., 0.5, 3., 103.])
+        # flow, velocity, depth and percent full
+        self.assertEqual(results[LINK, 'P1', self.time(3)],
+                [4., 2., 0.5, 37.5])
+
+    def test_filters(self):
+        writeOutput(self.filename, 4)
+        percents = []
+        records = list(outputRecords(SwmmOutput(self.filename),
+            percents.append, set(['J1', 'P1']), self.time(1), self.time(2)))
+        self.assertEqual([(r[0], r[1], r[2]) for r in records],
+                [(NODE, 'J1', self.time(1)), (NODE, 'J1', self.time(2)),
+                 (LINK, 'P1', self.time(1)), (LINK, 'P1', self.time(2))])
+        self.assertEqual(percents, [50, 100])
+        self.assertEqual(list(outputRecords(SwmmOutput(self.filename),
+            start='2027-01-01 00:00:00')), [])
+
+    def test_no_period(self):
+        writeOutput(self.filename, 0)
+        output = SwmmOutput(self.filename)
+        self.assertEqual(output.times(), [])
+        self.assertEqual(list(outputRecords(output)), [])
+
+    def test_invalid(self):
+        writeOutput(self.filename, 2, magic=0)
+        self.assertRaises(SwmmOutputError, SwmmOutput, self.filename)
+        writeOutput(self.filename, 2, closing_magic=0)
+        self.assertRaises(SwmmOutputError, SwmmOutput, self.filename)
+        # closing records giving more periods than the file holds
+        writeOutput(self.filename, 2)
+        f = open(self.filename, 'r+b')
+        f.seek(-3*4, 2)
+        f.write(struct.pack('<i', 3))
+        f.close()
+        self.assertRaises(SwmmOutputError, SwmmOutput, self.filename)
+        f = open(self.filename, 'wb')
+        f.write(b'not a swmm output')
+        f.close()
+        self.assertRaises(SwmmOutputError, SwmmOutput, self.filename)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_postgis.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Queries sent to postgres for the layers of a section, qgis is replaced by
+# the stand-ins of the benchmarks and the server by a connection recording
+# the queries.
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmark'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmark', 'stubs'))
+sys.path.insert(0, ROOT)
+
+from PyQt4.QtCore import QVariant
+import network
+import SwmmPostgis
+from SwmmInp import NUMBER, TEXT
+
+class Error(Exception):
+    pass
+
+class Cursor(object):
+    def __init__(self, queries):
+        self.queries = queries
+    def execute(self, sql):
+        self.queries.append(sql)
+    def fetchone(self):
+        return 2, 'abc'
+
+class Connection(object):
+    def __init__(self, queries):
+        self.queries = queries
+    def cursor(self):
+        return Cursor(self.queries)
+    def close(self):
+        pass
+
+class PostgisTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.queries = []
+        self.patched = (SwmmPostgis.psycopg2, SwmmPostgis.connect,
+                SwmmPostgis.fromClause)
+        SwmmPostgis.psycopg2 = type('psycopg2', (), {'Error': Error})
+        SwmmPostgis.connect = lambda layer: Connection(self.queries)
+        SwmmPostgis.fromClause = lambda layer: \
+                ' FROM "public"."conduits" AS t'
+
+    def tearDown(self):
+        (SwmmPostgis.psycopg2, SwmmPostgis.connect,
+                SwmmPostgis.fromClause) = self.patched
+
+    def layer(self, pk):
+        return network.Layer('conduits', [('fid', QVariant.Int),
+            ('Name', QVariant.String), ('Length', QVariant.Double)],
+            lambda: iter([]), 0, pk=pk)
+
+    def test_copy_order(self):
+        copy = SwmmPostgis.sectionCopy(self.layer([0]), ['Name', 'Length'],
+                [TEXT, NUMBER])
+        self.assertIn(' FROM "public"."conduits" AS t ORDER BY t."fid") TO '
+                'STDOUT', copy)
+
+    def test_copy_without_key(self):
+        # points of a series share their name, sorting on it would not
+        # keep them in time order
+        layer = network.Layer('timeseries', [('Name', QVariant.String),
+            ('DateTime', QVariant.String), ('Value', QVariant.Double)],
+            lambda: iter([['R1', '2026-01-01 00:00:00', 0.],
+                ['R1', '2026-01-01 00:15:00', 2.],
+                ['R1', '2026-01-01 00:05:00', 1.]]), 3)
+        copy = SwmmPostgis.sectionCopy(layer, ['Name', 'DateTime', 'Value'],
+                [TEXT, TEXT, NUMBER])
+        self.assertIn(' FROM "public"."conduits" AS t) TO STDOUT', copy)
+        self.assertNotIn('ORDER BY', copy)
+
+    def test_signature_order(self):
+        self.assertEqual(SwmmPostgis.tableSignature(self.layer([0, 1])),
+                '2:abc')
+        self.assertEqual(self.queries[-1], "SELECT count(*), "
+                "md5(string_agg(md5(t::text), '' ORDER BY t.\"fid\", "
+                "t.\"Name\")) FROM \"public\".\"conduits\" AS t")
+        SwmmPostgis.tableSignature(self.layer([]))
+        self.assertIn("string_agg(md5(t::text), '' ORDER BY md5(t::text))",
+                self.queries[-1])
+
+if __name__ == '__main__':
+    unittest.main()
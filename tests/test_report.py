@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_report.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from SwmmReport import readReport, reportIndex, indexFilename, NODE, LINK
+
+# time series tables of a swmm 5.0 report
+REPORT = b'''
+  EPA STORM WATER MANAGEMENT MODEL - VERSION 5.0
+
+  *************
+  Node Results
+  *************
+
+  <<< Node J1 >>>
+  ----------------------------------------------------
+                          Inflow  Flooding     Depth      Head
+  Date        Time           CMS       CMS         m         m
+  ----------------------------------------------------
+  JAN-01-2026  00:05:00     1.000     0.000     0.500   100.500
+  JAN-01-2026  00:10:00     2.000     0.000     0.600   100.600
+  JAN-01-2026  00:15:00     3.000     0.100     0.700   100.700
+
+  <<< Node O1 >>>
+  ----------------------------------------------------
+                          Inflow  Flooding     Depth      Head
+  Date        Time           CMS       CMS         m         m
+  ----------------------------------------------------
+  JAN-01-2026  00:05:00     4.000     0.000     0.100    90.100
+  JAN-01-2026  00:10:00     5.000     0.000     0.200    90.200
+  JAN-01-2026  00:15:00     6.000     0.000     0.300    90.300
+
+  *************
+  Link Results
+  *************
+
+  <<< Link C1 >>>
+  ----------------------------------------------------
+                            Flow  Velocity     Depth   Percent
+  Date        Time           CMS       m/s         m      Full
+  ----------------------------------------------------
+  JAN-01-2026  00:05:00     1.500     0.800     0.400    20.000
+  JAN-01-2026  00:10:00     2.500     0.900     0.500    25.000
+  JAN-01-2026  00:15:00     3.500     1.000     0.600    30.000
+
+'''
+
+class ReportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, 'swmm.rpt')
+        self.write(REPORT)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, content):
+        f = open(self.filename, 'wb')
+        f.write(content)
+        f.close()
+
+    def test_read(self):
+        records = list(readReport(self.filename))
+        self.assertEqual(len(records), 9)
+        self.assertEqual(records[0], (NODE, u'J1', '2026-01-01 00:05:00',
+            [1., 0., 0.5, 100.5]))
+        self.assertEqual(records[-1], (LINK, u'C1', '2026-01-01 00:15:00',
+            [3.5, 1., 0.6, 30.]))
+        self.assertEqual([r[2] for r in readReport(self.filename,
+            start='2026-01-01 00:10:00', end='2026-01-01 00:10:00')],
+            ['2026-01-01 00:10:00']*3)
+        # no index without element filter
+        self.assertFalse(os.path.exists(indexFilename(self.filename)))
+
+    def test_index(self):
+        blocks = reportIndex(self.filename)
+        self.assertEqual([b[:2] for b in blocks], [[NODE, u'J1'],
+            [NODE, u'O1'], [LINK, u'C1']])
+        self.assertEqual([b[3] for b in blocks], [3, 3, 3])
+        self.assertEqual(REPORT[blocks[1][2]:].split(b'\n', 1)[0],
+                b'  JAN-01-2026  00:05:00     4.000     0.000     0.100'
+                b'    90.100')
+        f = open(indexFilename(self.filename))
+        saved = json.load(f)
+        f.close()
+        self.assertEqual(saved['blocks'], blocks)
+
+    def test_selected(self):
+        records = list(readReport(self.filename, elements=set(['O1', 'C1']),
+            start='2026-01-01 00:10:00'))
+        self.assertEqual(records, [r for r in readReport(self.filename)
+            if r[1] in ('O1', 'C1') and r[2] >= '2026-01-01 00:10:00'])
+        # other blocks are not read: garbage in the rows of J1, with the
+        # report size and time unchanged, is not seen
+        st = os.stat(self.filename)
+        self.write(REPORT.replace(b'     1.000     0.000',
+            b'     x.xxx     0.000'))
+        os.utime(self.filename, (st.st_atime, st.st_mtime))
+        self.assertEqual(list(readReport(self.filename,
+            elements=set(['O1', 'C1']), start='2026-01-01 00:10:00')),
+            records)
+        self.assertRaises(ValueError, list, readReport(self.filename))
+
+    def test_stale_index(self):
+        reportIndex(self.filename)
+        st = os.stat(self.filename)
+        # a new report of the same size, its blocks moved
+        moved = REPORT.replace(b'VERSION 5.0', b'5.0', 1) + b' '*8
+        self.assertEqual(len(moved), len(REPORT))
+        self.write(moved)
+        os.utime(self.filename, (st.st_atime, st.st_mtime + 10))
+        self.assertEqual([r[3] for r in readReport(self.filename,
+            elements=set(['O1']))], [[4., 0., 0.1, 90.1], [5., 0., 0.2, 90.2],
+                [6., 0., 0.3, 90.3]])
+        # a longer report, same time
+        self.write(b'\n' + moved)
+        os.utime(self.filename, (st.st_atime, st.st_mtime + 10))
+        self.assertEqual(len(list(readReport(self.filename,
+            elements=set(['C1'])))), 3)
+        # an unreadable index is rebuilt
+        f = open(indexFilename(self.filename), 'w')
+        f.write('{')
+        f.close()
+        self.assertEqual(len(list(readReport(self.filename,
+            elements=set(['J1'])))), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_runner.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Console programs are stood in for by python child processes printing
+# like swmm does.
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmark', 'stubs'))
+sys.path.insert(0, ROOT)
+
+from processing.core.GeoAlgorithmExecutionException import \
+        GeoAlgorithmExecutionException
+from SwmmRunner import runProcess, tailLines, SwmmCanceled, LOG_LINES
+from SwmmAlgorithm import SwmmAlgorithm
+
+# progress bar updated in place, then many lines
+SWMM = r'''
+import sys
+sys.stdout.write("\n o  Retrieving project data")
+for p in range(0, 101, 25):
+    sys.stdout.write("\r... Running %d.0%%" % p)
+    sys.stdout.flush()
+sys.stdout.write("\r... Running 100.0%\n")
+for i in range(500):
+    sys.stdout.write("line %d\n" % i)
+sys.stdout.write("\r o  Simulation complete")
+'''
+
+# silent until killed
+SLOW = r'''
+import sys, time
+sys.stdout.write("... Running 10.0%\n")
+sys.stdout.flush()
+time.sleep(30)
+'''
+
+class RunnerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.log = os.path.join(self.folder, 'swmm.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_output(self):
+        percents = []
+        tail = runProcess([sys.executable, '-c', SWMM], self.log,
+                percents.append)
+        # updates read together only give the last one
+        self.assertEqual(percents[-1], 100)
+        self.assertEqual(percents, sorted(set(percents)))
+        # bounded tail, carriage return updates count as the last one
+        lines = tail.split(b'\n')
+        self.assertEqual(len(lines), LOG_LINES)
+        self.assertEqual(lines[-2], b'line 499')
+        self.assertEqual(lines[-1], b' o  Simulation complete')
+        self.assertEqual(lines[0], b'line %d'%(500 - LOG_LINES + 1))
+        # the full output goes to the file
+        f = open(self.log, 'rb')
+        self.assertTrue(f.read().startswith(
+            b'\n o  Retrieving project data\r... Running 0.0%'))
+        f.close()
+        self.assertEqual(tailLines(self.log, 2),
+                b'line 499\n\r o  Simulation complete')
+
+    def test_cancel(self):
+        start = time.time()
+        percents = []
+        self.assertRaises(SwmmCanceled, runProcess,
+                [sys.executable, '-c', SLOW], self.log, percents.append,
+                lambda: bool(percents))
+        self.assertEqual(percents, [10])
+        self.assertTrue(time.time() - start < 10)
+
+    def test_missing(self):
+        self.assertRaises(OSError, runProcess,
+                [os.path.join(self.folder, 'swmm5')], self.log)
+        alg = SwmmAlgorithm()
+        self.assertRaises(GeoAlgorithmExecutionException, alg.runSwmm,
+                os.path.join(self.folder, 'swmm5'), 'swmm.inp', 'swmm.rpt',
+                'swmm.out', self.log)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_series.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Series files of the TIMESERIES section, qgis is replaced by the
+# stand-ins of the benchmarks.
+
+import io
+import os
+import sys
+import shutil
+import hashlib
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmark', 'stubs'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmark'))
+sys.path.insert(0, ROOT)
+
+from PyQt4.QtCore import QVariant
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.tools import dataobjects
+from network import Layer
+import SwmmSeries
+from SwmmSeries import SeriesWriter, seriesFilename, fileLine, seriesPaths
+from SwmmInp import INP_FORMAT, openInp
+from SwmmCache import SwmmCache
+from SwmmAlgorithm import SwmmAlgorithm
+
+def timeseries(rows):
+    "TIMESERIES layer of rows (name, date, time, value)"
+    text = QVariant.String
+    return Layer('timeseries', [('Name', text), ('Date', text),
+        ('Time', text), ('Value', QVariant.Double), ('fid', QVariant.Int)],
+        lambda: iter([list(row)+[i] for i, row in enumerate(rows)]),
+        len(rows), pk=(4,))
+
+ROWS = [('R1', '01/01/2026', '00:00', 0.),
+        ('R2', '01/01/2026', '00:00', 1.),
+        ('R1', '', '01:00', 2.5),
+        ('R3', 'FILE', '/data/rain/r3.dat', None),
+        ('R2', '', '01:00', 3.)]
+
+def read(path):
+    f = io.open(path, 'r', encoding='utf-8', newline='')
+    try:
+        return f.read()
+    finally:
+        f.close()
+
+class SeriesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = os.path.join(self.folder, 'cache')
+        self.settings = dict(ProcessingConfig.settings)
+        self.max_open_files = SwmmSeries.MAX_OPEN_FILES
+
+    def tearDown(self):
+        ProcessingConfig.settings = self.settings
+        dataobjects.objects.pop('timeseries', None)
+        SwmmSeries.MAX_OPEN_FILES = self.max_open_files
+        shutil.rmtree(self.folder)
+
+    def enableCache(self, size=10):
+        ProcessingConfig.setSettingValue('Swmm_CACHE_FOLDER', self.cache)
+        ProcessingConfig.setSettingValue('Swmm_CACHE_SIZE', size)
+
+    def writeSeries(self, alg, rows, name='swmm.inp'):
+        "writes the section of rows, returns its file name"
+        filename = os.path.join(self.folder, name)
+        f = openInp(filename)
+        try:
+            alg.writeSeries(timeseries(rows), f)
+        finally:
+            f.close()
+        return filename
+
+    def test_writer(self):
+        # files are closed and opened again when there are too many
+        SwmmSeries.MAX_OPEN_FILES = 2
+        writer = SeriesWriter(self.folder)
+        for name, line in [(u'b', u'1\n'), (u'a/x', u'2\n'), (u'c', u'3\n'),
+                (u'b', u'4\n'), (u'a/x', u'\xe9\n')]:
+            writer.add(name, line)
+        series = writer.close()
+        self.assertEqual([name for name, path, digest in series],
+                [u'b', u'a/x', u'c'])
+        self.assertEqual([os.path.basename(path)
+            for name, path, digest in series],
+            ['0000_b.dat', '0001_a_x.dat', '0002_c.dat'])
+        self.assertEqual([read(path) for name, path, digest in series],
+                [u'1\n4\n', u'2\n\xe9\n', u'3\n'])
+        for name, path, digest in series:
+            self.assertEqual(digest, hashlib.sha1(read(path)
+                .encode('utf-8')).hexdigest())
+        self.assertEqual(seriesFilename(12, u'r\xe9 1'), '0012_r_1.dat')
+        self.assertEqual(len(seriesFilename(3, u'r'*100)), 5+64+4)
+
+    def test_paths(self):
+        filename = os.path.join(self.folder, 'series.inp')
+        f = openInp(filename)
+        f.write(u'[TIMESERIES]\n;Name\tDate\tTime\tValue\t\n')
+        f.write(u'R0\t01/01/2026\t00:00\t1.0\t\n')
+        f.write(fileLine(u'R1', u'/tmp/a b/series.dat'))
+        f.write(fileLine(u'R2', u'r2.dat'))
+        f.close()
+        self.assertEqual(seriesPaths(filename),
+                [u'/tmp/a b/series.dat', u'r2.dat'])
+
+    def test_folder(self):
+        filename = self.writeSeries(SwmmAlgorithm(), ROWS)
+        folder = os.path.join(self.folder, 'timeseries')
+        self.assertEqual(sorted(os.listdir(folder)),
+                ['0000_R1.dat', '0001_R2.dat'])
+        self.assertEqual(read(os.path.join(folder, '0001_R2.dat')),
+                u'01/01/2026\t00:00\t1.0\t\n\t01:00\t3.0\t\n')
+        lines = read(filename).splitlines()
+        # rows reading a file already are kept as is
+        self.assertEqual(lines[2], u'R3\tFILE\t/data/rain/r3.dat\t\t')
+        self.assertEqual(seriesPaths(filename), [u'/data/rain/r3.dat',
+            os.path.join(folder, '0000_R1.dat'),
+            os.path.join(folder, '0001_R2.dat')])
+
+    def test_cache(self):
+        self.enableCache()
+        alg = SwmmAlgorithm()
+        first = seriesPaths(self.writeSeries(alg, ROWS, 'first.inp'))[1:]
+        self.assertEqual(len(first), 2)
+        # entries are keyed by the content of the series
+        for path in first:
+            self.assertEqual(os.path.basename(path), 'series.dat')
+            self.assertEqual(os.path.dirname(os.path.dirname(path)),
+                    self.cache)
+        self.assertEqual(read(first[0]),
+                u'01/01/2026\t00:00\t0.0\t\n\t01:00\t2.5\t\n')
+        self.assertEqual(os.path.basename(os.path.dirname(first[0])),
+                SwmmCache.key('series', INP_FORMAT, hashlib.sha1(
+                    read(first[0]).encode('utf-8')).hexdigest()))
+
+        # only the series that changed is stored again
+        rows = list(ROWS)
+        rows[4] = ('R2', '', '01:00', 4.)
+        second = seriesPaths(self.writeSeries(alg, rows, 'second.inp'))[1:]
+        self.assertEqual(second[0], first[0])
+        self.assertNotEqual(second[1], first[1])
+        self.assertEqual(alg.profile.entries[('series', 'written')]['rows'],
+                3)
+        self.assertEqual(alg.profile.entries[('series', 'reused')]['rows'],
+                1)
+        # no temporary files are left behind
+        self.assertEqual(len(os.listdir(self.cache)), 3)
+
+    def test_available(self):
+        self.enableCache()
+        alg = SwmmAlgorithm()
+        dataobjects.objects['timeseries'] = timeseries(ROWS)
+        alg.setParameterValue(alg.TIMESERIES, 'timeseries')
+        alg.setParameterValue(alg.TIMESERIES_FILES, True)
+        cache = alg.swmmCache()
+        section = alg.renderSections()[alg.TIMESERIES]
+        self.assertTrue(alg.seriesAvailable(section, cache))
+        self.assertEqual(alg.renderSections()[alg.TIMESERIES], section)
+        self.assertEqual(alg.profile.entries[('render', alg.TIMESERIES)]
+                ['calls'], 1)
+
+        # the file of R3 is not a cache entry
+        self.assertEqual(seriesPaths(section)[0], u'/data/rain/r3.dat')
+
+        # the series files are evicted, the cached section is kept
+        key = os.path.basename(os.path.dirname(section))
+        cache.pin(key)
+        try:
+            SwmmCache(self.cache, 0).evict()
+        finally:
+            cache.unpin(key)
+        self.assertTrue(os.path.exists(section))
+        self.assertFalse(alg.seriesAvailable(section, cache))
+
+        # and rendered again with its series files
+        self.assertEqual(alg.renderSections()[alg.TIMESERIES], section)
+        self.assertEqual(alg.profile.entries[('render', alg.TIMESERIES)]
+                ['calls'], 2)
+        self.assertTrue(alg.seriesAvailable(section, cache))
+        for path in seriesPaths(section)[1:]:
+            self.assertTrue(os.path.exists(path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_source.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+# Section tables read without qgis. GeoPackages are real sqlite files,
+# postgres is replaced by a connection recording the queries (psycopg2
+# is not needed).
+
+import os
+import sys
+import types
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from SwmmInp import NUMBER, TEXT, tableLines
+from SwmmSource import GeopackageSource, PostgisSource
+
+class Cursor(object):
+    "cursor answering the catalog queries of PostgisSource.table"
+
+    def __init__(self, con):
+        self.con = con
+        self.result = []
+
+    def execute(self, sql, args=()):
+        self.con.queries.append(sql)
+        if 'FROM pg_class' in sql:
+            self.result = [(1, 'conduits')]
+        elif 'FROM pg_attribute' in sql:
+            # name, type, type category, in the primary key
+            self.result = [('id', 'int4', 'N', True),
+                    ('name', 'varchar', 'S', False),
+                    ('barrels', 'int4', 'N', False),
+                    ('length', 'float8', 'N', False),
+                    ('roughness', 'numeric', 'N', False),
+                    ('geom', 'geometry', 'U', False)]
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+class Connection(object):
+    def __init__(self):
+        self.queries = []
+    def cursor(self, name=None):
+        return Cursor(self)
+    def close(self):
+        pass
+
+class SourceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_geopackage_datetime(self):
+        filename = os.path.join(self.folder, 'network.gpkg')
+        con = sqlite3.connect(filename)
+        con.execute('CREATE TABLE gpkg_contents (table_name TEXT)')
+        con.execute('CREATE TABLE gpkg_geometry_columns (table_name TEXT, '
+                'column_name TEXT)')
+        con.execute("INSERT INTO gpkg_contents VALUES ('timeseries')")
+        con.execute('CREATE TABLE timeseries (fid INTEGER PRIMARY KEY, '
+                'name TEXT, date DATETIME, value REAL, count INTEGER)')
+        con.execute("INSERT INTO timeseries VALUES "
+                "(1, 'R1', '2026-01-01T06:30:00.000Z', 1.5, 10)")
+        con.execute("INSERT INTO timeseries VALUES "
+                "(2, 'R1', NULL, NULL, NULL)")
+        con.commit()
+        con.close()
+
+        source = GeopackageSource(filename)
+        try:
+            columns, kinds, rows = source.table('TIMESERIES')
+            self.assertEqual(columns, ['name', 'date', 'value', 'count'])
+            self.assertEqual(kinds, [TEXT, TEXT, NUMBER, NUMBER])
+            self.assertEqual(list(tableLines('TIMESERIES', columns, kinds,
+                rows))[2:4], [u'R1\t01/01/2026\t06:30\t1.5\t10\t\n',
+                    u'R1\t\t\t\t\n'])
+        finally:
+            source.close()
+
+    def test_postgis_casts(self):
+        psycopg2 = types.ModuleType('psycopg2')
+        psycopg2.extensions = types.ModuleType('psycopg2.extensions')
+        psycopg2.extensions.UNICODE = None
+        psycopg2.extensions.register_type = lambda *args: None
+        psycopg2.Error = Exception
+        con = Connection()
+        psycopg2.connect = lambda dsn: con
+        modules = dict(sys.modules)
+        sys.modules['psycopg2'] = psycopg2
+        sys.modules['psycopg2.extensions'] = psycopg2.extensions
+        try:
+            source = PostgisSource('dbname=swmm', 'network')
+            columns, kinds, rows = source.table('CONDUITS')
+        finally:
+            sys.modules.clear()
+            sys.modules.update(modules)
+        self.assertEqual(columns, ['name', 'barrels', 'length', 'roughness'])
+        self.assertEqual(kinds, [TEXT, NUMBER, NUMBER, NUMBER])
+        # integers are written as is, not as 10.0
+        self.assertEqual(con.queries[-1], 'SELECT "name"::text, '
+                '"barrels"::text, "length"::float8, "roughness"::float8 '
+                'FROM "network"."conduits" ORDER BY "id"')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_summary.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from SwmmSummary import SwmmSummary, NODE_STATISTICS, LINK_STATISTICS
+from SwmmReport import NODE, LINK, reportStep
+import SwmmCli
+
+T1 = '2026-01-01 00:05:00'
+T2 = '2026-01-01 00:10:00'
+T3 = '2026-01-01 00:15:00'
+
+class SummaryTestCase(unittest.TestCase):
+
+    def summary(self, records, report_step=None):
+        summary = SwmmSummary(report_step)
+        for record in records:
+            summary.add(*record)
+        nodes = [(node_id, dict(zip(NODE_STATISTICS, values)))
+                for node_id, values in summary.nodes()]
+        links = [(link_id, dict(zip(LINK_STATISTICS, values)))
+                for link_id, values in summary.links()]
+        return nodes, links
+
+    def test_statistics(self):
+        # element by element, inflow, flooding, depth and head
+        nodes, links = self.summary([
+            (NODE, 'J1', T1, [1., 0., 0.5, 100.5]),
+            (NODE, 'J1', T2, [3., 2., 1.5, 101.5]),
+            (NODE, 'J1', T3, [2., 1., 1., 101.]),
+            (LINK, 'C1', T1, [-4., -1., 0.5, 50.]),
+            (LINK, 'C1', T2, [2., 0.5, 1., 100.]),
+            (LINK, 'C1', T3, [1., 0.2, 0.8, None])])
+        node_id, j1 = nodes[0]
+        self.assertEqual(node_id, 'J1')
+        self.assertEqual((j1['MaxDepth'], j1['TimeMaxDepth']), (1.5, T2))
+        self.assertEqual(j1['MeanDepth'], 1.)
+        self.assertEqual(j1['MaxHead'], 101.5)
+        self.assertEqual((j1['MaxInflow'], j1['TimeMaxInflow']), (3., T2))
+        self.assertEqual(j1['FloodVolume'], 3.*300)
+        self.assertEqual(j1['HoursFlooded'], 2*300/3600.)
+        link_id, c1 = links[0]
+        self.assertEqual((c1['MaxFlow'], c1['TimeMaxFlow']), (4., T1))
+        self.assertAlmostEqual(c1['MeanFlow'], -1./3)
+        self.assertEqual(c1['MaxVelocity'], 1.)
+        self.assertEqual(c1['MaxDepth'], 1.)
+        self.assertEqual((c1['MaxPercentFull'], c1['TimeMaxPercentFull']),
+                (100., T2))
+        self.assertEqual(c1['HoursFull'], 300/3600.)
+
+    def test_single_time(self):
+        records = [(NODE, 'J1', T2, [3., 2., 1.5, 101.5]),
+                (LINK, 'C1', T2, [2., 0.5, 1., 100.])]
+        nodes, links = self.summary(records, 60)
+        self.assertEqual(nodes[0][1]['FloodVolume'], 2.*60)
+        self.assertEqual(nodes[0][1]['HoursFlooded'], 60/3600.)
+        self.assertEqual(links[0][1]['HoursFull'], 60/3600.)
+        # the step of the records comes first
+        nodes, links = self.summary(records
+                + [(NODE, 'J1', T3, [0., 0., 0., 100.])], 60)
+        self.assertEqual(nodes[0][1]['FloodVolume'], 2.*300)
+        # without any step, volumes and durations can't be computed
+        nodes, links = self.summary(records)
+        self.assertEqual(nodes[0][1]['FloodVolume'], 0.)
+
+class ReportStepTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, name, content):
+        path = os.path.join(self.folder, name)
+        f = open(path, 'wb')
+        f.write(content)
+        f.close()
+        return path
+
+    def test_report(self):
+        rpt = self.write('swmm.rpt', b'\n  ****************\n'
+                b'  Analysis Options\n  ****************\n'
+                b'  Report Time Step ......... 01:00:30\n'
+                b'  Routing Time Step ........ 30.00 sec\n')
+        self.assertEqual(reportStep(rpt), 3630)
+        self.assertEqual(SwmmCli.resultStep(rpt), 3630)
+        rpt = self.write('other.rpt', b'  <<< Node J1 >>>\n'
+                b'  Report Time Step ......... 01:00:30\n')
+        self.assertEqual(reportStep(rpt), None)
+
+    def test_inp(self):
+        inp = self.write('swmm.inp', b'[OPTIONS]\nREPORT_STEP\t0:01:00\t\n')
+        self.assertEqual(SwmmCli.resultStep(inp), 60)
+        inp = self.write('swmm.inp', b'[OPTIONS]\nREPORT_STEP\tx\t\n')
+        self.assertEqual(SwmmCli.resultStep(inp), None)
+
+if __name__ == '__main__':
+    unittest.main()
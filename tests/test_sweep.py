@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    test_sweep.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by Oslandia
+    Email                : infos at oslandia dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'Oslandia'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, Oslandia'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from SwmmInp import NUMBER, TEXT
+from SwmmSweep import SwmmSweepError, SectionTable, parseVariants
+
+def conduits():
+    return SectionTable('CONDUITS', ['Name', 'FromNode', 'ToNode', 'Length',
+        'Roughness'], [TEXT, TEXT, TEXT, NUMBER, NUMBER],
+        [['C1', 'J1', 'J2', 100., 0.013], ['C2', 'J2', 'O1', 200., None],
+         ['C3', 'J3', 'O1', 50., 0.02]])
+
+class SweepTestCase(unittest.TestCase):
+
+    def test_parse(self):
+        variants = parseVariants([
+            ('base', None, None, None, None, None),
+            (' rough ', 'conduits', 'Roughness', '*', '1.5', None),
+            ('rough', 'CONDUITS', 'Length', '+', 10, ' C1, C3,'),
+            ('outfall', 'outfalls', 'Type', None, 'FIXED', u'')])
+        self.assertEqual(variants.keys(), ['base', 'rough', 'outfall'])
+        self.assertEqual(variants['base'], [])
+        self.assertEqual(variants['rough'], [
+            ('CONDUITS', 'Roughness', '*', 1.5, None),
+            ('CONDUITS', 'Length', '+', 10., set(['C1', 'C3']))])
+        self.assertEqual(variants['outfall'], [
+            ('OUTFALLS', 'Type', '=', 'FIXED', None)])
+
+    def test_parse_errors(self):
+        for row in [(None, 'CONDUITS', 'Length', '=', 1, None),
+                ('v', 'CONDUITS', None, '=', 1, None),
+                ('v', 'CONDUITS', 'Length', '/', 2, None),
+                ('v', 'CONDUITS', 'Length', '*', 'x', None),
+                ('v', 'CONDUITS', 'Length', '+', None, None)]:
+            self.assertRaises(SwmmSweepError, parseVariants, [row])
+
+    def test_patch(self):
+        table = conduits()
+        patches = parseVariants([
+            ('v', 'CONDUITS', 'roughness', '*', 2, None),
+            ('v', 'CONDUITS', 'Length', '+', 10, 'C1,C2'),
+            ('v', 'CONDUITS', 'ToNode', '=', 'O2', 'C3'),
+            ('v', 'JUNCTIONS', 'MaxDepth', '=', 3, None)])['v']
+        self.assertEqual(list(table.patchedRows(patches)), [
+            ['C1', 'J1', 'J2', 110., 0.026],
+            ['C2', 'J2', 'O1', 210., None], # empty cells stay empty
+            ['C3', 'J3', 'O2', 50., 0.04]])
+        # the rows of the table are not changed
+        self.assertEqual(table.rows[0], ['C1', 'J1', 'J2', 100., 0.013])
+        # unpatched rows are the rows of the table
+        rows = list(table.patchedRows(parseVariants([
+            ('v', 'CONDUITS', 'Length', '=', 1, 'C2')])['v']))
+        self.assertTrue(rows[0] is table.rows[0])
+        self.assertEqual(rows[1][3], 1)
+
+    def test_lines(self):
+        lines = list(conduits().lines(parseVariants([
+            ('v', 'CONDUITS', 'Length', '*', 0.5, 'C2')])['v']))
+        self.assertEqual(lines, [u'[CONDUITS]\n',
+            u';Name\tFromNode\tToNode\tLength\tRoughness\t\n',
+            u'C1\tJ1\tJ2\t100.0\t0.013\t\n',
+            u'C2\tJ2\tO1\t100.0\t\t\n',
+            u'C3\tJ3\tO1\t50.0\t0.02\t\n',
+            u'\n'])
+
+    def test_patch_errors(self):
+        table = conduits()
+        self.assertRaises(SwmmSweepError, list, table.patchedRows(
+            parseVariants([('v', 'CONDUITS', 'Width', '=', 1, None)])['v']))
+        table.rows[0][3] = 'long'
+        self.assertRaises(SwmmSweepError, list, table.patchedRows(
+            parseVariants([('v', 'CONDUITS', 'Length', '*', 2, None)])['v']))
+
+if __name__ == '__main__':
+    unittest.main()